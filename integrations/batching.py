@@ -0,0 +1,34 @@
+"""
+Bounded-concurrency batch execution for integration API calls.
+
+Overlaps request latency like ``asyncio.gather`` while capping the number of
+in-flight calls, which keeps bulk operations under provider rate limits.
+"""
+
+from typing import Any, Awaitable, Iterable, List
+import asyncio
+
+
+async def run_batch(
+    coros: Iterable[Awaitable[Any]],
+    limit: int = 5,
+    return_exceptions: bool = True
+) -> List[Any]:
+    """
+    Await coroutines with at most ``limit`` running at once.
+    
+    Args:
+        coros: Coroutines/awaitables to run
+        limit: Maximum number of concurrently running awaitables
+        return_exceptions: Return exceptions in the result list instead of raising
+        
+    Returns:
+        Results in the same order as ``coros``
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+    
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
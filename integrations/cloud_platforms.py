@@ -7,8 +7,98 @@ Provides adapters for major cloud platforms:
 - Azure (Blob Storage, Azure Functions, Azure ML)
 """
 
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
-import json
+import gzip
+import io
+import threading
+
+from .fast_json import dumps, loads
+
+
+# Cloud SDK clients are thread-safe and expensive to build (credential lookup,
+# TLS/connection pools), so every adapter instance shares one per target.
+_CLIENT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _boto3_session():
+    """Shared boto3 session (credentials are resolved once)"""
+    import boto3
+    return boto3.session.Session()
+
+
+@lru_cache(maxsize=1)
+def _boto_config():
+    """Shared botocore config with a larger keep-alive connection pool"""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=32,
+        tcp_keepalive=True,
+        retries={'max_attempts': 3, 'mode': 'adaptive'}
+    )
+
+
+@lru_cache(maxsize=16)
+def _aws_client(service_name: str, region_name: str):
+    """Shared boto3 client per (service, region)"""
+    with _CLIENT_LOCK:
+        return _boto3_session().client(service_name, region_name=region_name, config=_boto_config())
+
+
+@lru_cache(maxsize=4)
+def _gcs_client(project_id: Optional[str]):
+    """Shared Google Cloud Storage client per project"""
+    from google.cloud import storage
+    return storage.Client(project=project_id)
+
+
+@lru_cache(maxsize=4)
+def _azure_blob_service(connection_string: Optional[str]):
+    """Shared Azure BlobServiceClient per connection string"""
+    from azure.storage.blob import BlobServiceClient
+    return BlobServiceClient.from_connection_string(connection_string)
+
+
+def _serialize_context(context_engine) -> bytes:
+    """Serialize the context graph to JSON bytes"""
+    context_data = {
+        'nodes': [{'id': node.id, 'content': node.content} 
+                 for node in context_engine.nodes.values()],
+        'edges': [{'source': edge.source_id, 'target': edge.target_id} 
+                 for edge in context_engine.edges]
+    }
+    return dumps(context_data)
+
+
+def _deserialize_context(data: bytes) -> Dict[str, Any]:
+    """Parse a context payload, transparently handling gzip-compressed bodies"""
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+    return loads(data)
+
+
+class _BufferWriter(io.RawIOBase):
+    """Write-only file object that fills a caller-provided buffer in place"""
+    
+    def __init__(self, buf):
+        self._view = memoryview(buf).cast('B')
+        self._pos = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        size = len(data)
+        end = self._pos + size
+        if end > len(self._view):
+            raise ValueError(f"Buffer too small: need at least {end} bytes, have {len(self._view)}")
+        self._view[self._pos:end] = data
+        self._pos = end
+        return size
+    
+    def tell(self):
+        return self._pos
 
 
 class AWSAdapter:
@@ -24,8 +114,7 @@ class AWSAdapter:
     def connect_s3(self):
         """Connect to AWS S3"""
         try:
-            import boto3
-            self.s3 = boto3.client('s3', region_name=self.region_name)
+            self.s3 = _aws_client('s3', self.region_name)
             return True
         except ImportError:
             print("boto3 not installed. Install with: pip install boto3")
@@ -39,20 +128,22 @@ class AWSAdapter:
         if not self.s3:
             return False
         
+        return self.upload_bytes_to_s3(bucket_name, key, _serialize_context(self.context_engine))
+    
+    def upload_bytes_to_s3(self, bucket_name: str, key: str, body: bytes,
+                           content_encoding: Optional[str] = None):
+        """Upload an already serialized context payload to S3"""
+        if not self.s3:
+            return False
+        
         try:
-            # Serialize context
-            context_data = {
-                'nodes': [{'id': node.id, 'content': node.content} 
-                         for node in self.context_engine.nodes.values()],
-                'edges': [{'source': edge.source_id, 'target': edge.target_id} 
-                         for edge in self.context_engine.edges]
-            }
-            
+            extra = {'ContentEncoding': content_encoding} if content_encoding else {}
             self.s3.put_object(
                 Bucket=bucket_name,
                 Key=key,
-                Body=json.dumps(context_data),
-                ContentType='application/json'
+                Body=body,
+                ContentType='application/json',
+                **extra
             )
             return True
         except Exception as e:
@@ -66,17 +157,38 @@ class AWSAdapter:
         
         try:
             response = self.s3.get_object(Bucket=bucket_name, Key=key)
-            context_data = json.loads(response['Body'].read())
+            context_data = _deserialize_context(response['Body'].read())
             return context_data
         except Exception as e:
             print(f"Error downloading from S3: {e}")
             return None
     
+    def download_context_to_buffer(self, bucket_name: str, key: str, buf) -> Optional[int]:
+        """
+        Download a context object from S3 directly into a caller-provided buffer.
+        
+        The object body is streamed into ``buf`` (bytearray, memoryview, mmap,
+        numpy array, ...) without an intermediate bytes copy, so callers can
+        reuse shared or pinned memory across downloads.
+        
+        Returns:
+            Number of bytes written, or None on error
+        """
+        if not self.s3:
+            return None
+        
+        try:
+            writer = _BufferWriter(buf)
+            self.s3.download_fileobj(bucket_name, key, writer)
+            return writer.tell()
+        except Exception as e:
+            print(f"Error downloading from S3: {e}")
+            return None
+    
     def connect_lambda(self):
         """Connect to AWS Lambda"""
         try:
-            import boto3
-            self.lambda_client = boto3.client('lambda', region_name=self.region_name)
+            self.lambda_client = _aws_client('lambda', self.region_name)
             return True
         except Exception as e:
             print(f"AWS Lambda connection error: {e}")
@@ -91,9 +203,9 @@ class AWSAdapter:
             response = self.lambda_client.invoke(
                 FunctionName=function_name,
                 InvocationType='RequestResponse',
-                Payload=json.dumps(payload)
+                Payload=dumps(payload)
             )
-            return json.loads(response['Payload'].read())
+            return loads(response['Payload'].read())
         except Exception as e:
             print(f"Error invoking Lambda: {e}")
             return None
@@ -111,8 +223,7 @@ class GCPAdapter:
     def connect_storage(self):
         """Connect to Google Cloud Storage"""
         try:
-            from google.cloud import storage
-            self.storage_client = storage.Client(project=self.project_id)
+            self.storage_client = _gcs_client(self.project_id)
             return True
         except ImportError:
             print("google-cloud-storage not installed. Install with: pip install google-cloud-storage")
@@ -126,20 +237,22 @@ class GCPAdapter:
         if not self.storage_client:
             return False
         
+        return self.upload_bytes_to_gcs(bucket_name, blob_name, _serialize_context(self.context_engine))
+    
+    def upload_bytes_to_gcs(self, bucket_name: str, blob_name: str, body: bytes,
+                            content_encoding: Optional[str] = None):
+        """Upload an already serialized context payload to Google Cloud Storage"""
+        if not self.storage_client:
+            return False
+        
         try:
             bucket = self.storage_client.bucket(bucket_name)
             blob = bucket.blob(blob_name)
-            
-            # Serialize context
-            context_data = {
-                'nodes': [{'id': node.id, 'content': node.content} 
-                         for node in self.context_engine.nodes.values()],
-                'edges': [{'source': edge.source_id, 'target': edge.target_id} 
-                         for edge in self.context_engine.edges]
-            }
+            if content_encoding:
+                blob.content_encoding = content_encoding
             
             blob.upload_from_string(
-                json.dumps(context_data),
+                body,
                 content_type='application/json'
             )
             return True
@@ -155,7 +268,7 @@ class GCPAdapter:
         try:
             bucket = self.storage_client.bucket(bucket_name)
             blob = bucket.blob(blob_name)
-            context_data = json.loads(blob.download_as_string())
+            context_data = _deserialize_context(blob.download_as_bytes())
             return context_data
         except Exception as e:
             print(f"Error downloading from GCS: {e}")
@@ -173,10 +286,7 @@ class AzureAdapter:
     def connect_blob_storage(self):
         """Connect to Azure Blob Storage"""
         try:
-            from azure.storage.blob import BlobServiceClient
-            self.blob_service_client = BlobServiceClient.from_connection_string(
-                self.connection_string
-            )
+            self.blob_service_client = _azure_blob_service(self.connection_string)
             return True
         except ImportError:
             print("azure-storage-blob not installed. Install with: pip install azure-storage-blob")
@@ -190,22 +300,28 @@ class AzureAdapter:
         if not self.blob_service_client:
             return False
         
+        return self.upload_bytes_to_blob(container_name, blob_name, _serialize_context(self.context_engine))
+    
+    def upload_bytes_to_blob(self, container_name: str, blob_name: str, body: bytes,
+                             content_encoding: Optional[str] = None):
+        """Upload an already serialized context payload to Azure Blob Storage"""
+        if not self.blob_service_client:
+            return False
+        
         try:
-            # Serialize context
-            context_data = {
-                'nodes': [{'id': node.id, 'content': node.content} 
-                         for node in self.context_engine.nodes.values()],
-                'edges': [{'source': edge.source_id, 'target': edge.target_id} 
-                         for edge in self.context_engine.edges]
-            }
+            from azure.storage.blob import ContentSettings
             
             blob_client = self.blob_service_client.get_blob_client(
                 container=container_name,
                 blob=blob_name
             )
             blob_client.upload_blob(
-                json.dumps(context_data),
-                overwrite=True
+                body,
+                overwrite=True,
+                content_settings=ContentSettings(
+                    content_type='application/json',
+                    content_encoding=content_encoding
+                )
             )
             return True
         except Exception as e:
@@ -223,7 +339,7 @@ class AzureAdapter:
                 blob=blob_name
             )
             blob_data = blob_client.download_blob().readall()
-            context_data = json.loads(blob_data)
+            context_data = _deserialize_context(blob_data)
             return context_data
         except Exception as e:
             print(f"Error downloading from Azure Blob: {e}")
@@ -251,6 +367,44 @@ class MultiCloudAdapter:
             print(f"Unknown provider: {provider}")
             return False
     
+    def sync_to_clouds(self, targets: Dict[str, Dict[str, Any]], compress: bool = True) -> Dict[str, bool]:
+        """
+        Sync context to several cloud providers at once.
+        
+        The context is serialized (and optionally gzip-compressed) once and the
+        same body is uploaded to every provider.
+        
+        Args:
+            targets: Mapping of provider name to its upload kwargs, e.g.
+                ``{'aws': {'bucket_name': 'b', 'key': 'ctx.json'},
+                'azure': {'container_name': 'c', 'blob_name': 'ctx.json'}}``
+            compress: Gzip the body and set ``Content-Encoding: gzip``
+            
+        Returns:
+            Mapping of provider name to upload success
+        """
+        body = _serialize_context(self.context_engine)
+        content_encoding = None
+        if compress:
+            body = gzip.compress(body, compresslevel=3)
+            content_encoding = 'gzip'
+        
+        uploaders = {
+            'aws': self.aws.upload_bytes_to_s3,
+            'gcp': self.gcp.upload_bytes_to_gcs,
+            'azure': self.azure.upload_bytes_to_blob,
+        }
+        
+        results = {}
+        for provider, kwargs in targets.items():
+            upload = uploaders.get(provider)
+            if upload is None:
+                print(f"Unknown provider: {provider}")
+                results[provider] = False
+                continue
+            results[provider] = upload(body=body, content_encoding=content_encoding, **kwargs)
+        return results
+    
     def load_from_cloud(self, provider: str, **kwargs):
         """Load context from specified cloud provider"""
         if provider == 'aws':
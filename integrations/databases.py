@@ -9,8 +9,100 @@ Provides adapters for popular databases:
 - Elasticsearch
 """
 
-from typing import List, Dict, Any, Optional
-import json
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+import io
+import struct
+
+import numpy as np
+
+from .fast_json import dumps, loads
+
+
+@dataclass(frozen=True)
+class NodeView:
+    """Flat, typed view of a context node for storage hot loops"""
+    __slots__ = ('id', 'content', 'embedding', 'metadata')
+    
+    id: str
+    content: Any
+    embedding: Optional[np.ndarray]
+    metadata: Dict[str, Any]
+
+
+def _views(nodes: List[Any]) -> List[NodeView]:
+    """Resolve optional node attributes once so storage loops read fields directly"""
+    return [
+        NodeView(node.id, node.content, getattr(node, 'embedding', None), getattr(node, 'metadata', None) or {})
+        for node in nodes
+    ]
+
+
+def _node_columns(nodes: List[Any]) -> Tuple[List[str], List[Any], List[Optional[List[float]]], List[Dict[str, Any]]]:
+    """
+    Flatten nodes into column lists once per batch.
+    
+    Embeddings keep their source dtype and may differ in length; nodes
+    without one get None.
+    
+    Returns:
+        Tuple of (ids, contents, embeddings, metadata)
+    """
+    views = _views(nodes)
+    ids = [view.id for view in views]
+    contents = [view.content for view in views]
+    metadata = [view.metadata for view in views]
+    embeddings: List[Optional[List[float]]] = [
+        None if view.embedding is None else np.asarray(view.embedding).tolist()
+        for view in views
+    ]
+    
+    return ids, contents, embeddings, metadata
+
+
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
+
+
+def _pgcopy_binary(nodes: List[Any]) -> io.BytesIO:
+    """
+    Encode nodes as a PostgreSQL binary COPY stream.
+    
+    Row layout matches ``context_nodes (id, content, embedding, metadata)``:
+    text, text, pgvector (int16 dim, int16 unused, float32[] big-endian)
+    and jsonb (version byte 1 followed by the JSON text). None content or
+    embeddings are written as NULL (field length -1).
+    """
+    buf = io.BytesIO()
+    write = buf.write
+    write(_PGCOPY_HEADER)
+    
+    for view in _views(nodes):
+        write(struct.pack('>h', 4))
+        
+        for text in (view.id, view.content):
+            if text is None:
+                write(struct.pack('>i', -1))
+                continue
+            data = str(text).encode('utf-8')
+            write(struct.pack('>i', len(data)))
+            write(data)
+        
+        embedding = view.embedding
+        if embedding is None:
+            write(struct.pack('>i', -1))
+        else:
+            vector = np.asarray(embedding, dtype='>f4').ravel()
+            write(struct.pack('>ihh', 4 + vector.nbytes, vector.size, 0))
+            write(vector.tobytes())
+        
+        data = b'\x01' + dumps(view.metadata)
+        write(struct.pack('>i', len(data)))
+        write(data)
+    
+    write(_PGCOPY_TRAILER)
+    buf.seek(0)
+    return buf
 
 
 class PostgreSQLAdapter:
@@ -73,27 +165,51 @@ class PostgreSQLAdapter:
             return False
         
         try:
+            from psycopg2.extras import execute_values
+            
+            ids, contents, embeddings, metadata = _node_columns(nodes)
+            rows = list(zip(ids, contents, embeddings, [dumps(m).decode('utf-8') for m in metadata]))
+            
             with self.conn.cursor() as cur:
-                for node in nodes:
-                    cur.execute("""
-                        INSERT INTO context_nodes (id, content, embedding, metadata)
-                        VALUES (%s, %s, %s, %s)
-                        ON CONFLICT (id) DO UPDATE SET
-                            content = EXCLUDED.content,
-                            embedding = EXCLUDED.embedding,
-                            metadata = EXCLUDED.metadata
-                    """, (
-                        node.id,
-                        node.content,
-                        node.embedding.tolist() if hasattr(node, 'embedding') else None,
-                        json.dumps(node.metadata if hasattr(node, 'metadata') else {})
-                    ))
+                # One multi-row statement per page instead of one round-trip per node
+                execute_values(cur, """
+                    INSERT INTO context_nodes (id, content, embedding, metadata)
+                    VALUES %s
+                    ON CONFLICT (id) DO UPDATE SET
+                        content = EXCLUDED.content,
+                        embedding = EXCLUDED.embedding,
+                        metadata = EXCLUDED.metadata
+                """, rows, page_size=500)
                 self.conn.commit()
             return True
         except Exception as e:
             print(f"Error storing nodes: {e}")
             return False
     
+    def bulk_load_nodes(self, nodes: List[Any]):
+        """
+        Bulk load nodes using binary COPY.
+        
+        Much faster than INSERT for large initial loads, but COPY cannot
+        upsert: use it for empty tables or ids that are not stored yet, and
+        ``store_nodes`` otherwise.
+        """
+        if not self.conn:
+            return False
+        
+        try:
+            stream = _pgcopy_binary(nodes)
+            with self.conn.cursor() as cur:
+                cur.copy_expert(
+                    "COPY context_nodes (id, content, embedding, metadata) FROM STDIN WITH (FORMAT BINARY)",
+                    stream
+                )
+                self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error bulk loading nodes: {e}")
+            return False
+    
     def vector_search(self, query_vector: List[float], k: int = 10):
         """Search for similar vectors using pgvector"""
         if not self.conn:
@@ -142,19 +258,19 @@ class MongoDBAdapter:
             return False
         
         try:
-            nodes_collection = self.db['nodes']
-            for node in nodes:
-                doc = {
-                    '_id': node.id,
-                    'content': node.content,
-                    'embedding': node.embedding.tolist() if hasattr(node, 'embedding') else None,
-                    'metadata': node.metadata if hasattr(node, 'metadata') else {},
-                }
-                nodes_collection.update_one(
-                    {'_id': node.id},
-                    {'$set': doc},
+            from pymongo import UpdateOne
+            
+            ids, contents, embeddings, metadata = _node_columns(nodes)
+            operations = [
+                UpdateOne(
+                    {'_id': node_id},
+                    {'$set': {'_id': node_id, 'content': content, 'embedding': embedding, 'metadata': meta}},
                     upsert=True
                 )
+                for node_id, content, embedding, meta in zip(ids, contents, embeddings, metadata)
+            ]
+            if operations:
+                self.db['nodes'].bulk_write(operations, ordered=False)
             return True
         except Exception as e:
             print(f"Error storing nodes: {e}")
@@ -174,7 +290,7 @@ class RedisAdapter:
         """Connect to Redis"""
         try:
             import redis
-            self.redis = redis.Redis(host=self.host, port=self.port, decode_responses=True)
+            self.redis = redis.Redis(host=self.host, port=self.port)
             return self.redis.ping()
         except ImportError:
             print("redis not installed. Install with: pip install redis")
@@ -192,7 +308,7 @@ class RedisAdapter:
             self.redis.setex(
                 f"node:{node_id}",
                 ttl,
-                json.dumps(node_data)
+                dumps(node_data)
             )
             return True
         except Exception as e:
@@ -206,7 +322,7 @@ class RedisAdapter:
         
         try:
             data = self.redis.get(f"node:{node_id}")
-            return json.loads(data) if data else None
+            return loads(data) if data else None
         except Exception as e:
             print(f"Error retrieving cached node: {e}")
             return None
@@ -281,13 +397,18 @@ class ElasticsearchAdapter:
             return False
         
         try:
-            for node in nodes:
-                doc = {
-                    'content': node.content,
-                    'embedding': node.embedding.tolist() if hasattr(node, 'embedding') else None,
-                    'metadata': node.metadata if hasattr(node, 'metadata') else {},
+            from elasticsearch.helpers import bulk
+            
+            ids, contents, embeddings, metadata = _node_columns(nodes)
+            actions = (
+                {
+                    '_index': index_name,
+                    '_id': node_id,
+                    '_source': {'content': content, 'embedding': embedding, 'metadata': meta},
                 }
-                self.es.index(index=index_name, id=node.id, document=doc)
+                for node_id, content, embedding, meta in zip(ids, contents, embeddings, metadata)
+            )
+            bulk(self.es, actions)
             return True
         except Exception as e:
             print(f"Error indexing nodes: {e}")
@@ -0,0 +1,47 @@
+"""
+Fast JSON encoding for integration payloads.
+
+Uses orjson when installed (several times faster than the stdlib and able to
+serialize numpy arrays natively) and falls back to the stdlib json module.
+``dumps`` always returns bytes, which is what storage and network clients
+accept directly.
+"""
+
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for numpy values when orjson is unavailable"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    _SORTED_OPTIONS = _OPTIONS | orjson.OPT_SORT_KEYS
+    
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Serialize ``obj`` to JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_SORTED_OPTIONS if sort_keys else _OPTIONS)
+    
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Serialize ``obj`` to JSON bytes"""
+        return json.dumps(obj, default=_default, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+    
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Deserialize JSON from bytes or str"""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
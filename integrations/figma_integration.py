@@ -6,28 +6,66 @@ Figma design import and conversion.
 """
 
 import logging
+from html import escape
+from string import Template
 from typing import Dict, Any, List, Optional
 import asyncio
 import os
 
+from .ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Parsed once at import; convert_to_html only substitutes the rendered frames
+_HTML_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Figma Import</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: system-ui, sans-serif; }
+        .container { padding: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Imported from Figma</h1>
+        <p>Design converted to HTML</p>
+$frames
+    </div>
+</body>
+</html>
+""")
+
+_FRAME_TEMPLATE = Template(
+    '        <section class="figma-node" data-node-id="$id"><h2>$name</h2></section>'
+)
+
 
 class FigmaIntegration:
     """
     Figma API integration for design import.
     """
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, cache_size: int = 256, cache_ttl: float = 300.0):
         """
         Initialize Figma integration.
         
         Args:
             token: Figma personal access token
+            cache_size: Maximum number of cached files/styles/HTML renders
+            cache_ttl: Seconds before a cached file is fetched again
         """
         self.token = token or os.getenv("FIGMA_TOKEN")
         self.base_url = "https://api.figma.com/v1"
         
+        # File data expires after cache_ttl; derived results are keyed by
+        # (file_key, lastModified) so they stay valid until the file changes
+        self._file_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._styles_cache = TTLCache(maxsize=cache_size, ttl=None)
+        self._html_cache = TTLCache(maxsize=cache_size, ttl=None)
+        
     async def get_file(self, file_key: str) -> Dict[str, Any]:
         """
         Get Figma file data.
@@ -38,14 +76,26 @@ class FigmaIntegration:
         Returns:
             File data
         """
-        logger.info(f"Fetching Figma file: {file_key}")
+        cached = self._file_cache.get(file_key)
+        if cached is not None:
+            return cached
+        
+        logger.info("Fetching Figma file: %s", file_key)
         
         # In production, use actual Figma API
-        return {
+        file_data = {
             "name": "Design File",
             "lastModified": "2024-01-01",
             "document": {"children": []}
         }
+        self._file_cache.set(file_key, file_data)
+        return file_data
+    
+    def clear_cache(self) -> None:
+        """Drop all cached files, styles and HTML renders."""
+        self._file_cache.clear()
+        self._styles_cache.clear()
+        self._html_cache.clear()
     
     async def get_images(
         self,
@@ -64,7 +114,7 @@ class FigmaIntegration:
         Returns:
             Dictionary of node_id -> image_url
         """
-        logger.info(f"Exporting images from Figma: {file_key}")
+        logger.info("Exporting images from Figma: %s", file_key)
         
         return {node_id: f"https://figma.com/img/{node_id}.png" for node_id in node_ids}
     
@@ -83,32 +133,31 @@ class FigmaIntegration:
         Returns:
             HTML code
         """
-        logger.info(f"Converting Figma to HTML: {file_key}")
+        logger.info("Converting Figma to HTML: %s", file_key)
         
         # Get file data
         file_data = await self.get_file(file_key)
         
-        # Parse and convert (simplified)
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Figma Import</title>
-            <style>
-                * { margin: 0; padding: 0; box-sizing: border-box; }
-                body { font-family: system-ui, sans-serif; }
-                .container { padding: 20px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Imported from Figma</h1>
-                <p>Design converted to HTML</p>
-            </div>
-        </body>
-        </html>
-        """
+        cache_key = (file_key, node_id, file_data.get("lastModified"))
+        cached = self._html_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Parse and convert (simplified): one section per top-level node
+        children = file_data.get("document", {}).get("children", [])
+        if node_id is not None:
+            children = [child for child in children if child.get("id") == node_id]
+        
+        frames = "\n".join(
+            _FRAME_TEMPLATE.substitute(
+                id=escape(str(child.get("id", ""))),
+                name=escape(str(child.get("name", "")))
+            )
+            for child in children
+        )
+        html = _HTML_TEMPLATE.substitute(frames=frames)
         
+        self._html_cache.set(cache_key, html)
         return html
     
     async def extract_styles(self, file_key: str) -> Dict[str, Any]:
@@ -121,9 +170,15 @@ class FigmaIntegration:
         Returns:
             Style definitions
         """
-        logger.info(f"Extracting styles from Figma: {file_key}")
+        file_data = await self.get_file(file_key)
+        cache_key = (file_key, file_data.get("lastModified"))
+        cached = self._styles_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        logger.info("Extracting styles from Figma: %s", file_key)
         
-        return {
+        styles = {
             "colors": {
                 "primary": "#007bff",
                 "secondary": "#6c757d",
@@ -139,6 +194,8 @@ class FigmaIntegration:
                 "large": "24px"
             }
         }
+        self._styles_cache.set(cache_key, styles)
+        return styles
     
     async def import_components(self, file_key: str) -> List[Dict[str, Any]]:
         """
@@ -150,7 +207,7 @@ class FigmaIntegration:
         Returns:
             List of component definitions
         """
-        logger.info(f"Importing components from Figma: {file_key}")
+        logger.info("Importing components from Figma: %s", file_key)
         
         return [
             {
@@ -3,13 +3,25 @@ GitHub Integration for Autonomous UI Engine
 Phase 6: Innovation - Integrations
 
 GitHub API integration for repository operations.
+
+Without a token every method returns stub data (offline mode). A token,
+passed in or read from the GITHUB_TOKEN environment variable, makes every
+call real: repositories, files and pull requests are actually created.
+Unset GITHUB_TOKEN when running the examples against a real account.
 """
 
+import base64
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import asyncio
 import os
 
+from .batching import run_batch
+from .fast_json import dumps, loads
+from .http_session import get_session, conditional_get
+from .ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,15 +30,89 @@ class GitHubIntegration:
     GitHub API integration for repository operations.
     """
     
-    def __init__(self, token: Optional[str] = None):
+    __slots__ = (
+        "token", "base_url", "max_concurrency", "cache_ttl", "redis",
+        "_repo_cache", "_token_hash", "_session_factory",
+    )
+    
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        cache_ttl: float = 60.0,
+        redis_client: Optional[Any] = None
+    ):
         """
         Initialize GitHub integration.
         
         Args:
-            token: GitHub personal access token
+            token: GitHub personal access token (defaults to GITHUB_TOKEN);
+                with a token all operations hit the real API
+            max_concurrency: In-flight request cap for batch operations
+                (defaults to GITHUB_MAX_CONCURRENCY or 5)
+            cache_ttl: Seconds repository listings are served from cache
+            redis_client: Optional ``redis.asyncio`` client used as a shared
+                second-level cache for repository listings
         """
         self.token = token or os.getenv("GITHUB_TOKEN")
         self.base_url = "https://api.github.com"
+        self.max_concurrency = max_concurrency or int(os.getenv("GITHUB_MAX_CONCURRENCY", "5"))
+        self.cache_ttl = cache_ttl
+        self.redis = redis_client
+        self._repo_cache = TTLCache(maxsize=1024, ttl=cache_ttl)
+        self._token_hash = hashlib.sha256((self.token or "").encode("utf-8")).hexdigest()[:16]
+        self._session_factory = get_session
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        """
+        Send an authenticated request through the shared pooled session.
+        
+        Args:
+            method: HTTP method
+            path: API path relative to base_url
+            **kwargs: Extra aiohttp request arguments (json, params, ...)
+            
+        Returns:
+            Decoded JSON response
+        """
+        session = await self._session_factory()
+        headers = self._headers()
+        url = f"{self.base_url}{path}"
+        if method == "GET":
+            # Revalidate with ETags: a 304 does not count against the rate limit
+            return await conditional_get(session, url, headers=headers, params=kwargs.get("params"))
+        
+        async with session.request(method, url, headers=headers, **kwargs) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+    
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github+json",
+        }
+    
+    async def _file_sha(self, repo: str, path: str, branch: str) -> Optional[str]:
+        """Blob SHA of a file on a branch, or None if the file does not exist."""
+        session = await self._session_factory()
+        async with session.get(
+            f"{self.base_url}/repos/{repo}/contents/{path}",
+            headers=self._headers(),
+            params={"ref": branch}
+        ) as resp:
+            if resp.status == 404:
+                return None
+            resp.raise_for_status()
+            return (await resp.json())["sha"]
+    
+    async def close(self) -> None:
+        """
+        Release this integration's cached data.
+        
+        The pooled HTTP session is shared with other integrations and stays
+        open; ``http_session.close_session()`` closes it on shutdown.
+        """
+        self._repo_cache.clear()
         
     async def create_repository(
         self,
@@ -45,15 +131,16 @@ class GitHubIntegration:
         Returns:
             Repository data
         """
-        logger.info(f"Creating repository: {name}")
+        logger.info("Creating repository: %s", name)
+        
+        # New repositories change every listing visible to this token
+        self._repo_cache.clear()
         
-        # In production, use actual GitHub API
-        # async with aiohttp.ClientSession() as session:
-        #     headers = {"Authorization": f"token {self.token}"}
-        #     data = {"name": name, "description": description, "private": private}
-        #     async with session.post(f"{self.base_url}/user/repos", headers=headers, json=data) as resp:
-        #         return await resp.json()
+        if self.token:
+            data = {"name": name, "description": description, "private": private}
+            return await self._request("POST", "/user/repos", json=data)
         
+        # Offline mode: no token configured
         return {
             "id": 12345,
             "name": name,
@@ -74,6 +161,9 @@ class GitHubIntegration:
         """
         Create or update a file in repository.
         
+        An existing file is looked up first, because the contents API only
+        replaces a file when given its current blob SHA.
+        
         Args:
             repo: Repository (owner/name)
             path: File path
@@ -84,9 +174,20 @@ class GitHubIntegration:
         Returns:
             Commit data
         """
-        logger.info(f"Creating file in {repo}: {path}")
+        logger.info("Creating file in %s: %s", repo, path)
+        
+        if self.token:
+            data = {
+                "message": message,
+                "content": base64.b64encode(content.encode("utf-8")).decode("ascii"),
+                "branch": branch,
+            }
+            sha = await self._file_sha(repo, path, branch)
+            if sha is not None:
+                data["sha"] = sha
+            return await self._request("PUT", f"/repos/{repo}/contents/{path}", json=data)
         
-        # In production, use actual GitHub API
+        # Offline mode: no token configured
         return {
             "content": {"path": path},
             "commit": {"sha": "abc123", "message": message}
@@ -113,8 +214,13 @@ class GitHubIntegration:
         Returns:
             Pull request data
         """
-        logger.info(f"Creating PR in {repo}: {title}")
+        logger.info("Creating PR in %s: %s", repo, title)
         
+        if self.token:
+            data = {"title": title, "head": head, "base": base, "body": body}
+            return await self._request("POST", f"/repos/{repo}/pulls", json=data)
+        
+        # Offline mode: no token configured
         return {
             "number": 1,
             "title": title,
@@ -127,14 +233,116 @@ class GitHubIntegration:
         user: Optional[str] = None,
         org: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """List repositories for user or organization."""
-        logger.info(f"Listing repositories for {user or org}")
+        """
+        List repositories for user or organization.
+        
+        Results are cached per (user, org, token) for ``cache_ttl`` seconds,
+        in process and, when configured, in Redis.
+        """
+        cache_key = (user, org, self._token_hash)
+        cached = self._repo_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        redis_key = f"gh:list_repos:{self._token_hash}:{user or ''}:{org or ''}"
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(redis_key)
+                if data:
+                    repos = loads(data)
+                    self._repo_cache.set(cache_key, repos)
+                    return repos
+            except Exception as e:
+                logger.warning("Redis cache read failed: %s", e)
         
+        repos = await self._fetch_repositories(user, org)
+        
+        self._repo_cache.set(cache_key, repos)
+        if self.redis is not None:
+            try:
+                await self.redis.set(redis_key, dumps(repos), ex=max(1, int(self.cache_ttl)))
+            except Exception as e:
+                logger.warning("Redis cache write failed: %s", e)
+        return repos
+    
+    async def _fetch_repositories(
+        self,
+        user: Optional[str],
+        org: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetch repositories from the API (or stub data in offline mode)."""
+        logger.info("Listing repositories for %s", user or org)
+        
+        if self.token:
+            if org:
+                path = f"/orgs/{org}/repos"
+            elif user:
+                path = f"/users/{user}/repos"
+            else:
+                path = "/user/repos"
+            return await self._request("GET", path, params={"per_page": 100})
+        
+        # Offline mode: no token configured
         return [
             {"name": "repo1", "description": "Repository 1"},
             {"name": "repo2", "description": "Repository 2"}
         ]
     
+    async def batch_create_files(
+        self,
+        files: Sequence[Tuple[str, str, str, str, str]]
+    ) -> List[Any]:
+        """
+        Create many files with bounded concurrency.
+        
+        Every write commits to its branch, and concurrent commits to one
+        branch conflict, so files for the same (repo, branch) are written one
+        after another; only different branches are written concurrently.
+        
+        Args:
+            files: (repo, path, content, message, branch) tuples
+            
+        Returns:
+            Commit data (or the raised exception) per file, in input order
+        """
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, (repo, _, _, _, branch) in enumerate(files):
+            groups.setdefault((repo, branch), []).append(i)
+        
+        results: List[Any] = [None] * len(files)
+        
+        async def write_serially(indices: List[int]) -> None:
+            for i in indices:
+                try:
+                    results[i] = await self.create_file(*files[i])
+                except Exception as e:
+                    results[i] = e
+        
+        await run_batch(
+            (write_serially(indices) for indices in groups.values()),
+            limit=self.max_concurrency
+        )
+        return results
+    
+    async def batch_list_repositories(
+        self,
+        users: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        List repositories for many users with bounded concurrency.
+        
+        Args:
+            users: GitHub user names
+            
+        Returns:
+            Mapping of user to repositories (or the raised exception)
+        """
+        results = await run_batch(
+            (self.list_repositories(user=user) for user in users),
+            limit=self.max_concurrency
+        )
+        return dict(zip(users, results))
+    
     async def deploy_ui_to_github_pages(
         self,
         repo: str,
@@ -154,16 +362,27 @@ class GitHubIntegration:
         Returns:
             Deployment status
         """
-        logger.info(f"Deploying UI to GitHub Pages: {repo}")
+        logger.info("Deploying UI to GitHub Pages: %s", repo)
         
-        # Create files
-        await self.create_file(repo, "index.html", html_content, "Deploy UI", "gh-pages")
+        files = [("index.html", html_content, "Deploy UI")]
         
         if css_content:
-            await self.create_file(repo, "styles.css", css_content, "Add styles", "gh-pages")
+            files.append(("styles.css", css_content, "Add styles"))
         
         if js_content:
-            await self.create_file(repo, "script.js", js_content, "Add script", "gh-pages")
+            files.append(("script.js", js_content, "Add script"))
+        
+        # One upload at a time: each contents-API write commits to gh-pages,
+        # and concurrent commits to the same branch conflict (409/422)
+        for path, content, message in files:
+            try:
+                await self.create_file(repo, path, content, message, "gh-pages")
+            except Exception as e:
+                logger.error("GitHub Pages deployment failed for %s at %s: %s", repo, path, e)
+                return {
+                    "success": False,
+                    "errors": [str(e)]
+                }
         
         return {
             "success": True,
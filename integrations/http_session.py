@@ -0,0 +1,234 @@
+"""
+Shared aiohttp session for integrations that talk HTTP (GitHub, Slack, ...).
+
+One pooled ``ClientSession`` is reused across calls so requests to the same
+host reuse TCP/TLS connections instead of paying a new handshake each time.
+The session is shared by every integration, so individual integrations never
+close it; call ``close_session()`` on application shutdown (it is also closed
+at interpreter exit if its event loop is still available).
+
+``conditional_get`` adds ETag/Last-Modified revalidation (a 304 costs no
+GitHub rate-limit quota) and rate-limit aware retries on top of a session.
+"""
+
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+import asyncio
+import atexit
+import hashlib
+import time
+
+from .fast_json import loads
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+_session: Optional["aiohttp.ClientSession"] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock: Optional[asyncio.Lock] = None
+_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _is_usable(loop: asyncio.AbstractEventLoop) -> bool:
+    return _session is not None and not _session.closed and _session_loop is loop
+
+
+async def get_session() -> "aiohttp.ClientSession":
+    """
+    Return the shared ClientSession, creating it on first use.
+    
+    The session is bound to the running event loop; a new one is created if
+    the previous session was closed or belongs to a different loop.
+    """
+    global _session, _session_loop, _lock, _lock_loop
+    
+    if not AIOHTTP_AVAILABLE:
+        raise ImportError("aiohttp not installed. Install with: pip install aiohttp")
+    
+    loop = asyncio.get_running_loop()
+    if _is_usable(loop):
+        return _session
+    
+    if _lock is None or _lock_loop is not loop:
+        _lock = asyncio.Lock()
+        _lock_loop = loop
+    
+    async with _lock:
+        if not _is_usable(loop):
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=10, enable_cleanup_closed=True)
+            _session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60, connect=10)
+            )
+            _session_loop = loop
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared ClientSession (safe to call if it was never opened)."""
+    global _session, _session_loop
+    
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+@atexit.register
+def _close_at_exit() -> None:
+    """Close a still-open shared session whose loop is idle at interpreter exit."""
+    loop = _session_loop
+    if _session is None or _session.closed or loop is None:
+        return
+    if not loop.is_closed() and not loop.is_running():
+        loop.run_until_complete(close_session())
+
+
+# Total size of response bodies kept for revalidation
+VALIDATOR_CACHE_BYTES = 8 * 1024 * 1024
+
+
+class _ValidatorCache:
+    """
+    LRU of (etag, last_modified, raw body) bounded by total body size.
+    
+    Raw bytes are stored so each 304 decodes a fresh object; callers can
+    mutate what they get back without corrupting the cache.
+    """
+    
+    def __init__(self, maxbytes: int):
+        self.maxbytes = maxbytes
+        self.size = 0
+        self._data: "OrderedDict[Hashable, Tuple[Optional[str], Optional[str], bytes]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Tuple[Optional[str], Optional[str], bytes]]:
+        item = self._data.get(key)
+        if item is not None:
+            self._data.move_to_end(key)
+        return item
+    
+    def set(self, key: Hashable, etag: Optional[str], last_modified: Optional[str], raw: bytes) -> None:
+        self.pop(key)
+        if len(raw) > self.maxbytes:
+            return
+        self._data[key] = (etag, last_modified, raw)
+        self.size += len(raw)
+        while self.size > self.maxbytes:
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.size -= len(evicted)
+    
+    def pop(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.size -= len(item[2])
+    
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# (url, params, auth) -> validators and body of the last 200 response
+_validators = _ValidatorCache(VALIDATOR_CACHE_BYTES)
+
+MAX_RETRY_DELAY = 60.0
+
+
+def _retry_delay(status: int, headers: Any, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a throttled response, or None if the
+    response should not be retried.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        except ValueError:
+            try:
+                return min(max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()), MAX_RETRY_DELAY)
+            except (TypeError, ValueError):
+                pass
+    
+    if headers.get("X-RateLimit-Remaining") == "0":
+        reset = headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                return min(max(0.0, float(reset) - time.time()), MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+        return min(2.0 ** attempt, MAX_RETRY_DELAY)
+    
+    if status == 429:
+        return min(2.0 ** attempt, MAX_RETRY_DELAY)
+    
+    # Plain 403: permission problem, not throttling
+    return None
+
+
+async def conditional_get(
+    session: Any,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    max_retries: int = 3
+) -> Any:
+    """
+    GET a JSON resource, revalidating previously seen responses.
+    
+    ETag and Last-Modified validators are remembered per URL, params and
+    credentials; when the server answers 304 Not Modified the stored body is
+    decoded again, so every caller gets its own copy. 403/429 throttling responses are retried after Retry-After or
+    X-RateLimit-Reset.
+    
+    Args:
+        session: aiohttp-compatible session
+        url: Absolute URL
+        headers: Request headers (including Authorization)
+        params: Query parameters
+        max_retries: Retries for throttled responses
+        
+    Returns:
+        Decoded JSON body
+    """
+    headers = dict(headers or {})
+    auth = hashlib.sha256(headers.get("Authorization", "").encode("utf-8")).hexdigest()[:16]
+    key = (url, tuple(sorted((params or {}).items())), auth)
+    
+    cached = _validators.get(key)
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    
+    for attempt in range(max_retries + 1):
+        async with session.get(url, headers=headers, params=params) as resp:
+            if resp.status == 304 and cached is not None:
+                return loads(cached[2])
+            
+            if resp.status in (403, 429) and attempt < max_retries:
+                delay = _retry_delay(resp.status, resp.headers, attempt)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+            
+            resp.raise_for_status()
+            raw = await resp.read()
+            
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if etag or last_modified:
+                _validators.set(key, etag, last_modified, raw)
+            return loads(raw)
+
+
+def clear_validators() -> None:
+    """Forget all stored ETag/Last-Modified validators."""
+    _validators.clear()
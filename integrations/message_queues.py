@@ -8,19 +8,142 @@ Provides adapters for message queuing systems:
 - AWS SQS
 """
 
-from typing import Callable, Optional, Dict, Any
-import json
+from functools import lru_cache
+from typing import AsyncIterable, Callable, Optional, Dict, Any, Iterable, List
+import asyncio
+import importlib.util
+import inspect
+import queue
+import threading
+
+from .cloud_platforms import _aws_client
+from .fast_json import dumps, loads
+
+# SQS accepts at most 10 entries per batch call
+SQS_BATCH_SIZE = 10
+
+# Listener pipelines: messages buffered between the reader and the callbacks,
+# and the default number of workers running callbacks. One worker keeps
+# callbacks serial and in delivery order; callers opt into more
+LISTENER_QUEUE_SIZE = 1024
+LISTENER_WORKERS = 1
+
+_STOP = object()
+
+
+def _run_callback_workers(messages: Iterable[Any], callback: Callable, workers: int):
+    """
+    Read ``messages`` on the calling thread and run ``callback`` on worker threads.
+    
+    A slow callback no longer stalls consumption until the bounded queue is
+    full. Callback errors are logged and do not stop the listener. Returns
+    after ``messages`` is exhausted and queued messages have been handled.
+    """
+    pending: "queue.Queue[Any]" = queue.Queue(maxsize=LISTENER_QUEUE_SIZE)
+    
+    def work():
+        while True:
+            item = pending.get()
+            if item is _STOP:
+                return
+            try:
+                callback(item)
+            except Exception as e:
+                print(f"Error in message callback: {e}")
+    
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in messages:
+            pending.put(item)
+    finally:
+        for _ in threads:
+            pending.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+
+async def _run_callback_tasks(messages: AsyncIterable[Any], callback: Callable, workers: int):
+    """
+    asyncio counterpart of ``_run_callback_workers``.
+    
+    ``callback`` may be a plain function or a coroutine function. Cancelling
+    the listener cancels the worker tasks as well.
+    """
+    pending: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=LISTENER_QUEUE_SIZE)
+    
+    async def work():
+        while True:
+            item = await pending.get()
+            if item is _STOP:
+                return
+            try:
+                result = callback(item)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error in message callback: {e}")
+    
+    tasks = [asyncio.create_task(work()) for _ in range(max(1, workers))]
+    try:
+        async for item in messages:
+            await pending.put(item)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    for _ in tasks:
+        await pending.put(_STOP)
+    await asyncio.gather(*tasks)
+
+
+def _sqs_chunks(items: List[Any]):
+    """Yield SQS batch entry lists of at most SQS_BATCH_SIZE items"""
+    for start in range(0, len(items), SQS_BATCH_SIZE):
+        yield list(enumerate(items[start:start + SQS_BATCH_SIZE]))
+
+
+def _sqs_failures(response: Dict[str, Any], action: str) -> bool:
+    """Log failed batch entries; return True if every entry succeeded"""
+    failed = response.get('Failed', [])
+    for failure in failed:
+        print(f"Error {action} SQS message: {failure.get('Message', failure)}")
+    return not failed
+
+
+@lru_cache(maxsize=16)
+def _redis_pool(host: str, port: int):
+    """
+    Connection pool shared by every Redis adapter for the same server.
+    
+    Responses stay as bytes: payloads are JSON produced by ``fast_json.dumps``
+    and ``loads`` parses bytes directly, so decoding to str first is wasted work.
+    """
+    import redis
+    return redis.ConnectionPool(host=host, port=port, max_connections=32)
+
+
+@lru_cache(maxsize=16)
+def _async_redis_pool(host: str, port: int):
+    """asyncio connection pool shared by every async Redis adapter for the same server (bytes responses)"""
+    import redis.asyncio as aioredis
+    return aioredis.ConnectionPool(host=host, port=port, max_connections=32)
 
 
 class RabbitMQAdapter:
     """RabbitMQ adapter for event-driven context updates"""
     
+    __slots__ = ("context_engine", "host", "port", "connection", "channel", "_batch_channel", "_persistent")
+    
     def __init__(self, context_engine, host: str = 'localhost', port: int = 5672):
         self.context_engine = context_engine
         self.host = host
         self.port = port
         self.connection = None
         self.channel = None
+        self._batch_channel = None
+        self._persistent = None
     
     def connect(self, username: str = 'guest', password: str = 'guest'):
         """Connect to RabbitMQ"""
@@ -34,6 +157,9 @@ class RabbitMQAdapter:
             )
             self.connection = pika.BlockingConnection(parameters)
             self.channel = self.connection.channel()
+            self._batch_channel = None
+            # Built once and reused by every publish
+            self._persistent = pika.BasicProperties(delivery_mode=2, content_type='application/json')
             return True
         except ImportError:
             print("pika not installed. Install with: pip install pika")
@@ -63,14 +189,47 @@ class RabbitMQAdapter:
             self.channel.basic_publish(
                 exchange='',
                 routing_key=queue_name,
-                body=json.dumps(update_data),
-                properties=pika.BasicProperties(delivery_mode=2)  # make message persistent
+                body=dumps(update_data),
+                properties=self._persistent  # make message persistent
             )
             return True
         except Exception as e:
             print(f"Error publishing message: {e}")
             return False
     
+    def publish_batch(self, queue_name: str, updates: List[Dict[str, Any]]):
+        """
+        Publish several persistent context updates with one broker round-trip.
+        
+        Messages are pipelined inside a single AMQP transaction on a dedicated
+        channel and committed once, so the broker acknowledges (and syncs to
+        disk) the whole batch instead of each message.
+        """
+        if not self.connection:
+            return False
+        
+        try:
+            if self._batch_channel is None or self._batch_channel.is_closed:
+                self._batch_channel = self.connection.channel()
+                self._batch_channel.tx_select()
+            
+            for update_data in updates:
+                self._batch_channel.basic_publish(
+                    exchange='',
+                    routing_key=queue_name,
+                    body=dumps(update_data),
+                    properties=self._persistent
+                )
+            self._batch_channel.tx_commit()
+            return True
+        except Exception as e:
+            print(f"Error publishing batch: {e}")
+            try:
+                self._batch_channel.tx_rollback()
+            except Exception:
+                self._batch_channel = None
+            return False
+    
     def consume_context_updates(self, queue_name: str, callback: Callable):
         """Consume context updates from the queue"""
         if not self.channel:
@@ -78,7 +237,7 @@ class RabbitMQAdapter:
         
         def on_message(ch, method, properties, body):
             try:
-                update_data = json.loads(body)
+                update_data = loads(body)
                 callback(update_data)
                 ch.basic_ack(delivery_tag=method.delivery_tag)
             except Exception as e:
@@ -95,22 +254,165 @@ class RabbitMQAdapter:
             return False
 
 
+class AsyncRabbitMQAdapter:
+    """
+    asyncio RabbitMQ adapter built on aio-pika.
+    
+    Same operations as RabbitMQAdapter, but AMQP I/O is awaited instead of
+    blocking, so publishing and consuming do not stall the event loop.
+    """
+    
+    __slots__ = ("context_engine", "host", "port", "connection", "channel")
+    
+    def __init__(self, context_engine, host: str = 'localhost', port: int = 5672):
+        self.context_engine = context_engine
+        self.host = host
+        self.port = port
+        self.connection = None
+        self.channel = None
+    
+    async def connect(self, username: str = 'guest', password: str = 'guest'):
+        """Connect to RabbitMQ (reconnects automatically)"""
+        try:
+            import aio_pika
+            self.connection = await aio_pika.connect_robust(
+                host=self.host,
+                port=self.port,
+                login=username,
+                password=password
+            )
+            self.channel = await self.connection.channel()
+            return True
+        except ImportError:
+            print("aio-pika not installed. Install with: pip install aio-pika")
+            return False
+        except Exception as e:
+            print(f"RabbitMQ connection error: {e}")
+            return False
+    
+    async def declare_queue(self, queue_name: str = 'context_updates'):
+        """Declare a durable queue"""
+        if not self.channel:
+            return None
+        
+        try:
+            return await self.channel.declare_queue(queue_name, durable=True)
+        except Exception as e:
+            print(f"Error declaring queue: {e}")
+            return None
+    
+    async def publish_context_update(self, queue_name: str, update_data: Dict[str, Any]):
+        """Publish a persistent context update to the queue"""
+        if not self.channel:
+            return False
+        
+        try:
+            import aio_pika
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=dumps(update_data),
+                    content_type='application/json',
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                ),
+                routing_key=queue_name
+            )
+            return True
+        except Exception as e:
+            print(f"Error publishing message: {e}")
+            return False
+    
+    async def publish_batch(self, queue_name: str, updates: List[Dict[str, Any]]):
+        """
+        Publish several persistent context updates concurrently.
+        
+        Publisher confirms for the whole batch are awaited together instead of
+        one round-trip per message.
+        """
+        if not self.channel:
+            return False
+        
+        try:
+            import aio_pika
+            exchange = self.channel.default_exchange
+            await asyncio.gather(*(
+                exchange.publish(
+                    aio_pika.Message(
+                        body=dumps(update_data),
+                        content_type='application/json',
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                    ),
+                    routing_key=queue_name
+                )
+                for update_data in updates
+            ))
+            return True
+        except Exception as e:
+            print(f"Error publishing batch: {e}")
+            return False
+    
+    async def consume_context_updates(self, queue_name: str, callback: Callable):
+        """
+        Consume context updates from the queue.
+        
+        ``callback`` may be a plain function or a coroutine function.
+        """
+        if not self.channel:
+            return False
+        
+        try:
+            queue = await self.channel.declare_queue(queue_name, durable=True)
+            async with queue.iterator() as queue_iter:
+                async for message in queue_iter:
+                    try:
+                        update_data = loads(message.body)
+                        result = callback(update_data)
+                        if inspect.isawaitable(result):
+                            await result
+                        await message.ack()
+                    except Exception as e:
+                        print(f"Error processing message: {e}")
+        except Exception as e:
+            print(f"Error consuming messages: {e}")
+            return False
+    
+    async def close(self):
+        """Close the connection"""
+        if self.connection:
+            await self.connection.close()
+            self.connection = None
+            self.channel = None
+
+
 class KafkaAdapter:
     """Apache Kafka adapter for streaming context changes"""
     
+    __slots__ = ("context_engine", "bootstrap_servers", "producer", "consumer")
+    
     def __init__(self, context_engine, bootstrap_servers: str = 'localhost:9092'):
         self.context_engine = context_engine
         self.bootstrap_servers = bootstrap_servers
         self.producer = None
         self.consumer = None
     
-    def create_producer(self):
-        """Create Kafka producer"""
+    def create_producer(self, linger_ms: int = 10, batch_size: int = 64 * 1024, acks: int = 1):
+        """
+        Create Kafka producer.
+        
+        Sends are batched client-side: records wait up to ``linger_ms`` to be
+        coalesced into batches of up to ``batch_size`` bytes, compressed with
+        lz4 when the codec is installed.
+        """
         try:
             from kafka import KafkaProducer
+            compression_type = 'lz4' if importlib.util.find_spec('lz4') else None
             self.producer = KafkaProducer(
                 bootstrap_servers=self.bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v).encode('utf-8')
+                value_serializer=dumps,
+                linger_ms=linger_ms,
+                batch_size=batch_size,
+                compression_type=compression_type,
+                acks=acks,
+                max_in_flight_requests_per_connection=5
             )
             return True
         except ImportError:
@@ -128,7 +430,7 @@ class KafkaAdapter:
                 topic,
                 bootstrap_servers=self.bootstrap_servers,
                 group_id=group_id,
-                value_deserializer=lambda m: json.loads(m.decode('utf-8'))
+                value_deserializer=loads
             )
             return True
         except ImportError:
@@ -144,21 +446,58 @@ class KafkaAdapter:
             return False
         
         try:
+            # Don't wait for the broker: the producer batches and pipelines
+            # sends; delivery failures are reported by the errback.
             future = self.producer.send(topic, value=update_data)
-            future.get(timeout=10)  # Wait for send to complete
+            future.add_errback(self._on_send_error)
             return True
         except Exception as e:
             print(f"Error sending to Kafka: {e}")
             return False
     
-    def consume_context_updates(self, callback: Callable):
-        """Consume context updates from Kafka"""
+    def send_many(self, topic: str, updates: List[Dict[str, Any]], timeout: Optional[float] = 10):
+        """Send several context updates and wait once for the whole batch"""
+        if not self.producer:
+            return False
+        
+        try:
+            for update_data in updates:
+                self.producer.send(topic, value=update_data).add_errback(self._on_send_error)
+            self.producer.flush(timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"Error sending to Kafka: {e}")
+            return False
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Block until all buffered updates have been sent"""
+        if not self.producer:
+            return False
+        
+        try:
+            self.producer.flush(timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"Error flushing Kafka producer: {e}")
+            return False
+    
+    @staticmethod
+    def _on_send_error(exc):
+        print(f"Error sending to Kafka: {exc}")
+    
+    def consume_context_updates(self, callback: Callable, workers: int = LISTENER_WORKERS):
+        """
+        Consume context updates from Kafka.
+        
+        ``callback`` runs on a worker thread while this thread keeps polling,
+        one update at a time and in order. Pass ``workers > 1`` to handle
+        updates concurrently and unordered (the callback must be thread-safe).
+        """
         if not self.consumer:
             return False
         
         try:
-            for message in self.consumer:
-                callback(message.value)
+            _run_callback_workers((message.value for message in self.consumer), callback, workers)
         except Exception as e:
             print(f"Error consuming from Kafka: {e}")
             return False
@@ -167,6 +506,8 @@ class KafkaAdapter:
 class RedisPubSubAdapter:
     """Redis Pub/Sub adapter for real-time agent coordination"""
     
+    __slots__ = ("context_engine", "host", "port", "redis", "pubsub")
+    
     def __init__(self, context_engine, host: str = 'localhost', port: int = 6379):
         self.context_engine = context_engine
         self.host = host
@@ -178,7 +519,7 @@ class RedisPubSubAdapter:
         """Connect to Redis"""
         try:
             import redis
-            self.redis = redis.Redis(host=self.host, port=self.port, decode_responses=True)
+            self.redis = redis.Redis(connection_pool=_redis_pool(self.host, self.port))
             self.pubsub = self.redis.pubsub()
             return self.redis.ping()
         except ImportError:
@@ -206,30 +547,126 @@ class RedisPubSubAdapter:
             return False
         
         try:
-            self.redis.publish(channel, json.dumps(message))
+            self.redis.publish(channel, dumps(message))
             return True
         except Exception as e:
             print(f"Error publishing: {e}")
             return False
     
-    def listen(self, callback: Callable):
-        """Listen for messages"""
+    def listen(self, callback: Callable, workers: int = LISTENER_WORKERS):
+        """
+        Listen for messages.
+        
+        ``callback`` runs on a worker thread while this thread keeps reading,
+        one message at a time and in order. Pass ``workers > 1`` to handle
+        messages concurrently and unordered (the callback must be thread-safe).
+        """
+        if not self.pubsub:
+            return False
+        
+        try:
+            messages = (
+                loads(message['data'])
+                for message in self.pubsub.listen()
+                if message['type'] == 'message'
+            )
+            _run_callback_workers(messages, callback, workers)
+        except Exception as e:
+            print(f"Error listening: {e}")
+            return False
+
+
+class AsyncRedisPubSubAdapter:
+    """
+    asyncio Redis Pub/Sub adapter built on ``redis.asyncio``.
+    
+    Adapters for the same server share one connection pool, and ``listen``
+    awaits messages instead of blocking the event loop.
+    """
+    
+    __slots__ = ("context_engine", "host", "port", "redis", "pubsub")
+    
+    def __init__(self, context_engine, host: str = 'localhost', port: int = 6379):
+        self.context_engine = context_engine
+        self.host = host
+        self.port = port
+        self.redis = None
+        self.pubsub = None
+    
+    async def connect(self):
+        """Connect to Redis"""
+        try:
+            import redis.asyncio as aioredis
+            self.redis = aioredis.Redis(connection_pool=_async_redis_pool(self.host, self.port))
+            self.pubsub = self.redis.pubsub()
+            return await self.redis.ping()
+        except ImportError:
+            print("redis not installed. Install with: pip install redis")
+            return False
+        except Exception as e:
+            print(f"Redis connection error: {e}")
+            return False
+    
+    async def subscribe(self, channel: str):
+        """Subscribe to a channel"""
         if not self.pubsub:
             return False
         
         try:
-            for message in self.pubsub.listen():
+            await self.pubsub.subscribe(channel)
+            return True
+        except Exception as e:
+            print(f"Error subscribing: {e}")
+            return False
+    
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        """Publish message to channel"""
+        if not self.redis:
+            return False
+        
+        try:
+            await self.redis.publish(channel, dumps(message))
+            return True
+        except Exception as e:
+            print(f"Error publishing: {e}")
+            return False
+    
+    async def listen(self, callback: Callable, workers: int = LISTENER_WORKERS):
+        """
+        Listen for messages.
+        
+        ``callback`` may be a plain function or a coroutine function. It runs
+        on a worker task while reading continues, one message at a time and
+        in order. Pass ``workers > 1`` to handle messages concurrently and
+        unordered.
+        """
+        if not self.pubsub:
+            return False
+        
+        async def messages():
+            async for message in self.pubsub.listen():
                 if message['type'] == 'message':
-                    data = json.loads(message['data'])
-                    callback(data)
+                    yield loads(message['data'])
+        
+        try:
+            await _run_callback_tasks(messages(), callback, workers)
         except Exception as e:
             print(f"Error listening: {e}")
             return False
+    
+    async def close(self):
+        """Close the subscription (the shared pool stays open for other adapters)"""
+        if self.pubsub:
+            await self.pubsub.close()
+            self.pubsub = None
+        self.redis = None
 
 
 class AWSSQSAdapter:
     """AWS SQS adapter for cloud-native queue integration"""
     
+    __slots__ = ("context_engine", "region_name", "sqs", "queue_url")
+    
     def __init__(self, context_engine, region_name: str = 'us-east-1'):
         self.context_engine = context_engine
         self.region_name = region_name
@@ -239,8 +676,7 @@ class AWSSQSAdapter:
     def connect(self, queue_name: str):
         """Connect to AWS SQS"""
         try:
-            import boto3
-            self.sqs = boto3.client('sqs', region_name=self.region_name)
+            self.sqs = _aws_client('sqs', self.region_name)
             response = self.sqs.get_queue_url(QueueName=queue_name)
             self.queue_url = response['QueueUrl']
             return True
@@ -259,13 +695,31 @@ class AWSSQSAdapter:
         try:
             response = self.sqs.send_message(
                 QueueUrl=self.queue_url,
-                MessageBody=json.dumps(message_body)
+                MessageBody=dumps(message_body).decode('utf-8')
             )
             return response.get('MessageId') is not None
         except Exception as e:
             print(f"Error sending SQS message: {e}")
             return False
     
+    def send_messages(self, message_bodies: List[Dict[str, Any]]):
+        """Send several messages using SendMessageBatch (10 per API call)"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            ok = True
+            for chunk in _sqs_chunks(message_bodies):
+                response = self.sqs.send_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': str(i), 'MessageBody': dumps(body).decode('utf-8')} for i, body in chunk]
+                )
+                ok = _sqs_failures(response, 'sending') and ok
+            return ok
+        except Exception as e:
+            print(f"Error sending SQS messages: {e}")
+            return False
+    
     def receive_messages(self, max_messages: int = 10, wait_time: int = 20):
         """Receive messages from SQS queue"""
         if not self.sqs or not self.queue_url:
@@ -296,3 +750,151 @@ class AWSSQSAdapter:
         except Exception as e:
             print(f"Error deleting SQS message: {e}")
             return False
+    
+    def delete_messages(self, receipt_handles: List[str]):
+        """Delete several processed messages using DeleteMessageBatch (10 per API call)"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            ok = True
+            for chunk in _sqs_chunks(receipt_handles):
+                response = self.sqs.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': str(i), 'ReceiptHandle': handle} for i, handle in chunk]
+                )
+                ok = _sqs_failures(response, 'deleting') and ok
+            return ok
+        except Exception as e:
+            print(f"Error deleting SQS messages: {e}")
+            return False
+
+
+class AsyncAWSSQSAdapter:
+    """
+    asyncio AWS SQS adapter built on aioboto3.
+    
+    Same operations as AWSSQSAdapter, but long-polling ``receive_messages``
+    suspends the coroutine instead of blocking the event loop for up to
+    ``wait_time`` seconds.
+    """
+    
+    __slots__ = ("context_engine", "region_name", "sqs", "queue_url", "_client_cm")
+    
+    def __init__(self, context_engine, region_name: str = 'us-east-1'):
+        self.context_engine = context_engine
+        self.region_name = region_name
+        self.sqs = None
+        self.queue_url = None
+        self._client_cm = None
+    
+    async def connect(self, queue_name: str):
+        """Connect to AWS SQS"""
+        try:
+            import aioboto3
+            from botocore.config import Config
+            session = aioboto3.Session()
+            self._client_cm = session.client(
+                'sqs',
+                region_name=self.region_name,
+                config=Config(max_pool_connections=50, retries={'max_attempts': 3, 'mode': 'adaptive'})
+            )
+            self.sqs = await self._client_cm.__aenter__()
+            response = await self.sqs.get_queue_url(QueueName=queue_name)
+            self.queue_url = response['QueueUrl']
+            return True
+        except ImportError:
+            print("aioboto3 not installed. Install with: pip install aioboto3")
+            return False
+        except Exception as e:
+            print(f"AWS SQS connection error: {e}")
+            return False
+    
+    async def send_message(self, message_body: Dict[str, Any]):
+        """Send message to SQS queue"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            response = await self.sqs.send_message(
+                QueueUrl=self.queue_url,
+                MessageBody=dumps(message_body).decode('utf-8')
+            )
+            return response.get('MessageId') is not None
+        except Exception as e:
+            print(f"Error sending SQS message: {e}")
+            return False
+    
+    async def send_messages(self, message_bodies: List[Dict[str, Any]]):
+        """Send several messages using SendMessageBatch (10 per API call)"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            ok = True
+            for chunk in _sqs_chunks(message_bodies):
+                response = await self.sqs.send_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': str(i), 'MessageBody': dumps(body).decode('utf-8')} for i, body in chunk]
+                )
+                ok = _sqs_failures(response, 'sending') and ok
+            return ok
+        except Exception as e:
+            print(f"Error sending SQS messages: {e}")
+            return False
+    
+    async def receive_messages(self, max_messages: int = 10, wait_time: int = 20):
+        """Receive messages from SQS queue (long poll)"""
+        if not self.sqs or not self.queue_url:
+            return []
+        
+        try:
+            response = await self.sqs.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=max_messages,
+                WaitTimeSeconds=wait_time
+            )
+            return response.get('Messages', [])
+        except Exception as e:
+            print(f"Error receiving SQS messages: {e}")
+            return []
+    
+    async def delete_message(self, receipt_handle: str):
+        """Delete message from queue after processing"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            await self.sqs.delete_message(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=receipt_handle
+            )
+            return True
+        except Exception as e:
+            print(f"Error deleting SQS message: {e}")
+            return False
+    
+    async def delete_messages(self, receipt_handles: List[str]):
+        """Delete several processed messages using DeleteMessageBatch (10 per API call)"""
+        if not self.sqs or not self.queue_url:
+            return False
+        
+        try:
+            ok = True
+            for chunk in _sqs_chunks(receipt_handles):
+                response = await self.sqs.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': str(i), 'ReceiptHandle': handle} for i, handle in chunk]
+                )
+                ok = _sqs_failures(response, 'deleting') and ok
+            return ok
+        except Exception as e:
+            print(f"Error deleting SQS messages: {e}")
+            return False
+    
+    async def close(self):
+        """Close the underlying aiobotocore client"""
+        if self._client_cm is not None:
+            await self._client_cm.__aexit__(None, None, None)
+            self._client_cm = None
+            self.sqs = None
@@ -6,28 +6,124 @@ Slack notifications and bot integration.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 import asyncio
 import os
 
+from .fast_json import dumps
+from .http_session import get_session
+
 logger = logging.getLogger(__name__)
 
+SLACK_API_URL = "https://slack.com/api"
+
+# Notifications queued within this window are posted together
+NOTIFICATION_COALESCE_SECONDS = 0.05
+# Slack recommends at most 20 attachments per message
+MAX_ATTACHMENTS_PER_POST = 20
+
+# Notification colors by level
+_COLORS = {
+    "info": "#36a64f",
+    "warning": "#ff9800",
+    "error": "#f44336"
+}
+
+# Static Block Kit layout for the interactive UI builder, serialized once
+_UI_BUILDER_BLOCKS = (
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*UI Builder*\nDescribe the UI you want to generate:"
+        }
+    },
+    {
+        "type": "input",
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "ui_description"
+        },
+        "label": {
+            "type": "plain_text",
+            "text": "UI Description"
+        }
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Generate"},
+                "action_id": "generate_ui",
+                "style": "primary"
+            }
+        ]
+    }
+)
+_UI_BUILDER_BLOCKS_JSON = dumps(list(_UI_BUILDER_BLOCKS))
+
+
+_UNKNOWN_COMMAND_RESPONSE = {
+    "response_type": "ephemeral",
+    "text": "Unknown command"
+}
+
+# Slash command name -> handler(self, text, user_id), filled by @_slash_command
+_SLASH_COMMANDS: Dict[str, Callable] = {}
+
+
+def _slash_command(name: str) -> Callable:
+    """Register a SlackIntegration method as the handler for a slash command"""
+    def decorator(func: Callable) -> Callable:
+        _SLASH_COMMANDS[name] = func
+        return func
+    return decorator
+
+
+def _log_task_errors(task: "asyncio.Task") -> None:
+    """Log exceptions from fire-and-forget tasks instead of losing them"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Slack background task failed: %s", task.exception())
+
+
+def _message_body(channel: str, text: str, blocks_json: Optional[bytes]) -> bytes:
+    """Assemble a chat.postMessage body around pre-serialized blocks"""
+    parts = [b'{"channel":', dumps(channel), b',"text":', dumps(text)]
+    if blocks_json is not None:
+        parts += [b',"blocks":', blocks_json]
+    parts.append(b'}')
+    return b''.join(parts)
+
 
 class SlackIntegration:
     """
     Slack integration for notifications and bot functionality.
     """
     
-    def __init__(self, token: Optional[str] = None, webhook_url: Optional[str] = None):
+    __slots__ = ("token", "webhook_url", "post_messages", "_pending_notifications", "_flush_task")
+    
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        webhook_url: Optional[str] = None,
+        post_messages: bool = False
+    ):
         """
         Initialize Slack integration.
         
         Args:
             token: Slack bot token
             webhook_url: Slack webhook URL for simple notifications
+            post_messages: Send ``send_message`` calls to chat.postMessage
+                with the bot token; by default messages are not sent and a
+                stub response is returned
         """
         self.token = token or os.getenv("SLACK_BOT_TOKEN")
         self.webhook_url = webhook_url or os.getenv("SLACK_WEBHOOK_URL")
+        self.post_messages = post_messages
+        self._pending_notifications: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
         
     async def send_message(
         self,
@@ -46,9 +142,32 @@ class SlackIntegration:
         Returns:
             Message response
         """
-        logger.info(f"Sending Slack message to {channel}")
+        logger.info("Sending Slack message to %s", channel)
+        
+        blocks_json = dumps(blocks) if blocks is not None else None
+        return await self._post_message(channel, text, blocks_json)
+    
+    async def _post_message(
+        self,
+        channel: str,
+        text: str,
+        blocks_json: Optional[bytes]
+    ) -> Dict[str, Any]:
+        """Post a message whose blocks are already serialized."""
+        if self.post_messages and self.token:
+            session = await get_session()
+            headers = {
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/json; charset=utf-8",
+            }
+            async with session.post(
+                f"{SLACK_API_URL}/chat.postMessage",
+                data=_message_body(channel, text, blocks_json),
+                headers=headers
+            ) as resp:
+                return await resp.json()
         
-        # In production, use actual Slack API
+        # Offline mode: posting not enabled or no token configured
         return {
             "ok": True,
             "channel": channel,
@@ -72,18 +191,48 @@ class SlackIntegration:
         Returns:
             True if successful
         """
-        logger.info(f"Sending Slack notification: {title}")
+        logger.info("Sending Slack notification: %s", title)
         
-        # Color based on level
-        colors = {
-            "info": "#36a64f",
-            "warning": "#ff9800",
-            "error": "#f44336"
-        }
+        if not self.webhook_url:
+            return True
         
-        # In production, post to webhook
+        # Queue and return immediately; a background task posts everything
+        # queued within the coalescing window in one webhook call.
+        self._pending_notifications.append({
+            "title": title,
+            "text": message,
+            "color": _COLORS.get(level, _COLORS["info"])
+        })
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_notifications())
+            self._flush_task.add_done_callback(_log_task_errors)
         return True
     
+    async def flush_notifications(self) -> None:
+        """Wait until all queued notifications have been posted."""
+        while self._flush_task is not None and not self._flush_task.done():
+            await asyncio.wait({self._flush_task})
+    
+    async def _flush_notifications(self) -> None:
+        """Post queued notifications until the queue is empty."""
+        while self._pending_notifications:
+            await asyncio.sleep(NOTIFICATION_COALESCE_SECONDS)
+            attachments, self._pending_notifications = self._pending_notifications, []
+            
+            session = await get_session()
+            for start in range(0, len(attachments), MAX_ATTACHMENTS_PER_POST):
+                body = dumps({"attachments": attachments[start:start + MAX_ATTACHMENTS_PER_POST]})
+                try:
+                    async with session.post(
+                        self.webhook_url,
+                        data=body,
+                        headers={"Content-Type": "application/json"}
+                    ) as resp:
+                        if resp.status >= 400:
+                            logger.warning("Slack webhook returned HTTP %s", resp.status)
+                except Exception as e:
+                    logger.warning("Slack webhook delivery failed: %s", e)
+    
     async def notify_ui_generated(
         self,
         ui_name: str,
@@ -140,39 +289,7 @@ class SlackIntegration:
         """
         logger.info("Creating interactive UI builder in Slack")
         
-        blocks = [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "*UI Builder*\nDescribe the UI you want to generate:"
-                }
-            },
-            {
-                "type": "input",
-                "element": {
-                    "type": "plain_text_input",
-                    "action_id": "ui_description"
-                },
-                "label": {
-                    "type": "plain_text",
-                    "text": "UI Description"
-                }
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {"type": "plain_text", "text": "Generate"},
-                        "action_id": "generate_ui",
-                        "style": "primary"
-                    }
-                ]
-            }
-        ]
-        
-        return await self.send_message(channel, "UI Builder", blocks)
+        return await self._post_message(channel, "UI Builder", _UI_BUILDER_BLOCKS_JSON)
     
     async def handle_slash_command(
         self,
@@ -191,24 +308,28 @@ class SlackIntegration:
         Returns:
             Response message
         """
-        logger.info(f"Handling slash command: {command} {text}")
-        
-        if command == "/generate-ui":
-            return {
-                "response_type": "in_channel",
-                "text": f"Generating UI: {text}...",
-                "attachments": [
-                    {
-                        "text": "This may take a moment.",
-                        "color": "#36a64f"
-                    }
-                ]
-            }
+        logger.info("Handling slash command: %s %s", command, text)
         
+        handler = self._HANDLERS.get(command)
+        if handler is None:
+            return dict(_UNKNOWN_COMMAND_RESPONSE)
+        return await handler(self, text, user_id)
+    
+    @_slash_command("/generate-ui")
+    async def _handle_generate_ui(self, text: str, user_id: str) -> Dict[str, Any]:
+        """Acknowledge a /generate-ui request."""
         return {
-            "response_type": "ephemeral",
-            "text": "Unknown command"
+            "response_type": "in_channel",
+            "text": f"Generating UI: {text}...",
+            "attachments": [
+                {
+                    "text": "This may take a moment.",
+                    "color": _COLORS["info"]
+                }
+            ]
         }
+    
+    _HANDLERS = _SLASH_COMMANDS
 
 
 # Example usage
@@ -228,6 +349,9 @@ async def example_usage():
     # Create interactive builder
     await slack.create_interactive_ui_builder("#general")
     
+    # Make sure queued notifications are delivered before exiting
+    await slack.flush_notifications()
+    
     print("Slack integration ready")
 
 
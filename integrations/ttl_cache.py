@@ -0,0 +1,68 @@
+"""
+Small in-memory LRU cache with per-entry time-to-live for integrations.
+
+Used to memoize remote API reads (Figma files, GitHub metadata, ...) without
+pulling in the heavier context engine cache.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+
+class TTLCache:
+    """LRU cache whose entries expire ``ttl`` seconds after they are set"""
+    
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept before evicting the LRU one
+            ttl: Time-to-live in seconds (None disables expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` if missing/expired"""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` and return its value (or ``default``)"""
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+    
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
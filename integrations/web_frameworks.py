@@ -8,16 +8,86 @@ Provides middleware and adapters for popular web frameworks:
 - Express.js compatibility
 """
 
-from typing import Any, Callable, Optional
-import json
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import threading
+
+
+class _BackgroundWriter:
+    """
+    Bounded background queue for context writes made by request middleware.
+    
+    Work runs on daemon threads so storing request/response nodes (which may
+    call an embedding API) stays off the response path. When the queue is
+    full the oldest pending job is dropped and its future cancelled. A single
+    worker by default keeps writes to the context engine serialized.
+    """
+    
+    def __init__(self, max_workers: int = 1, max_queue: int = 10_000):
+        self.max_workers = max_workers
+        self._queue: "queue.Queue[Tuple[Future, Callable, tuple]]" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+    
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue ``fn(*args)`` and return a Future for its result"""
+        future: Future = Future()
+        item = (future, fn, args)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    dropped = self._queue.get_nowait()
+                    dropped[0].cancel()
+                except queue.Empty:
+                    pass
+        self._ensure_workers()
+        return future
+    
+    def _ensure_workers(self):
+        if len(self._threads) >= self.max_workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._run, name="context-writer", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def _run(self):
+        while True:
+            future, fn, args = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+_BACKGROUND = _BackgroundWriter()
 
 
 class FlaskContextMiddleware:
     """Flask middleware for automatic context injection"""
     
-    def __init__(self, app, context_engine):
+    __slots__ = ("app", "context_engine", "background")
+    
+    def __init__(self, app, context_engine, background: bool = False):
+        """
+        Args:
+            app: Flask application
+            context_engine: Context engine to store requests/responses in
+            background: Opt in to storing nodes on a background thread. The
+                request node is then exposed as ``g.request_node_future``
+                instead of ``g.request_node``, so handlers that read
+                ``g.request_node`` need the default.
+        """
         self.app = app
         self.context_engine = context_engine
+        self.background = background
         self._setup_middleware()
     
     def _setup_middleware(self):
@@ -28,34 +98,50 @@ class FlaskContextMiddleware:
             # Store context engine in Flask's g object
             g.context_engine = self.context_engine
             
-            # Add request info to context
-            if hasattr(request, 'json') and request.json:
-                node = self.context_engine.add_node_with_text(
-                    json.dumps(request.json),
-                    f"request_{request.endpoint}"
-                )
-                g.request_node = node
+            # Add request info to context: store the raw JSON body as-is
+            # instead of parsing it and serializing it again
+            if request.is_json:
+                raw = request.get_data(cache=True)
+                if raw:
+                    args = (raw.decode('utf-8', 'replace'), f"request_{request.endpoint}")
+                    if self.background:
+                        g.request_node_future = _BACKGROUND.submit(self.context_engine.add_node_with_text, *args)
+                    else:
+                        g.request_node = self.context_engine.add_node_with_text(*args)
         
         @self.app.after_request
         def store_response(response):
             from flask import g
             # Optionally store response in context
-            if hasattr(g, 'request_node') and response.status_code == 200:
+            if (
+                (hasattr(g, 'request_node') or hasattr(g, 'request_node_future'))
+                and response.status_code == 200
+                and response.is_json
+                and not response.is_streamed
+            ):
                 try:
-                    response_data = response.get_json()
-                    if response_data:
-                        self.context_engine.add_node_with_text(
-                            json.dumps(response_data),
-                            f"response_{g.request_node.id}"
-                        )
+                    raw = response.get_data()
+                    if raw:
+                        text = raw.decode('utf-8', 'replace')
+                        if hasattr(g, 'request_node_future'):
+                            _BACKGROUND.submit(self._store_response_node, g.request_node_future, text)
+                        else:
+                            self.context_engine.add_node_with_text(text, f"response_{g.request_node.id}")
                 except Exception:
                     pass
             return response
+    
+    def _store_response_node(self, request_node_future: Future, text: str):
+        """Store a response once its request node exists (background thread)"""
+        request_node = request_node_future.result()
+        return self.context_engine.add_node_with_text(text, f"response_{request_node.id}")
 
 
 class FastAPIContextDependency:
     """FastAPI dependency for context injection"""
     
+    __slots__ = ("context_engine",)
+    
     def __init__(self, context_engine):
         self.context_engine = context_engine
     
@@ -67,6 +153,8 @@ class FastAPIContextDependency:
 class DjangoContextMiddleware:
     """Django middleware for context integration"""
     
+    __slots__ = ("get_response", "context_engine")
+    
     def __init__(self, get_response, context_engine=None):
         self.get_response = get_response
         self.context_engine = context_engine
@@ -84,14 +172,17 @@ class DjangoContextMiddleware:
 class ExpressJSCompatibleAPI:
     """Express.js-style API for Node.js interoperability"""
     
+    __slots__ = ("context_engine", "routes")
+    
     def __init__(self, context_engine):
         self.context_engine = context_engine
-        self.routes = {}
+        # Keyed by (method, path) so lookups don't build a string per request
+        self.routes: Dict[Tuple[str, str], Callable] = {}
     
     def route(self, path: str, method: str = "GET"):
         """Decorator for defining routes"""
         def decorator(func: Callable):
-            self.routes[f"{method}:{path}"] = func
+            self.routes[(method, path)] = func
             return func
         return decorator
     
@@ -101,13 +192,13 @@ class ExpressJSCompatibleAPI:
     
     def get_route_handler(self, path: str, method: str = "GET"):
         """Get handler for a route"""
-        return self.routes.get(f"{method}:{path}")
+        return self.routes.get((method, path))
 
 
 # Factory functions for easy setup
-def setup_flask(app, context_engine):
-    """Setup Flask integration"""
-    return FlaskContextMiddleware(app, context_engine)
+def setup_flask(app, context_engine, background: bool = False):
+    """Setup Flask integration (see FlaskContextMiddleware for ``background``)"""
+    return FlaskContextMiddleware(app, context_engine, background=background)
 
 
 def setup_fastapi(context_engine):
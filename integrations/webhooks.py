@@ -6,15 +6,47 @@ Webhook registration and event delivery.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Callable
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
 import asyncio
 import hashlib
 import hmac
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+from .fast_json import dumps
+from .ttl_cache import TTLCache
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# dataclass(slots=True) needs Python 3.10; older versions keep __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Client errors that a retry cannot fix
+NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404, 410, 422})
+
+
+def _canonical_json(payload: Dict[str, Any]) -> bytes:
+    """Serialize a payload the way it is signed and sent (sorted keys, compact)."""
+    return dumps(payload, sort_keys=True)
+
 
 class WebhookEvent(Enum):
     """Webhook event types."""
@@ -27,18 +59,18 @@ class WebhookEvent(Enum):
     ERROR_OCCURRED = "error.occurred"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Webhook:
     """Represents a webhook registration."""
     id: str
     url: str
-    events: List[str]
+    events: FrozenSet[str]
     secret: Optional[str] = None
     active: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class WebhookDelivery:
     """Represents a webhook delivery attempt."""
     webhook_id: str
@@ -48,6 +80,43 @@ class WebhookDelivery:
     success: bool = False
     error: Optional[str] = None
     attempts: int = 0
+    # Skipped because the same event already reached this webhook recently
+    deduplicated: bool = False
+
+
+@dataclass
+class _CircuitBreaker:
+    """
+    Per-host delivery breaker.
+    
+    CLOSED lets deliveries through. After ``threshold`` consecutive failures
+    it turns OPEN and rejects deliveries until ``cooldown`` has passed, then
+    HALF_OPEN lets a single probe through: success closes it again, failure
+    reopens it.
+    """
+    failures: int = 0
+    opened_at: float = 0.0
+    state: str = "CLOSED"
+    
+    def allow(self, cooldown: float) -> bool:
+        if self.state == "CLOSED":
+            return True
+        # A probe that never reported back does not keep the breaker stuck
+        if time.monotonic() - self.opened_at >= cooldown:
+            self.state = "HALF_OPEN"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = "CLOSED"
+    
+    def record_failure(self, threshold: int) -> None:
+        self.failures += 1
+        if self.state == "HALF_OPEN" or self.failures >= threshold:
+            self.state = "OPEN"
+            self.opened_at = time.monotonic()
 
 
 class WebhookManager:
@@ -55,16 +124,81 @@ class WebhookManager:
     Manages webhook registrations and deliveries.
     """
     
-    def __init__(self):
-        """Initialize webhook manager."""
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        delivery_history_size: int = 10_000,
+        batch_size: int = 16,
+        batch_interval_ms: float = 50,
+        dedupe_ttl: Optional[float] = None,
+        dedupe_size: int = 10_000,
+        per_host_bulkhead: int = 10,
+        request_timeout: float = 5.0,
+        http2: bool = False
+    ):
+        """
+        Initialize webhook manager.
+        
+        Args:
+            max_concurrency: Maximum deliveries in flight at once
+            delivery_history_size: Number of recent deliveries kept for inspection
+            batch_size: Maximum events per POST for ``enqueue_event``
+            batch_interval_ms: How long ``enqueue_event`` batches wait for more events
+            dedupe_ttl: Seconds during which an identical event already
+                delivered to a webhook is skipped by ``trigger_event``
+                (None, the default, delivers every event)
+            dedupe_size: Maximum remembered (webhook, event) pairs
+            per_host_bulkhead: Maximum concurrent requests to a single host
+            request_timeout: End-to-end deadline in seconds for each delivery attempt
+            http2: Deliver through an HTTP/2 ``httpx`` client instead of aiohttp,
+                multiplexing requests to the same receiver over one connection
+                (requires ``pip install httpx[http2]``)
+        """
         self._webhooks: Dict[str, Webhook] = {}
-        self._deliveries: List[WebhookDelivery] = []
+        # event -> webhook ids subscribed to it (dict keys keep registration order)
+        self._by_event: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Recent deliveries only; lifetime totals live in the counters below
+        self._deliveries: "deque[WebhookDelivery]" = deque(maxlen=delivery_history_size)
+        self._total_deliveries = 0
+        self._successful_deliveries = 0
+        self._deduplicated_deliveries = 0
+        self._log_sample = 1000
         self._max_retries = 3
+        self._backoff_base = 0.5
+        self._backoff_cap = 30.0
+        self._breakers: Dict[str, _CircuitBreaker] = {}
+        self._breaker_threshold = 5
+        self._breaker_cooldown = 30.0
+        self._max_concurrency = max_concurrency
+        # Per-webhook queues and drain tasks for enqueue_event
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval_ms / 1000
+        self._event_queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        # (webhook id, event, payload digest) of recent successful deliveries
+        self._recent: Optional[TTLCache] = (
+            TTLCache(maxsize=dedupe_size, ttl=dedupe_ttl) if dedupe_ttl else None
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        # host -> semaphore, so one slow receiver cannot take every slot
+        self._per_host_bulkhead = per_host_bulkhead
+        self._host_bulkheads: Dict[str, asyncio.Semaphore] = {}
+        self._request_timeout = request_timeout
+        # secret -> HMAC keyed with it; copies skip re-deriving the key pads
+        self._hmac_prototypes: Dict[str, "hmac.HMAC"] = {}
+        # Created on first delivery and reused so deliveries to the same
+        # host share keep-alive connections
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http2 = http2
+        self._http2_client: Optional["httpx.AsyncClient"] = None
+        self._http2_client_loop: Optional[asyncio.AbstractEventLoop] = None
         
     def register_webhook(
         self,
         url: str,
-        events: List[str],
+        events: Iterable[str],
         secret: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
@@ -73,14 +207,18 @@ class WebhookManager:
         
         Args:
             url: Webhook URL
-            events: List of events to subscribe to
+            events: Events to subscribe to (stored as a frozenset)
             secret: Optional secret for signature verification
             metadata: Optional metadata
             
         Returns:
             Webhook ID
         """
-        webhook_id = hashlib.sha256(f"{url}{events}".encode()).hexdigest()[:16]
+        events = frozenset(sys.intern(e) for e in events)
+        
+        # Identifier only, not a security boundary: an 8-byte BLAKE2b digest
+        # is cheaper than SHA-256, and sorting makes event order irrelevant
+        webhook_id = hashlib.blake2b(f"{url}{sorted(events)!r}".encode(), digest_size=8).hexdigest()
         
         webhook = Webhook(
             id=webhook_id,
@@ -90,8 +228,11 @@ class WebhookManager:
             metadata=metadata or {}
         )
         
+        self._unindex(webhook_id)
         self._webhooks[webhook_id] = webhook
-        logger.info(f"Registered webhook: {webhook_id} for events {events}")
+        for e in events:
+            self._by_event[e][webhook_id] = None
+        logger.info("Registered webhook: %s for events %s", webhook_id, sorted(events))
         
         return webhook_id
     
@@ -106,11 +247,30 @@ class WebhookManager:
             True if successful
         """
         if webhook_id in self._webhooks:
-            del self._webhooks[webhook_id]
-            logger.info(f"Unregistered webhook: {webhook_id}")
+            self._unindex(webhook_id)
+            secret = self._webhooks.pop(webhook_id).secret
+            if secret and all(w.secret != secret for w in self._webhooks.values()):
+                self._hmac_prototypes.pop(secret, None)
+            worker = self._workers.pop(webhook_id, None)
+            if worker is not None:
+                worker.cancel()
+            self._event_queues.pop(webhook_id, None)
+            logger.info("Unregistered webhook: %s", webhook_id)
             return True
         return False
     
+    def _unindex(self, webhook_id: str) -> None:
+        """Remove a webhook from the event index."""
+        webhook = self._webhooks.get(webhook_id)
+        if webhook is None:
+            return
+        for e in webhook.events:
+            subscribers = self._by_event.get(e)
+            if subscribers is not None:
+                subscribers.pop(webhook_id, None)
+                if not subscribers:
+                    del self._by_event[e]
+    
     async def trigger_event(
         self,
         event: str,
@@ -126,32 +286,199 @@ class WebhookManager:
         Returns:
             List of delivery results
         """
-        logger.info(f"Triggering webhook event: {event}")
+        logger.info("Triggering webhook event: %s", event)
         
         # Find webhooks subscribed to this event
         webhooks = [
-            w for w in self._webhooks.values()
-            if event in w.events and w.active
+            w for w in self.iter_webhooks(event)
+            if w.active
         ]
         
         if not webhooks:
-            logger.debug(f"No webhooks registered for event: {event}")
+            logger.debug("No webhooks registered for event: %s", event)
             return []
         
-        # Deliver to all webhooks
+        # Serialize once for every subscriber; sign once per distinct secret
+        body = _canonical_json({
+            "event": event,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            "data": payload
+        })
+        # Skip subscribers that already received the same event and payload
+        deduped: Dict[str, WebhookDelivery] = {}
+        if self._recent is not None:
+            digest = hashlib.blake2b(dumps(payload, sort_keys=True), digest_size=16).digest()
+            for w in webhooks:
+                if (w.id, event, digest) in self._recent:
+                    deduped[w.id] = WebhookDelivery(
+                        webhook_id=w.id,
+                        event=event,
+                        payload=payload,
+                        success=True,
+                        deduplicated=True
+                    )
+        
+        to_send = [w for w in webhooks if w.id not in deduped]
+        signatures: Dict[str, str] = {}
+        for w in to_send:
+            if w.secret and w.secret not in signatures:
+                signatures[w.secret] = self._sign(body, w.secret)
+        
+        # Deliver to all webhooks concurrently, at most _max_concurrency at a time
+        results = dict(zip(
+            (w.id for w in to_send),
+            await asyncio.gather(
+                *[
+                    self._deliver_bounded(w, event, payload, body, signatures.get(w.secret))
+                    for w in to_send
+                ],
+                return_exceptions=True
+            )
+        ))
+        
         deliveries = []
         for webhook in webhooks:
-            delivery = await self._deliver_webhook(webhook, event, payload)
-            deliveries.append(delivery)
-            self._deliveries.append(delivery)
+            result = deduped.get(webhook.id) or results[webhook.id]
+            # Only a delivery that reached the receiver suppresses repeats
+            if (
+                self._recent is not None
+                and isinstance(result, WebhookDelivery)
+                and result.success
+                and not result.deduplicated
+            ):
+                self._recent.set((webhook.id, event, digest), True)
+            if isinstance(result, BaseException):
+                logger.error("Webhook delivery failed: %s", result)
+                result = WebhookDelivery(
+                    webhook_id=webhook.id,
+                    event=event,
+                    payload=payload,
+                    error=str(result)
+                )
+            deliveries.append(result)
+        self._record(deliveries)
         
         return deliveries
     
+    def _record(self, deliveries: List[WebhookDelivery]) -> None:
+        """Add finished deliveries to the history and stats counters."""
+        before = self._total_deliveries
+        self._deliveries.extend(deliveries)
+        skipped = sum(d.deduplicated for d in deliveries)
+        self._deduplicated_deliveries += skipped
+        self._total_deliveries += len(deliveries) - skipped
+        self._successful_deliveries += sum(d.success and not d.deduplicated for d in deliveries)
+        
+        # Periodic summary instead of one INFO line per delivery
+        if self._total_deliveries // self._log_sample > before // self._log_sample:
+            logger.info(
+                "Webhook deliveries: %d total, %d successful",
+                self._total_deliveries, self._successful_deliveries
+            )
+    
+    async def enqueue_event(
+        self,
+        event: str,
+        payload: Dict[str, Any]
+    ) -> int:
+        """
+        Queue an event for batched delivery and return immediately.
+        
+        Each subscriber has a background worker that collects up to
+        ``batch_size`` events, waiting at most ``batch_interval_ms`` after the
+        first one, and posts them together as ``{"batch": [envelope, ...]}``.
+        Use ``trigger_event`` when the caller needs the delivery result.
+        
+        Args:
+            event: Event name
+            payload: Event payload
+            
+        Returns:
+            Number of webhooks the event was queued for
+        """
+        webhooks = [
+            w for w in self.iter_webhooks(event)
+            if w.active
+        ]
+        if not webhooks:
+            logger.debug("No webhooks registered for event: %s", event)
+            return 0
+        
+        envelope = {
+            "event": event,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            "data": payload
+        }
+        loop = asyncio.get_running_loop()
+        for webhook in webhooks:
+            worker = self._workers.get(webhook.id)
+            if worker is None or worker.done() or worker.get_loop() is not loop:
+                self._event_queues[webhook.id] = asyncio.Queue()
+                self._workers[webhook.id] = asyncio.create_task(self._drain_worker(webhook.id))
+            self._event_queues[webhook.id].put_nowait(envelope)
+        
+        return len(webhooks)
+    
+    async def flush_events(self) -> None:
+        """Wait until every event queued with ``enqueue_event`` has been delivered."""
+        for queue in list(self._event_queues.values()):
+            await queue.join()
+    
+    async def _drain_worker(self, webhook_id: str) -> None:
+        """Post queued events for one webhook in batches."""
+        queue = self._event_queues[webhook_id]
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            items = [await queue.get()]
+            deadline = loop.time() + self._batch_interval
+            while len(items) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                webhook = self._webhooks.get(webhook_id)
+                if webhook is not None and webhook.active:
+                    batch = {"batch": items}
+                    body = _canonical_json(batch)
+                    signature = self._sign(body, webhook.secret) if webhook.secret else None
+                    delivery = await self._deliver_bounded(webhook, "batch", batch, body, signature)
+                    self._record([delivery])
+            except Exception as e:
+                logger.error("Webhook batch delivery failed: %s", e)
+            finally:
+                for _ in items:
+                    queue.task_done()
+    
+    async def _deliver_bounded(
+        self,
+        webhook: Webhook,
+        event: str,
+        payload: Dict[str, Any],
+        body: bytes,
+        signature: Optional[str] = None
+    ) -> WebhookDelivery:
+        """Deliver a webhook once a concurrency slot is free."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._semaphore_loop = loop
+            self._host_bulkheads.clear()
+        async with self._semaphore:
+            return await self._deliver_webhook(webhook, event, payload, body, signature)
+    
     async def _deliver_webhook(
         self,
         webhook: Webhook,
         event: str,
-        payload: Dict[str, Any]
+        payload: Dict[str, Any],
+        body: bytes,
+        signature: Optional[str] = None
     ) -> WebhookDelivery:
         """
         Deliver webhook with retries.
@@ -160,6 +487,8 @@ class WebhookManager:
             webhook: Webhook to deliver to
             event: Event name
             payload: Event payload
+            body: Serialized request body
+            signature: HMAC signature of ``body`` for the webhook's secret
             
         Returns:
             Delivery result
@@ -170,47 +499,127 @@ class WebhookManager:
             payload=payload
         )
         
+        if self._http2 and not HTTPX_AVAILABLE:
+            delivery.error = "httpx not installed. Install with: pip install httpx[http2]"
+            logger.error("Webhook delivery failed: %s", delivery.error)
+            return delivery
+        if not self._http2 and not AIOHTTP_AVAILABLE:
+            delivery.error = "aiohttp not installed. Install with: pip install aiohttp"
+            logger.error("Webhook delivery failed: %s", delivery.error)
+            return delivery
+        
+        headers = {"Content-Type": "application/json"}
+        if signature:
+            headers["X-Signature"] = signature
+        
+        host = urlparse(webhook.url).netloc
+        breaker = self._breakers.setdefault(host, _CircuitBreaker())
+        bulkhead = self._host_bulkheads.get(host)
+        if bulkhead is None:
+            bulkhead = self._host_bulkheads[host] = asyncio.Semaphore(self._per_host_bulkhead)
+        
         for attempt in range(self._max_retries):
+            if not breaker.allow(self._breaker_cooldown):
+                # Keep the last real error if earlier attempts were made
+                if delivery.attempts == 0:
+                    delivery.error = "circuit_open"
+                logger.warning("Webhook delivery skipped, circuit open: %s", webhook.id)
+                break
+            
             delivery.attempts = attempt + 1
             
             try:
-                # Prepare payload
-                webhook_payload = {
-                    "event": event,
-                    "timestamp": "2024-01-01T00:00:00Z",
-                    "data": payload
-                }
+                async with bulkhead:
+                    delivery.status_code = await self._post(webhook.url, body, headers)
+                delivery.success = 200 <= delivery.status_code < 300
                 
-                # Add signature if secret is provided
-                if webhook.secret:
-                    signature = self._generate_signature(webhook_payload, webhook.secret)
-                    webhook_payload["signature"] = signature
+                # Any response below 500 means the host itself is healthy
+                if delivery.status_code < 500:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure(self._breaker_threshold)
                 
-                # In production, actually send HTTP POST request
-                # async with aiohttp.ClientSession() as session:
-                #     async with session.post(webhook.url, json=webhook_payload) as resp:
-                #         delivery.status_code = resp.status
-                #         delivery.success = resp.status == 200
+                if delivery.success:
+                    delivery.error = None
+                    logger.debug(
+                        "Webhook delivered: %s (attempt %s/%s)",
+                        webhook.id, attempt + 1, self._max_retries
+                    )
+                    break
                 
-                # Simulated delivery
-                delivery.status_code = 200
-                delivery.success = True
-                
-                logger.info(
-                    f"Webhook delivered: {webhook.id} "
-                    f"(attempt {attempt + 1}/{self._max_retries})"
-                )
-                break
+                delivery.error = f"HTTP {delivery.status_code}"
+                logger.error("Webhook delivery failed: %s", delivery.error)
+                if delivery.status_code in NON_RETRYABLE_STATUS:
+                    break
                 
             except Exception as e:
+                breaker.record_failure(self._breaker_threshold)
                 delivery.error = str(e)
-                logger.error(f"Webhook delivery failed: {e}")
-                
-                if attempt < self._max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                logger.error("Webhook delivery failed: %s", e)
+            
+            if attempt < self._max_retries - 1:
+                # Exponential backoff with full jitter so failing receivers
+                # are not retried by every delivery at the same moment
+                await asyncio.sleep(random.uniform(0, min(self._backoff_cap, self._backoff_base * 2 ** attempt)))
         
         return delivery
     
+    async def _post(self, url: str, body: bytes, headers: Dict[str, str]) -> int:
+        """POST a body with the configured transport and return the status code."""
+        if self._http2:
+            client = self._get_http2_client()
+            response = await client.post(url, content=body, headers=headers)
+            return response.status_code
+        
+        session = await self._get_session()
+        async with session.post(url, data=body, headers=headers) as resp:
+            return resp.status
+    
+    def _get_http2_client(self) -> "httpx.AsyncClient":
+        """Return this manager's HTTP/2 client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        client = self._http2_client
+        if client is None or client.is_closed or self._http2_client_loop is not loop:
+            self._http2_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=self._request_timeout
+            )
+            self._http2_client_loop = loop
+        return self._http2_client
+    
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """Return this manager's delivery session, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._request_timeout)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def aclose(self) -> None:
+        """Stop batch workers and close the delivery clients and their connection pools."""
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._event_queues.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        if self._http2_client is not None and not self._http2_client.is_closed:
+            await self._http2_client.aclose()
+        self._http2_client = None
+        self._http2_client_loop = None
+    
     def _generate_signature(
         self,
         payload: Dict[str, Any],
@@ -226,14 +635,17 @@ class WebhookManager:
         Returns:
             Signature string
         """
-        import json
-        payload_str = json.dumps(payload, sort_keys=True)
-        signature = hmac.new(
-            secret.encode(),
-            payload_str.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
+        return self._sign(_canonical_json(payload), secret)
+    
+    def _sign(self, body: bytes, secret: str) -> str:
+        """HMAC-SHA256 hex digest of an already serialized body."""
+        prototype = self._hmac_prototypes.get(secret)
+        if prototype is None:
+            prototype = hmac.new(secret.encode(), digestmod='sha256')
+            self._hmac_prototypes[secret] = prototype
+        mac = prototype.copy()
+        mac.update(body)
+        return mac.hexdigest()
     
     def verify_signature(
         self,
@@ -255,6 +667,29 @@ class WebhookManager:
         expected_signature = self._generate_signature(payload, secret)
         return hmac.compare_digest(signature, expected_signature)
     
+    def verify_body_signature(
+        self,
+        body: bytes,
+        signature: str,
+        secret: str
+    ) -> bool:
+        """
+        Verify a webhook signature against the raw request body.
+        
+        Preferred over ``verify_signature``: it checks the exact bytes that
+        were signed, so it does not depend on the receiver re-serializing
+        the payload identically.
+        
+        Args:
+            body: Raw request body
+            signature: Value of the X-Signature header
+            secret: Secret key
+            
+        Returns:
+            True if signature is valid
+        """
+        return hmac.compare_digest(signature, self._sign(body, secret))
+    
     def list_webhooks(self, event: Optional[str] = None) -> List[Webhook]:
         """
         List registered webhooks.
@@ -265,12 +700,22 @@ class WebhookManager:
         Returns:
             List of webhooks
         """
-        webhooks = list(self._webhooks.values())
+        return list(self.iter_webhooks(event or None))
+    
+    def iter_webhooks(self, event: Optional[str] = None) -> Iterator[Webhook]:
+        """
+        Iterate registered webhooks without building a list.
         
-        if event:
-            webhooks = [w for w in webhooks if event in w.events]
+        Args:
+            event: Optional event filter
+            
+        Returns:
+            Iterator over webhooks
+        """
+        if event is not None:
+            return map(self._webhooks.__getitem__, self._by_event.get(event, ()))
         
-        return webhooks
+        return iter(self._webhooks.values())
     
     def get_webhook_stats(self) -> Dict[str, Any]:
         """
@@ -281,14 +726,15 @@ class WebhookManager:
         """
         total_webhooks = len(self._webhooks)
         active_webhooks = sum(1 for w in self._webhooks.values() if w.active)
-        total_deliveries = len(self._deliveries)
-        successful_deliveries = sum(1 for d in self._deliveries if d.success)
+        total_deliveries = self._total_deliveries
+        successful_deliveries = self._successful_deliveries
         
         return {
             "total_webhooks": total_webhooks,
             "active_webhooks": active_webhooks,
             "total_deliveries": total_deliveries,
             "successful_deliveries": successful_deliveries,
+            "deduplicated_deliveries": self._deduplicated_deliveries,
             "success_rate": successful_deliveries / total_deliveries if total_deliveries > 0 else 0.0
         }
 
@@ -316,6 +762,8 @@ async def example_usage():
     # Get stats
     stats = manager.get_webhook_stats()
     print(f"Stats: {stats}")
+    
+    await manager.aclose()
 
 
 if __name__ == "__main__":
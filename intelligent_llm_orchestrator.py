@@ -15,13 +15,74 @@ Features:
 """
 
 import os
+import re
+import random
+import logging
 import json
 import time
+import asyncio
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple, Callable
+import struct
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterator, AsyncIterator
 from dataclasses import dataclass, field
 from enum import Enum
+import importlib.util
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from integrations.fast_json import dumps, loads
+from integrations.ttl_cache import TTLCache
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# httpx negotiates HTTP/2 only when the h2 package is installed
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and importlib.util.find_spec('h2') is not None
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# dataclass(slots=True) needs Python 3.10; older versions keep __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Template placeholder, e.g. {task_description}
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+# Cost-aware routing: downgrade when the projected prompt cost exceeds this
+# share of the caller's max_cost, to a cheaper model sharing this share of
+# the current model's strengths
+ROUTING_DOWNGRADE_COST_RATIO = 0.5
+ROUTING_MIN_STRENGTH_OVERLAP = 0.6
+
+# Retry policy for throttled and gateway errors
+RETRY_STATUSES = (429, 502, 503, 504)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+MAX_RETRY_AFTER = 60.0
+
+# Batch API requests are billed at this share of the realtime price
+BATCH_COST_FACTOR = 0.5
+
+# Local model used to compare consensus responses semantically
+CONSENSUS_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+DEFAULT_DISK_CACHE_DIR = os.path.expanduser("~/.cache/llm_orchestrator")
+# Only near-deterministic responses are worth keeping across runs
+DISK_CACHE_MAX_TEMPERATURE = 0.2
 
 
 class TaskType(Enum):
@@ -36,6 +97,14 @@ class TaskType(Enum):
     QUESTION_ANSWER = "question_answer"
     DATA_EXTRACTION = "data_extraction"
     CLASSIFICATION = "classification"
+    
+    @property
+    def bit(self) -> int:
+        """Single-bit flag for this task type, used in strength bitmasks"""
+        return _TASK_BITS[self]
+
+
+_TASK_BITS = {task: 1 << i for i, task in enumerate(TaskType)}
 
 
 class PromptStrategy(Enum):
@@ -49,7 +118,7 @@ class PromptStrategy(Enum):
     INSTRUCTION_FOLLOWING = "instruction_following"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ModelConfig:
     """Configuration for an LLM model"""
     model_id: str
@@ -61,9 +130,17 @@ class ModelConfig:
     context_window: int
     best_temperature: float = 0.7
     supports_functions: bool = False
+    requests_per_minute: int = 60
+    strengths_mask: int = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self):
+        # Bitmask of strengths so task checks and overlaps are integer ops
+        self.strengths_mask = 0
+        for task in self.strengths:
+            self.strengths_mask |= task.bit
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PromptTemplate:
     """Template for prompts"""
     template_id: str
@@ -73,9 +150,17 @@ class PromptTemplate:
     user_prompt_template: str
     examples: List[Dict[str, str]] = field(default_factory=list)
     variables: List[str] = field(default_factory=list)
+    rendered_examples: str = field(default='', init=False, repr=False)
+    
+    def __post_init__(self):
+        # Examples never change after construction, so render them once
+        self.rendered_examples = '\n'.join(
+            f"Input: {ex['input']}\nOutput: {ex['output']}"
+            for ex in self.examples
+        )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class LLMResponse:
     """Response from LLM"""
     model: str
@@ -87,7 +172,16 @@ class LLMResponse:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_SLOTS)
+class LLMChunk:
+    """Incremental piece of a streamed LLM response"""
+    model: str
+    content_delta: str
+    done: bool = False
+    response: Optional[LLMResponse] = None  # Full response, set on the final chunk
+
+
+@dataclass(**_SLOTS)
 class OrchestrationResult:
     """Result from orchestration"""
     task_type: TaskType
@@ -100,6 +194,57 @@ class OrchestrationResult:
     total_latency: float = 0.0
 
 
+class _TokenBucket:
+    """Token bucket shared by sync and async callers; refills ``rate`` tokens per second"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _take(self) -> float:
+        """Take a token if one is available, otherwise return seconds until one is"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+    
+    async def aacquire(self):
+        """Wait without blocking the event loop until a token is available"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def _succeeded(task: "asyncio.Future") -> bool:
+    """Whether a finished task returned a result (not cancelled or failed)"""
+    return not task.cancelled() and task.exception() is None
+
+
+class _SharedRequest:
+    """Async request shared by identical callers; cancelled once none wait for it"""
+    
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
 class IntelligentLLMOrchestrator:
     """
     Advanced orchestration system for OpenRouter API with intelligent prompting.
@@ -113,15 +258,77 @@ class IntelligentLLMOrchestrator:
     - Caching and performance tracking
     """
     
-    def __init__(self, api_key: Optional[str] = None, cache_enabled: bool = True):
-        """Initialize orchestrator"""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_enabled: bool = True,
+        cache_max: int = 10_000,
+        cache_ttl: Optional[float] = 3600.0,
+        disk_cache_dir: Optional[str] = None,
+        embedder: Optional[Callable[[List[str]], Any]] = None,
+        load_default_embedder: bool = False
+    ):
+        """
+        Initialize orchestrator
+        
+        Args:
+            api_key: OpenRouter API key (defaults to OPENROUTER_API_KEY)
+            cache_enabled: Whether to cache responses
+            cache_max: Maximum number of cached responses (LRU eviction)
+            cache_ttl: Seconds a cached response stays valid (None for no expiry)
+            disk_cache_dir: Directory for a persistent response cache shared
+                across runs (e.g. DEFAULT_DISK_CACHE_DIR); requires diskcache
+            embedder: Batch text embedding function used to score consensus;
+                without one, consensus is scored by response length
+            load_default_embedder: Load the local sentence-transformers model
+                CONSENSUS_EMBEDDING_MODEL (if installed) on first consensus
+                when no embedder is given; the first load may download it
+        """
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY', '')
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.cache_enabled = cache_enabled
-        self.cache: Dict[str, LLMResponse] = {}
+        self.cache = TTLCache(maxsize=cache_max, ttl=cache_ttl)
+        # Guards cache and metrics updates from concurrent requests
+        self._lock = threading.RLock()
+        # cache key -> result of the identical request currently in flight
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[str, _SharedRequest] = {}
+        self._disk = None
+        if cache_enabled and disk_cache_dir:
+            if DISKCACHE_AVAILABLE:
+                self._disk = diskcache.Cache(disk_cache_dir, size_limit=2**32)
+            else:
+                logger.warning("diskcache not installed, persistent response cache disabled")
+        
+        # Consensus embedder; the default model is only loaded on request,
+        # on first use, under its own lock so a slow load never holds _lock
+        self._embedder = embedder
+        self._embedder_loaded = embedder is not None or not load_default_embedder
+        self._embedder_lock = threading.Lock()
+        # Async consensus stops early once answers agree this much (None disables)
+        self.early_exit_threshold: Optional[float] = 0.9
+        
+        # Pooled keep-alive connections for synchronous requests
+        self._session = self._create_session()
+        
+        # Shared async HTTP client, created on first async request
+        self._aclient: Optional["httpx.AsyncClient"] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Batch API (OpenAI-compatible; OpenRouter has no batch endpoint)
+        self.batch_base_url = "https://api.openai.com/v1"
+        self.batch_api_key = os.getenv('OPENAI_API_KEY', '')
+        # batch id -> (model key, cache key, temperature) per custom_id
+        self._batches: Dict[str, List[Tuple[str, str, float]]] = {}
         
         # Model configurations
         self.models = self._initialize_models()
+        self._index_models()
+        # Per-model request rate limits
+        self._buckets = {
+            key: _TokenBucket(rate=model.requests_per_minute / 60, capacity=model.requests_per_minute)
+            for key, model in self.models.items()
+        }
         
         # Prompt templates
         self.prompt_templates = self._initialize_prompt_templates()
@@ -132,13 +339,17 @@ class IntelligentLLMOrchestrator:
             'cache_hits': 0,
             'total_cost': 0.0,
             'avg_latency': 0.0,
+            'routing_downgrades': 0,
+            'prefix_cache_tokens': 0,
+            'early_exits': 0,
+            'tokens_saved': 0,
             'model_usage': {}
         }
         
-        print(f"✓ Intelligent LLM Orchestrator initialized")
-        print(f"  Available models: {len(self.models)}")
-        print(f"  Prompt templates: {len(self.prompt_templates)}")
-        print(f"  Caching: {'Enabled' if cache_enabled else 'Disabled'}")
+        logger.info(
+            "Intelligent LLM Orchestrator initialized (%d models, %d prompt templates, caching %s)",
+            len(self.models), len(self.prompt_templates), 'enabled' if cache_enabled else 'disabled'
+        )
     
     def _initialize_models(self) -> Dict[str, ModelConfig]:
         """Initialize model configurations"""
@@ -408,55 +619,109 @@ Answer: Based on my analysis, the solution is...""",
         
         return templates
     
+    def _index_models(self):
+        """Precompute per-task model lists used for routing"""
+        # Declaration order, used to pick consensus panels
+        self._task_models: Dict[TaskType, List[str]] = {
+            task: [key for key, model in self.models.items() if model.strengths_mask & task.bit]
+            for task in TaskType
+        }
+        # Same lists sorted by cost, with parallel cost lists for budget bisection
+        self._by_task: Dict[TaskType, List[str]] = {
+            task: sorted(keys, key=lambda k: self.models[k].cost_per_1k_tokens)
+            for task, keys in self._task_models.items()
+        }
+        self._task_costs: Dict[TaskType, List[float]] = {
+            task: [self.models[k].cost_per_1k_tokens for k in keys]
+            for task, keys in self._by_task.items()
+        }
+        self._cheapest_model = min(self.models, key=lambda k: self.models[k].cost_per_1k_tokens)
+    
     def select_best_model(
         self,
         task_type: TaskType,
         complexity: str = 'medium',
-        budget: Optional[float] = None
+        budget: Optional[float] = None,
+        prompt_text: Optional[str] = None,
+        max_cost: Optional[float] = None
     ) -> str:
         """
         Select the best model for a given task.
         
+        When ``prompt_text`` and ``max_cost`` are given, a model whose
+        projected prompt cost exceeds half of ``max_cost`` is downgraded to
+        the next cheaper suitable model with nearly the same strengths.
+        
         Args:
             task_type: Type of task
             complexity: 'low', 'medium', or 'high'
             budget: Optional budget constraint (cost per 1k tokens)
+            prompt_text: Optional prompt, used to project the request cost
+            max_cost: Optional spend limit for this request (dollars)
             
         Returns:
             Model key
         """
-        # Filter models by task strength
-        suitable_models = [
-            (key, model) for key, model in self.models.items()
-            if task_type in model.strengths
-        ]
+        # Models strong at this task, sorted by cost
+        candidates = self._by_task.get(task_type)
         
-        if not suitable_models:
+        if not candidates:
             # Fallback to GPT-4 for unknown tasks
             return 'gpt-4-turbo'
         
         # Apply budget constraint
-        if budget:
-            suitable_models = [
-                (key, model) for key, model in suitable_models
-                if model.cost_per_1k_tokens <= budget
-            ]
+        costs = self._task_costs[task_type]
+        count = bisect_right(costs, budget) if budget else len(candidates)
         
-        if not suitable_models:
+        if not count:
             # Return cheapest model if budget too low
-            return min(self.models.items(), key=lambda x: x[1].cost_per_1k_tokens)[0]
+            return self._cheapest_model
         
         # Select based on complexity
         if complexity == 'high':
-            # Choose most capable (usually most expensive)
-            return max(suitable_models, key=lambda x: x[1].cost_per_1k_tokens)[0]
+            # Choose most capable (usually most expensive); first of any tie
+            index = bisect_left(costs, costs[count - 1])
         elif complexity == 'low':
             # Choose cheapest suitable model
-            return min(suitable_models, key=lambda x: x[1].cost_per_1k_tokens)[0]
+            index = 0
         else:
             # Choose middle ground
-            sorted_models = sorted(suitable_models, key=lambda x: x[1].cost_per_1k_tokens)
-            return sorted_models[len(sorted_models) // 2][0]
+            index = count // 2
+        
+        if prompt_text and max_cost:
+            index = self._downgrade_for_cost(candidates, costs, index, prompt_text, max_cost)
+        
+        return candidates[index]
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimate number of tokens in text (rough approximation)"""
+        # Rough estimate: ~4 characters per token for English text
+        return len(text) // 4
+    
+    def _downgrade_for_cost(
+        self,
+        candidates: List[str],
+        costs: List[float],
+        index: int,
+        prompt_text: str,
+        max_cost: float
+    ) -> int:
+        """Step down to cheaper, similarly capable models while the projected cost is high"""
+        tokens = self._estimate_tokens(prompt_text)
+        start = index
+        while index > 0 and tokens / 1000 * costs[index] > max_cost * ROUTING_DOWNGRADE_COST_RATIO:
+            current = self.models[candidates[index]].strengths_mask
+            cheaper = self.models[candidates[index - 1]].strengths_mask
+            if bin(current & cheaper).count('1') / bin(current).count('1') < ROUTING_MIN_STRENGTH_OVERLAP:
+                break
+            index -= 1
+        
+        if index != start:
+            logger.info("Routing %s -> %s (~%d prompt tokens)", candidates[start], candidates[index], tokens)
+            with self._lock:
+                self.metrics['routing_downgrades'] += 1
+        return index
     
     def build_prompt(
         self,
@@ -484,29 +749,162 @@ Answer: Based on my analysis, the solution is...""",
         if missing:
             raise ValueError(f"Missing required variables: {missing}")
         
-        # Build user prompt
-        user_prompt = template.user_prompt_template
-        for var, value in variables.items():
-            user_prompt = user_prompt.replace(f'{{{var}}}', str(value))
+        values = dict(variables)
         
         # Add examples if few-shot
         if include_examples and template.strategy == PromptStrategy.FEW_SHOT and template.examples:
-            examples_text = '\n'.join([
-                f"Input: {ex['input']}\nOutput: {ex['output']}"
-                for ex in template.examples
-            ])
-            user_prompt = user_prompt.replace('{examples}', examples_text)
+            values.setdefault('examples', template.rendered_examples)
+        
+        # Build user prompt in a single pass; unknown placeholders and
+        # placeholders inside substituted values are left untouched
+        def substitute(match: re.Match) -> str:
+            name = match.group(1)
+            return str(values[name]) if name in values else match.group(0)
+        
+        user_prompt = _PLACEHOLDER.sub(substitute, template.user_prompt_template)
         
         return template.system_prompt, user_prompt
     
     def _get_cache_key(self, model: str, messages: List[Dict], temperature: float) -> str:
         """Generate cache key for request"""
-        content = json.dumps({
-            'model': model,
+        # Hash the fields directly instead of serializing to JSON first;
+        # length prefixes keep field boundaries unambiguous.
+        digest = hashlib.blake2b(struct.pack('<d', temperature), digest_size=16)
+        for part in (model, *(text for m in messages for text in (m['role'], m['content']))):
+            data = part.encode('utf-8')
+            digest.update(struct.pack('<I', len(data)))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def _prepare_request(
+        self,
+        model_key: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float],
+        max_tokens: int,
+        fallback_models: Optional[List[str]] = None
+    ) -> Tuple[ModelConfig, str, Dict[str, Any]]:
+        """Resolve the model and build the cache key and request body"""
+        model_config = self.models.get(model_key)
+        if not model_config:
+            raise ValueError(f"Model '{model_key}' not found")
+        
+        # Build messages
+        messages = [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': user_prompt}
+        ]
+        
+        # Use model's best temperature if not specified
+        temp = temperature if temperature is not None else model_config.best_temperature
+        
+        cache_key = self._get_cache_key(model_config.model_id, messages, temp)
+        
+        if model_config.provider == 'Anthropic':
+            # Mark the static system prompt as a cacheable prefix; OpenAI
+            # models cache matching prefixes automatically
+            messages[0] = {
+                'role': 'system',
+                'content': [{
+                    'type': 'text',
+                    'text': system_prompt,
+                    'cache_control': {'type': 'ephemeral'}
+                }]
+            }
+        
+        payload = {
+            'model': model_config.model_id,
             'messages': messages,
-            'temperature': temperature
-        }, sort_keys=True)
-        return hashlib.sha256(content.encode()).hexdigest()
+            'temperature': temp,
+            'max_tokens': max_tokens
+        }
+        if fallback_models:
+            # Let OpenRouter fail over server-side instead of round-tripping an error
+            payload['models'] = [model_config.model_id] + [self.models[k].model_id for k in fallback_models]
+            payload['route'] = 'fallback'
+        return model_config, cache_key, payload
+    
+    def _cached_response(self, model_config: ModelConfig, cache_key: str) -> Optional[LLMResponse]:
+        """Return the cached response for a request, if any"""
+        if not self.cache_enabled:
+            return None
+        with self._lock:
+            cached = self.cache.get(cache_key)
+        if cached is None and self._disk is not None:
+            # Second chance: a response persisted by an earlier run
+            cached = self._disk.get(cache_key)
+            if cached is not None:
+                with self._lock:
+                    self.cache.set(cache_key, cached)
+        if cached is not None:
+            with self._lock:
+                self.metrics['cache_hits'] += 1
+            logger.debug("Cache hit for %s", model_config.display_name)
+        return cached
+    
+    def _request_headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+    
+    def _record_response(
+        self,
+        model_key: str,
+        model_config: ModelConfig,
+        cache_key: str,
+        result: Dict[str, Any],
+        latency: float,
+        temperature: float,
+        cost_factor: float = 1.0
+    ) -> LLMResponse:
+        """
+        Turn an API result into an LLMResponse and update cache and metrics.
+        
+        ``cost_factor`` scales the list price, e.g. BATCH_COST_FACTOR for
+        Batch API results.
+        """
+        content = result['choices'][0]['message']['content']
+        usage = result.get('usage') or {}
+        tokens_used = usage.get('total_tokens', 0)
+        prefix_cache_tokens = (
+            usage.get('cache_read_input_tokens')
+            or (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+            or 0
+        )
+        cost = (tokens_used / 1000) * model_config.cost_per_1k_tokens * cost_factor
+        
+        llm_response = LLMResponse(
+            model=model_config.display_name,
+            content=content,
+            tokens_used=tokens_used,
+            latency=latency,
+            cost=cost,
+            metadata={
+                'model_id': model_config.model_id,
+                'provider': model_config.provider,
+                'temperature': temperature,
+                # Differs from model_id when a fallback model answered
+                'served_by': result.get('model', model_config.model_id)
+            }
+        )
+        
+        with self._lock:
+            # Cache response
+            if self.cache_enabled:
+                self.cache.set(cache_key, llm_response)
+            
+            # Update metrics
+            self.metrics['total_requests'] += 1
+            self.metrics['total_cost'] += cost
+            self.metrics['prefix_cache_tokens'] += prefix_cache_tokens
+            self.metrics['model_usage'][model_key] = self.metrics['model_usage'].get(model_key, 0) + 1
+        
+        if self._disk is not None and temperature <= DISK_CACHE_MAX_TEMPERATURE:
+            self._disk.set(cache_key, llm_response)
+        
+        return llm_response
     
     def execute_llm_request(
         self,
@@ -514,7 +912,8 @@ Answer: Based on my analysis, the solution is...""",
         system_prompt: str,
         user_prompt: str,
         temperature: Optional[float] = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        fallback_models: Optional[List[str]] = None
     ) -> LLMResponse:
         """
         Execute LLM request with caching.
@@ -525,88 +924,498 @@ Answer: Based on my analysis, the solution is...""",
             user_prompt: User prompt
             temperature: Optional temperature override
             max_tokens: Maximum tokens to generate
+            fallback_models: Optional model keys OpenRouter tries, in order,
+                if the primary model is unavailable
             
         Returns:
             LLM response
         """
-        model_config = self.models.get(model_key)
-        if not model_config:
-            raise ValueError(f"Model '{model_key}' not found")
+        model_config, cache_key, payload = self._prepare_request(
+            model_key, system_prompt, user_prompt, temperature, max_tokens, fallback_models
+        )
         
-        # Build messages
-        messages = [
-            {'role': 'system', 'content': system_prompt},
-            {'role': 'user', 'content': user_prompt}
-        ]
+        # Check cache
+        cached = self._cached_response(model_config, cache_key)
+        if cached is not None:
+            return cached
         
-        # Use model's best temperature if not specified
-        temp = temperature if temperature is not None else model_config.best_temperature
+        if not self.cache_enabled:
+            return self._post_request(model_key, model_config, cache_key, payload)
         
-        # Check cache
-        cache_key = self._get_cache_key(model_config.model_id, messages, temp)
-        if self.cache_enabled and cache_key in self.cache:
-            self.metrics['cache_hits'] += 1
-            print(f"  ⚡ Cache hit for {model_config.display_name}")
-            return self.cache[cache_key]
+        # Share the result of an identical request that is already running
+        with self._lock:
+            cached = self.cache.get(cache_key)
+            future = self._inflight.get(cache_key)
+            leader = cached is None and future is None
+            if leader:
+                future = self._inflight[cache_key] = Future()
+        if cached is not None:
+            return cached
+        if not leader:
+            return future.result()
         
-        # Execute request
+        try:
+            response = self._post_request(model_key, model_config, cache_key, payload)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[cache_key]
+    
+    def _post_request(
+        self,
+        model_key: str,
+        model_config: ModelConfig,
+        cache_key: str,
+        payload: Dict[str, Any]
+    ) -> LLMResponse:
+        """Send a prepared request and record the response"""
         start_time = time.time()
         
         try:
-            response = requests.post(
+            self._buckets[model_key].acquire()
+            response = self._session.post(
                 self.base_url,
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': model_config.model_id,
-                    'messages': messages,
-                    'temperature': temp,
-                    'max_tokens': max_tokens
-                },
+                headers=self._request_headers(),
+                data=dumps(payload),
                 timeout=60
             )
             
             latency = time.time() - start_time
             
             if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                tokens_used = result.get('usage', {}).get('total_tokens', 0)
-                cost = (tokens_used / 1000) * model_config.cost_per_1k_tokens
-                
-                llm_response = LLMResponse(
-                    model=model_config.display_name,
-                    content=content,
-                    tokens_used=tokens_used,
-                    latency=latency,
-                    cost=cost,
-                    metadata={
-                        'model_id': model_config.model_id,
-                        'provider': model_config.provider,
-                        'temperature': temp
-                    }
+                return self._record_response(
+                    model_key, model_config, cache_key, loads(response.content), latency, payload['temperature']
                 )
-                
-                # Cache response
-                if self.cache_enabled:
-                    self.cache[cache_key] = llm_response
-                
-                # Update metrics
-                self.metrics['total_requests'] += 1
-                self.metrics['total_cost'] += cost
-                self.metrics['model_usage'][model_key] = self.metrics['model_usage'].get(model_key, 0) + 1
-                
-                return llm_response
             
             else:
                 raise Exception(f"API error: {response.status_code} - {response.text}")
         
         except Exception as e:
-            print(f"  ❌ Request failed: {e}")
+            logger.error("Request failed: %s", e)
             raise
     
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a pooled HTTP session that retries throttled and gateway errors"""
+        session = requests.Session()
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self._session.close()
+    
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """Return the shared async HTTP client, creating it on first use"""
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx not installed. Install with: pip install httpx")
+        
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient.is_closed or self._aclient_loop is not loop:
+            self._aclient = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=60,
+                http2=HTTP2_AVAILABLE
+            )
+            self._aclient_loop = loop
+        return self._aclient
+    
+    async def aclose(self):
+        """Close the shared async HTTP client"""
+        if self._aclient is not None and not self._aclient.is_closed:
+            await self._aclient.aclose()
+        self._aclient = None
+        self._aclient_loop = None
+    
+    async def _aexecute_llm_request(
+        self,
+        model_key: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: int = 2000,
+        fallback_models: Optional[List[str]] = None
+    ) -> LLMResponse:
+        """Async version of execute_llm_request using the shared httpx client"""
+        model_config, cache_key, payload = self._prepare_request(
+            model_key, system_prompt, user_prompt, temperature, max_tokens, fallback_models
+        )
+        
+        # Check cache
+        cached = self._cached_response(model_config, cache_key)
+        if cached is not None:
+            return cached
+        
+        if not self.cache_enabled:
+            return await self._apost_request(model_key, model_config, cache_key, payload)
+        
+        # Identical requests on this loop share one POST task. Every caller,
+        # the first included, awaits it through a shield, so cancelling one
+        # caller leaves the others waiting; the task itself is cancelled only
+        # when no caller is left
+        loop = asyncio.get_running_loop()
+        shared = self._ainflight.get(cache_key)
+        if shared is None or shared.task.get_loop() is not loop:
+            task = loop.create_task(self._apost_request(model_key, model_config, cache_key, payload))
+            shared = self._ainflight[cache_key] = _SharedRequest(task)
+            
+            def forget(_, entry=shared):
+                if self._ainflight.get(cache_key) is entry:
+                    del self._ainflight[cache_key]
+            task.add_done_callback(forget)
+        
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                shared.task.cancel()
+    
+    async def _apost_request(
+        self,
+        model_key: str,
+        model_config: ModelConfig,
+        cache_key: str,
+        payload: Dict[str, Any]
+    ) -> LLMResponse:
+        """Async version of _post_request"""
+        start_time = time.time()
+        
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                await self._buckets[model_key].aacquire()
+                response = await self._get_async_client().post(
+                    self.base_url,
+                    headers=self._request_headers(),
+                    content=dumps(payload)
+                )
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    break
+                await asyncio.sleep(self._retry_delay(response.headers.get('Retry-After'), attempt))
+            
+            latency = time.time() - start_time
+            
+            if response.status_code == 200:
+                return self._record_response(
+                    model_key, model_config, cache_key, loads(response.content), latency, payload['temperature']
+                )
+            
+            else:
+                raise Exception(f"API error: {response.status_code} - {response.text}")
+        
+        except Exception as e:
+            logger.error("Request failed: %s", e)
+            raise
+    
+    @staticmethod
+    def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+        """Seconds to wait before retrying: the server's Retry-After, else jittered backoff"""
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        except (TypeError, ValueError):
+            return random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+    
+    @staticmethod
+    def _parse_stream_line(line: str) -> Optional[Dict[str, Any]]:
+        """Decode one server-sent event line, ignoring comments and the end marker"""
+        if not line.startswith('data:'):
+            return None
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return None
+        return loads(data)
+    
+    def _finish_stream(
+        self,
+        model_key: str,
+        model_config: ModelConfig,
+        cache_key: str,
+        parts: List[str],
+        usage: Dict[str, Any],
+        latency: float,
+        temperature: float
+    ) -> LLMChunk:
+        """Record a completed stream like a regular response and build the final chunk"""
+        result = {'choices': [{'message': {'content': ''.join(parts)}}], 'usage': usage}
+        response = self._record_response(model_key, model_config, cache_key, result, latency, temperature)
+        return LLMChunk(model=model_config.display_name, content_delta='', done=True, response=response)
+    
+    def stream_llm_request(
+        self,
+        model_key: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: int = 2000
+    ) -> Iterator[LLMChunk]:
+        """
+        Execute LLM request, yielding content as it is generated.
+        
+        The final chunk has ``done`` set and carries the full LLMResponse,
+        which is cached like a regular response. Cache hits are yielded as a
+        single final chunk.
+        
+        Args:
+            model_key: Key of model to use
+            system_prompt: System prompt
+            user_prompt: User prompt
+            temperature: Optional temperature override
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            LLMChunk objects
+        """
+        model_config, cache_key, payload = self._prepare_request(
+            model_key, system_prompt, user_prompt, temperature, max_tokens
+        )
+        
+        cached = self._cached_response(model_config, cache_key)
+        if cached is not None:
+            yield LLMChunk(model=cached.model, content_delta=cached.content, done=True, response=cached)
+            return
+        
+        payload['stream'] = True
+        start_time = time.time()
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        
+        try:
+            self._buckets[model_key].acquire()
+            with self._session.post(
+                self.base_url,
+                headers=self._request_headers(),
+                data=dumps(payload),
+                stream=True,
+                timeout=60
+            ) as response:
+                if response.status_code != 200:
+                    raise Exception(f"API error: {response.status_code} - {response.text}")
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    event = self._parse_stream_line(line or '')
+                    if event is None:
+                        continue
+                    usage = event.get('usage') or usage
+                    choices = event.get('choices') or [{}]
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        parts.append(delta)
+                        yield LLMChunk(model=model_config.display_name, content_delta=delta)
+        
+        except Exception as e:
+            logger.error("Request failed: %s", e)
+            raise
+        
+        yield self._finish_stream(
+            model_key, model_config, cache_key, parts, usage, time.time() - start_time, payload['temperature']
+        )
+    
+    async def astream_llm_request(
+        self,
+        model_key: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[LLMChunk]:
+        """Async version of stream_llm_request using the shared httpx client"""
+        model_config, cache_key, payload = self._prepare_request(
+            model_key, system_prompt, user_prompt, temperature, max_tokens
+        )
+        
+        cached = self._cached_response(model_config, cache_key)
+        if cached is not None:
+            yield LLMChunk(model=cached.model, content_delta=cached.content, done=True, response=cached)
+            return
+        
+        payload['stream'] = True
+        start_time = time.time()
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        
+        try:
+            await self._buckets[model_key].aacquire()
+            async with self._get_async_client().stream(
+                'POST',
+                self.base_url,
+                headers=self._request_headers(),
+                content=dumps(payload)
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise Exception(f"API error: {response.status_code} - {response.text}")
+                
+                async for line in response.aiter_lines():
+                    event = self._parse_stream_line(line)
+                    if event is None:
+                        continue
+                    usage = event.get('usage') or usage
+                    choices = event.get('choices') or [{}]
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        parts.append(delta)
+                        yield LLMChunk(model=model_config.display_name, content_delta=delta)
+        
+        except Exception as e:
+            logger.error("Request failed: %s", e)
+            raise
+        
+        yield self._finish_stream(
+            model_key, model_config, cache_key, parts, usage, time.time() - start_time, payload['temperature']
+        )
+    
+    def _batch_headers(self) -> Dict[str, str]:
+        return {'Authorization': f'Bearer {self.batch_api_key}'}
+    
+    def submit_batch(
+        self,
+        model_key: str,
+        prompts: List[Tuple[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: int = 2000
+    ) -> str:
+        """
+        Submit prompts through the OpenAI Batch API for offline workloads.
+        
+        Batch requests cost about half as much as realtime requests and
+        complete within 24 hours. Collect results with ``poll_batch``, which
+        also fills the response cache so later realtime requests for the
+        same prompts are cache hits. Only OpenAI models are supported.
+        
+        Args:
+            model_key: Key of model to use
+            prompts: List of (system_prompt, user_prompt) pairs
+            temperature: Optional temperature override
+            max_tokens: Maximum tokens to generate per prompt
+            
+        Returns:
+            Batch ID
+        """
+        model_config = self.models.get(model_key)
+        if not model_config:
+            raise ValueError(f"Model '{model_key}' not found")
+        if model_config.provider != 'OpenAI':
+            raise ValueError(f"Batch mode is only available for OpenAI models, not '{model_key}'")
+        
+        entries = []
+        lines = []
+        for i, (system_prompt, user_prompt) in enumerate(prompts):
+            _, cache_key, payload = self._prepare_request(
+                model_key, system_prompt, user_prompt, temperature, max_tokens
+            )
+            # The Batch API takes OpenAI's own model name, without the OpenRouter prefix
+            payload['model'] = model_config.model_id.split('/', 1)[-1]
+            entries.append((model_key, cache_key, payload['temperature']))
+            lines.append(dumps({
+                'custom_id': str(i),
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': payload
+            }))
+        
+        upload = self._session.post(
+            f"{self.batch_base_url}/files",
+            headers=self._batch_headers(),
+            data={'purpose': 'batch'},
+            files={'file': ('batch.jsonl', b'\n'.join(lines))},
+            timeout=60
+        )
+        if upload.status_code != 200:
+            raise Exception(f"Batch upload error: {upload.status_code} - {upload.text}")
+        
+        batch = self._session.post(
+            f"{self.batch_base_url}/batches",
+            headers=self._batch_headers(),
+            json={
+                'input_file_id': upload.json()['id'],
+                'endpoint': '/v1/chat/completions',
+                'completion_window': '24h'
+            },
+            timeout=60
+        )
+        if batch.status_code != 200:
+            raise Exception(f"Batch create error: {batch.status_code} - {batch.text}")
+        
+        batch_id = batch.json()['id']
+        self._batches[batch_id] = entries
+        logger.info("Submitted batch %s (%d prompts to %s)", batch_id, len(entries), model_config.display_name)
+        return batch_id
+    
+    def poll_batch(self, batch_id: str) -> Optional[List[Optional[LLMResponse]]]:
+        """
+        Check a batch submitted with ``submit_batch``.
+        
+        Args:
+            batch_id: Batch ID
+            
+        Returns:
+            None while the batch is still running, otherwise one response per
+            submitted prompt (None for prompts that failed)
+        """
+        entries = self._batches.get(batch_id)
+        if entries is None:
+            raise ValueError(f"Unknown batch '{batch_id}'")
+        
+        status = self._session.get(
+            f"{self.batch_base_url}/batches/{batch_id}",
+            headers=self._batch_headers(),
+            timeout=60
+        )
+        if status.status_code != 200:
+            raise Exception(f"Batch status error: {status.status_code} - {status.text}")
+        
+        batch = status.json()
+        if batch['status'] in ('failed', 'expired', 'cancelled'):
+            del self._batches[batch_id]
+            raise Exception(f"Batch {batch_id} {batch['status']}")
+        if batch['status'] != 'completed':
+            return None
+        
+        results: List[Optional[LLMResponse]] = [None] * len(entries)
+        if not batch.get('output_file_id'):
+            # Every request failed; the errors are in batch['error_file_id']
+            del self._batches[batch_id]
+            return results
+        
+        with self._session.get(
+            f"{self.batch_base_url}/files/{batch['output_file_id']}/content",
+            headers=self._batch_headers(),
+            stream=True,
+            timeout=60
+        ) as output:
+            if output.status_code != 200:
+                raise Exception(f"Batch output error: {output.status_code} - {output.text}")
+            for line in output.iter_lines():
+                if not line:
+                    continue
+                record = loads(line)
+                response = record.get('response') or {}
+                if response.get('status_code') != 200:
+                    continue
+                index = int(record['custom_id'])
+                model_key, cache_key, temp = entries[index]
+                results[index] = self._record_response(
+                    model_key, self.models[model_key], cache_key, response['body'], 0.0, temp,
+                    cost_factor=BATCH_COST_FACTOR
+                )
+        
+        del self._batches[batch_id]
+        return results
+    
     def orchestrate_with_consensus(
         self,
         task_type: TaskType,
@@ -618,6 +1427,10 @@ Answer: Based on my analysis, the solution is...""",
         """
         Orchestrate multiple models and synthesize results with consensus.
         
+        Models are queried concurrently, so wall time is roughly that of the
+        slowest model rather than the sum. Use ``aorchestrate_with_consensus``
+        from async code.
+        
         Args:
             task_type: Type of task
             template_id: Prompt template to use
@@ -628,16 +1441,119 @@ Answer: Based on my analysis, the solution is...""",
         Returns:
             Orchestration result with consensus
         """
-        print(f"\n🎭 Multi-Model Orchestration")
-        print(f"{'='*80}")
-        print(f"Task: {task_type.value}")
-        print(f"Strategy: {num_models} models with consensus")
+        suitable_models, system_prompt, user_prompt = self._start_consensus(
+            task_type, template_id, variables, num_models
+        )
+        
+        # Execute requests in parallel on worker threads (an empty panel
+        # has no outcomes and fails in _finish_consensus)
+        with ThreadPoolExecutor(max_workers=max(1, len(suitable_models))) as executor:
+            futures = [
+                executor.submit(
+                    self.execute_llm_request,
+                    model_key,
+                    system_prompt,
+                    user_prompt,
+                    temperature=temperature
+                )
+                for model_key in suitable_models
+            ]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        
+        return self._finish_consensus(task_type, template_id, outcomes)
+    
+    async def aorchestrate_with_consensus(
+        self,
+        task_type: TaskType,
+        template_id: str,
+        variables: Dict[str, str],
+        num_models: int = 3,
+        temperature: float = 0.7,
+        min_responses: Optional[int] = None
+    ) -> OrchestrationResult:
+        """
+        Async version of orchestrate_with_consensus.
+        
+        All models are queried concurrently over the shared httpx client
+        (requires ``pip install httpx``). With ``min_responses`` set, the
+        remaining requests are cancelled as soon as that many models have
+        answered, so one slow model does not hold up the result. When a
+        consensus embedder is available, the remaining requests are also
+        cancelled once two or more answers agree above
+        ``self.early_exit_threshold``.
+        """
+        suitable_models, system_prompt, user_prompt = self._start_consensus(
+            task_type, template_id, variables, num_models
+        )
+        
+        tasks = [
+            asyncio.ensure_future(self._aexecute_llm_request(
+                model_key,
+                system_prompt,
+                user_prompt,
+                temperature=temperature
+            ))
+            for model_key in suitable_models
+        ]
+        
+        # Loading the embedder and encoding answers are blocking CPU work, so
+        # they run in a worker thread while the requests stay in flight
+        early_exit = (
+            self.early_exit_threshold is not None
+            and await asyncio.to_thread(self._get_embedder) is not None
+        )
+        pending = set(tasks)
+        succeeded = 0
+        while pending and (min_responses is None or succeeded < min_responses):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded += sum(1 for task in done if _succeeded(task))
+            
+            if early_exit and pending and succeeded >= 2 and any(_succeeded(task) for task in done):
+                responses = [
+                    task.result() for task in tasks
+                    if task not in pending and _succeeded(task)
+                ]
+                confidence = await asyncio.to_thread(self._calculate_consensus_confidence, responses)
+                if confidence > self.early_exit_threshold:
+                    average_tokens = sum(r.tokens_used for r in responses) / len(responses)
+                    with self._lock:
+                        self.metrics['early_exits'] += 1
+                        self.metrics['tokens_saved'] += int(average_tokens * len(pending))
+                    logger.info("First %d responses agree, skipping the rest", len(responses))
+                    break
+        
+        if pending:
+            logger.info("Cancelling %d slower model(s)", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        # Keep model order so the primary response stays the preferred model
+        outcomes = [
+            (asyncio.CancelledError() if task.cancelled() else task.exception() or task.result())
+            for task in tasks if task not in pending
+        ]
+        
+        # Synthesis scores the final agreement with the embedder as well
+        return await asyncio.to_thread(self._finish_consensus, task_type, template_id, outcomes)
+    
+    def _start_consensus(
+        self,
+        task_type: TaskType,
+        template_id: str,
+        variables: Dict[str, str],
+        num_models: int
+    ) -> Tuple[List[str], str, str]:
+        """Pick the models for a consensus run and build its prompt"""
+        logger.info("Multi-model orchestration: %s with %d-model consensus", task_type.value, num_models)
         
         # Select multiple suitable models
-        suitable_models = [
-            key for key, model in self.models.items()
-            if task_type in model.strengths
-        ][:num_models]
+        suitable_models = self._task_models.get(task_type, [])[:num_models]
         
         if len(suitable_models) < num_models:
             # Fill with general-purpose models
@@ -649,21 +1565,28 @@ Answer: Based on my analysis, the solution is...""",
         # Build prompt
         system_prompt, user_prompt = self.build_prompt(template_id, variables)
         
-        # Execute requests in parallel (simulated)
-        responses = []
         for model_key in suitable_models:
-            print(f"\n  📡 Querying {self.models[model_key].display_name}...")
-            try:
-                response = self.execute_llm_request(
-                    model_key,
-                    system_prompt,
-                    user_prompt,
-                    temperature=temperature
+            logger.info("Querying %s", self.models[model_key].display_name)
+        
+        return suitable_models, system_prompt, user_prompt
+    
+    def _finish_consensus(
+        self,
+        task_type: TaskType,
+        template_id: str,
+        outcomes: List[Any]
+    ) -> OrchestrationResult:
+        """Synthesize per-model outcomes (responses or exceptions) into a result"""
+        responses = []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                logger.warning("Skipped due to error: %s", outcome)
+            else:
+                responses.append(outcome)
+                logger.info(
+                    "Response received from %s (%d tokens, %.2fs)",
+                    outcome.model, outcome.tokens_used, outcome.latency
                 )
-                responses.append(response)
-                print(f"  ✓ Response received ({response.tokens_used} tokens, {response.latency:.2f}s)")
-            except Exception as e:
-                print(f"  ⚠ Skipped due to error: {e}")
         
         if not responses:
             raise Exception("All model requests failed")
@@ -676,10 +1599,10 @@ Answer: Based on my analysis, the solution is...""",
         confidence = 0.7
         
         if len(responses) > 1:
-            print(f"\n  🔄 Synthesizing {len(responses)} responses...")
+            logger.info("Synthesizing %d responses", len(responses))
             synthesized = self._synthesize_responses(responses, task_type)
             confidence = self._calculate_consensus_confidence(responses)
-            print(f"  ✓ Synthesis complete (confidence: {confidence:.0%})")
+            logger.info("Synthesis complete (confidence: %.0f%%)", confidence * 100)
         
         result = OrchestrationResult(
             task_type=task_type,
@@ -692,11 +1615,10 @@ Answer: Based on my analysis, the solution is...""",
             total_latency=max(r.latency for r in responses)
         )
         
-        print(f"\n{'='*80}")
-        print(f"✅ Orchestration complete!")
-        print(f"  Total cost: ${result.total_cost:.4f}")
-        print(f"  Max latency: {result.total_latency:.2f}s")
-        print(f"  Confidence: {result.confidence:.0%}")
+        logger.info(
+            "Orchestration complete: cost $%.4f, max latency %.2fs, confidence %.0f%%",
+            result.total_cost, result.total_latency, result.confidence * 100
+        )
         
         return result
     
@@ -721,11 +1643,44 @@ Answer: Based on my analysis, the solution is...""",
             # Default: return primary response
             return responses[0].content
     
+    def _get_embedder(self) -> Optional[Callable[[List[str]], Any]]:
+        """Return the consensus embedder, loading the default model on first use"""
+        if self._embedder_loaded:
+            return self._embedder
+        
+        with self._embedder_lock:
+            if not self._embedder_loaded:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(CONSENSUS_EMBEDDING_MODEL)
+                    self._embedder = lambda texts: model.encode(texts, convert_to_numpy=True)
+                except ImportError:
+                    logger.warning("sentence-transformers not installed, using length-based consensus")
+                except Exception as e:
+                    logger.warning(
+                        "Could not load %s (%s), using length-based consensus", CONSENSUS_EMBEDDING_MODEL, e
+                    )
+                self._embedder_loaded = True
+        return self._embedder
+    
     def _calculate_consensus_confidence(self, responses: List[LLMResponse]) -> float:
         """Calculate confidence based on response agreement"""
         if len(responses) < 2:
             return 0.7
         
+        embedder = self._get_embedder()
+        if embedder is not None:
+            try:
+                # Mean pairwise cosine similarity of the responses' embeddings
+                embeddings = np.asarray(embedder([r.content for r in responses]), dtype=float)
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                unit = embeddings / np.maximum(norms, 1e-12)
+                similarities = unit @ unit.T
+                pairs = similarities[np.triu_indices(len(responses), k=1)]
+                return float(np.clip(pairs.mean(), 0.0, 1.0))
+            except Exception as e:
+                logger.warning("Embedding consensus failed (%s), using length-based consensus", e)
+        
         # Simple similarity check based on length and structure
         lengths = [len(r.content) for r in responses]
         avg_length = sum(lengths) / len(lengths)
@@ -737,8 +1692,12 @@ Answer: Based on my analysis, the solution is...""",
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics"""
+        with self._lock:
+            cache_size = len(self.cache)
         return {
             **self.metrics,
+            'cache_size': cache_size,
+            'cache_max_size': self.cache.maxsize,
             'cache_hit_rate': self.metrics['cache_hits'] / max(self.metrics['total_requests'], 1),
             'avg_cost_per_request': self.metrics['total_cost'] / max(self.metrics['total_requests'], 1)
         }
@@ -746,6 +1705,7 @@ Answer: Based on my analysis, the solution is...""",
 
 # Demo usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("🚀 Intelligent LLM Orchestrator Demo\n")
     
     # Initialize orchestrator
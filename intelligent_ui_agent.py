@@ -4,15 +4,79 @@ Uses OpenRouter LLM to analyze, compare, grade, and improve UIs with complex lay
 """
 
 import os
-import requests
+import re
+import bisect
+import sys
 import json
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field
+import hashlib
+import pickle
+import struct
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterator, List, Optional, Any, Tuple
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 import time
+from collections import Counter, deque
+from itertools import chain
 
+import numpy as np
 
-@dataclass
+from integrations.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    # requests is imported on first LLM call; it dominates module import time
+    import requests
+
+
+# UIs analyzed per LLM request when comparing; larger prompts stop paying off
+LLM_ANALYSIS_BATCH_SIZE = 6
+# Upper bound on concurrent LLM requests from one comparison
+LLM_MAX_CONCURRENCY = 32
+# Minimum score for each grade above F; GRADES[i] covers scores from
+# GRADE_THRESHOLDS[i - 1] up to GRADE_THRESHOLDS[i]
+GRADE_THRESHOLDS = (60, 70, 73, 77, 80, 83, 87, 90, 93, 97)
+GRADES = ('F', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+')
+# Retries for throttled (429) and gateway errors; Retry-After is honored
+LLM_MAX_RETRIES = 5
+LLM_RETRY_BACKOFF = 0.5
+LLM_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# LLM analyses kept in memory, keyed by UI code + model + temperature
+LLM_CACHE_MAX_ENTRIES = 1024
+# Analyses/enhancements kept in memory; older analyses spill to the history log
+HISTORY_MAX_ENTRIES = 256
+# Age after which analyses in the on-disk cache (cache_dir) are redone
+ANALYSIS_CACHE_TTL = 7 * 24 * 3600
+
+# dataclass(slots=True) needs Python 3.10; older versions keep __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': 'You are an expert UI/UX analyst with deep knowledge of web development, accessibility, and design systems. Provide detailed, actionable insights.'
+}
+
+# Substrings the layer heuristics look for; each is searched once per layer
+HTML_TOKENS = (
+    'DOCTYPE', 'aria-', 'role=', 'alt=', 'class=',
+    '<header', '<nav', '<main', '<article', '<section', '<body>', '</body>'
+)
+CSS_TOKENS = (
+    '--color-', '--text-', '--space-', '--', 'var(--', 'var(', '@media', '@keyframes',
+    'animation:', 'transition:', 'grid', 'flex', 'font-family:', 'font-size:', 'padding:', '/* ', '.'
+)
+JS_TOKENS = ('addEventListener', '=>', 'const ', 'let ', 'try', 'catch', 'keydown', 'keypress')
+
+
+def _find_tokens(text: str, tokens: Tuple[str, ...]) -> Dict[str, bool]:
+    """Map each token to whether it occurs in ``text``"""
+    # Substring search stops at the first hit, which beats a single regex
+    # union sweep that has to visit every character
+    return {token: token in text for token in tokens}
+
+
+@dataclass(**_SLOTS)
 class UIAnalysis:
     """Comprehensive UI analysis result"""
     overall_grade: str  # A+, A, B+, B, C+, C, D, F
@@ -45,7 +109,7 @@ class UIAnalysis:
     confidence_level: float = 0.0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class UIEnhancement:
     """UI enhancement recommendations"""
     priority: str  # critical, high, medium, low
@@ -58,6 +122,241 @@ class UIEnhancement:
     reasoning: str
 
 
+# Review points shared by the single and batched analysis prompts
+_ANALYSIS_CHECKLIST = """1. Overall quality and design coherence
+2. Accessibility compliance (WCAG 2.1)
+3. Performance considerations
+4. Best practices adherence
+5. Areas for improvement
+6. Specific recommendations"""
+
+
+# Performance score by total source size: below each bound, else the last score
+_PERFORMANCE_BOUNDS = np.array([10000, 50000, 100000])
+_PERFORMANCE_SCORES = np.array([95.0, 85.0, 75.0, 65.0])
+# Complexity points per character and caps for HTML, CSS and JS
+_COMPLEXITY_DIVISORS = np.array([200.0, 150.0, 100.0])
+_COMPLEXITY_CAPS = np.array([40.0, 30.0, 30.0])
+
+
+def _size_scores(sizes: np.ndarray) -> np.ndarray:
+    """
+    Score UIs by source size in one vectorized pass.
+    
+    Args:
+        sizes: (n, 3) array of HTML, CSS and JS lengths
+    
+    Returns:
+        (n, 2) array of performance and complexity (lower is better) scores
+    """
+    performance = _PERFORMANCE_SCORES[np.searchsorted(_PERFORMANCE_BOUNDS, sizes.sum(axis=1), side='right')]
+    complexity = np.minimum(sizes / _COMPLEXITY_DIVISORS, _COMPLEXITY_CAPS).sum(axis=1).clip(max=100)
+    return np.column_stack((performance, complexity))
+
+
+# Fenced code blocks, checked before any bare JSON in the answer
+_JSON_FENCE = re.compile(r'```(?:json)?[ \t]*\n(.*?)```', re.DOTALL | re.IGNORECASE)
+_JSON_START = re.compile(r'[{\[]')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_json_answer(text: str, expected: Optional[type] = None) -> Any:
+    """
+    Parse JSON from an LLM answer that may wrap it in code fences or prose.
+    
+    The whole answer or a fenced block is tried first; otherwise the first
+    complete JSON document starting at a ``{`` or ``[`` is used, ignoring any
+    text (braces included) after it.
+    
+    Args:
+        text: LLM answer
+        expected: Optional type (dict or list) the document must have;
+            documents of other types are skipped
+    
+    Raises:
+        ValueError: If no JSON document can be recovered
+    """
+    candidates = [text] + [fence.group(1) for fence in _JSON_FENCE.finditer(text)]
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if expected is None or isinstance(value, expected):
+            return value
+    
+    for start in _JSON_START.finditer(text):
+        try:
+            value, _ = _JSON_DECODER.raw_decode(text, start.start())
+        except ValueError:
+            continue
+        if expected is None or isinstance(value, expected):
+            return value
+    
+    raise ValueError("No JSON found in LLM answer")
+
+
+def create_llm_session() -> "requests.Session":
+    """
+    Create a pooled HTTP session that retries throttled and gateway errors.
+    
+    Agents create one on first use; callers making their own OpenRouter
+    requests can create one and share it through ``http_client``.
+    """
+    import requests
+    import urllib3
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    # Random jitter on retry backoff needs urllib3 2; older versions back off exactly
+    jitter = {'backoff_jitter': LLM_RETRY_BACKOFF} if int(urllib3.__version__.split('.')[0]) >= 2 else {}
+    
+    session = requests.Session()
+    retry = Retry(
+        total=LLM_MAX_RETRIES,
+        backoff_factor=LLM_RETRY_BACKOFF,
+        status_forcelist=LLM_RETRY_STATUSES,
+        allowed_methods=frozenset({'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        **jitter
+    )
+    adapter = HTTPAdapter(
+        pool_connections=LLM_MAX_CONCURRENCY,
+        pool_maxsize=LLM_MAX_CONCURRENCY,
+        max_retries=retry
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args) -> Future:
+    """
+    Submit work that runs in a copy of the caller's context.
+    
+    Context variables set by the caller, such as a per-test output capture,
+    then also apply to the worker thread.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def iter_stream_deltas(response: "requests.Response") -> Iterator[str]:
+    """Yield the content deltas of a streamed (SSE) chat completion"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        payload = line[5:].strip()
+        if payload == '[DONE]':
+            return
+        choices = json.loads(payload).get('choices') or [{}]
+        delta = choices[0].get('delta', {}).get('content')
+        if delta:
+            yield delta
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Shorten ``text`` to ``limit`` characters, marking the cut with '...'"""
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+@dataclass(frozen=True, **_SLOTS)
+class AnalysisFlags:
+    """Boolean findings of the layer analyses that scoring and labelling branch on"""
+    semantic: bool
+    aria: bool
+    roles: bool
+    alt: bool
+    landmarks: bool
+    high_complexity: bool
+    responsive: bool
+    modern_layout: bool
+    variables: bool
+    design_system: bool
+    events: bool
+    modern_js: bool
+    error_handling: bool
+    organized: bool
+    
+    @classmethod
+    def from_layers(
+        cls,
+        html_analysis: Dict[str, Any],
+        css_analysis: Dict[str, Any],
+        js_analysis: Dict[str, Any],
+        design_analysis: Dict[str, Any]
+    ) -> "AnalysisFlags":
+        """Read the flags out of the layer analysis dicts"""
+        features = html_analysis['accessibility_features']
+        return cls(
+            semantic=html_analysis['semantic_html'],
+            aria=features['aria_labels'],
+            roles=features['roles'],
+            alt=features['alt_text'],
+            landmarks=features['landmarks'],
+            high_complexity=html_analysis['complexity'] == 'high' and css_analysis['complexity'] == 'high',
+            responsive=css_analysis['responsive_design'],
+            modern_layout=css_analysis['modern_layout'],
+            variables=css_analysis['uses_variables'],
+            design_system=design_analysis['has_design_system'],
+            events=js_analysis['event_handlers'],
+            modern_js=js_analysis['modern_syntax'],
+            error_handling=js_analysis['error_handling'],
+            organized=css_analysis['organization'] != 'needs_comments'
+        )
+
+
+class _JSONEndTracker:
+    """Finds where a JSON document at the start of streamed text ends"""
+    
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """
+        Consume the next piece of text.
+        
+        Returns:
+            Offset in ``text`` just past the closing bracket of the leading
+            JSON document, or -1 if it has not closed (or the text does not
+            start with one)
+        """
+        if self.finished:
+            return -1
+        
+        for i, ch in enumerate(text):
+            if not self.started:
+                if ch.isspace():
+                    continue
+                if ch not in '{[':
+                    self.finished = True
+                    return -1
+                self.started = True
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.finished = True
+                    return i + 1
+        
+        return -1
+
+
 class IntelligentUIAgent:
     """
     Intelligent agent for UI analysis, comparison, and enhancement.
@@ -72,8 +371,33 @@ class IntelligentUIAgent:
     - LLM-powered reasoning
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
-        """Initialize the intelligent agent"""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        history_dir: Optional[str] = None,
+        http_client: Optional["requests.Session"] = None,
+        cache_dir: Optional[str] = None,
+        cache_ttl: float = ANALYSIS_CACHE_TTL,
+        on_token: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize the intelligent agent.
+        
+        Args:
+            api_key: OpenRouter API key (defaults to OPENROUTER_API_KEY)
+            model: Key of the model to use
+            history_dir: Optional directory for the log that analyses evicted
+                from the in-memory history are appended to
+            http_client: Optional session (see create_llm_session) to share
+                connections with the caller; it is not closed by close()
+            cache_dir: Optional directory where comprehensive analyses are
+                stored as JSON, so repeat runs skip the LLM call
+            cache_ttl: Seconds a stored analysis stays valid
+            on_token: Optional callback given each streamed content delta as
+                it arrives, e.g. to show progress; it runs on the thread
+                making the LLM call
+        """
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY', '')
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.app_name = os.getenv('OPENROUTER_APP_NAME', 'UI-Analysis-Agent')
@@ -92,12 +416,54 @@ class IntelligentUIAgent:
         
         self.current_model = model
         
-        # Analysis history for learning
-        self.analysis_history: List[UIAnalysis] = []
-        self.enhancement_history: List[UIEnhancement] = []
+        # Request headers only depend on settings fixed at construction
+        self._headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'HTTP-Referer': self.site_url,
+            'X-Title': self.app_name,
+            'Content-Type': 'application/json'
+        }
+        
+        # Keep-alive connections shared by all LLM calls, created on first use
+        # unless the caller provides a session
+        self._session: Optional["requests.Session"] = http_client
+        self._owns_session = http_client is None
+        self._session_lock = threading.Lock()
+        self.on_token = on_token
+        
+        # Analysis history for learning; bounded so long-running processes
+        # don't pin every result in memory
+        self.analysis_history: Deque[UIAnalysis] = deque(maxlen=HISTORY_MAX_ENTRIES)
+        self.enhancement_history: Deque[UIEnhancement] = deque(maxlen=HISTORY_MAX_ENTRIES)
+        self._history_log: Optional[Path] = None
+        if history_dir:
+            Path(history_dir).mkdir(parents=True, exist_ok=True)
+            self._history_log = Path(history_dir) / 'history.pkl.log'
+        
+        # Parsed LLM analyses of previously seen UIs; the lock guards it
+        # against the concurrent batches in compare_uis
+        self._llm_cache = TTLCache(maxsize=LLM_CACHE_MAX_ENTRIES, ttl=None)
+        self._llm_cache_lock = threading.Lock()
+        
+        self._cache_dir: Optional[Path] = None
+        self._cache_ttl = cache_ttl
+        if cache_dir:
+            self._cache_dir = Path(cache_dir)
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
         
         print(f"✓ Intelligent UI Agent initialized with {model}")
     
+    @property
+    def current_model(self) -> str:
+        """Key of the model used for LLM calls"""
+        return self._current_model
+    
+    @current_model.setter
+    def current_model(self, model: str) -> None:
+        self._current_model = model
+        # Resolve the OpenRouter model id once rather than on every call
+        self._model_id = self.models.get(model, self.models['gpt-4'])
+    
     def analyze_ui_comprehensive(
         self,
         html: str,
@@ -122,37 +488,143 @@ class IntelligentUIAgent:
         
         print("\n🔍 Performing comprehensive UI analysis...")
         
-        # Layer 1: Analyze HTML structure
-        print("  [1/6] Analyzing HTML layer...")
-        html_analysis = self._analyze_html_layer(html)
+        cache_file = None
+        if self._cache_dir is not None:
+            cache_file = self._analysis_cache_file(html, css, js, design_system, project_context)
+            analysis = self._load_cached_analysis(cache_file)
+            if analysis is not None:
+                self._record_analysis(analysis)
+                print(f"\n✓ Analysis loaded from cache (cache_hit=True) - Grade: {analysis.overall_grade} ({analysis.overall_score:.1f}/100)")
+                return analysis
+        
+        # The LLM request is in flight while the local layers are analyzed
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            llm_future = _submit(
+                pool, self._get_llm_analysis, html, css, js, design_system, project_context
+            )
+            
+            html_tokens = self._scan_html(html)
+            css_tokens = self._scan_css(css)
+            js_tokens = self._scan_js(js)
+            
+            # Layer 1: Analyze HTML structure
+            print("  [1/6] Analyzing HTML layer...")
+            html_analysis = self._analyze_html_layer(html, html_tokens)
+            
+            # Layer 2: Analyze CSS styling
+            print("  [2/6] Analyzing CSS layer...")
+            css_analysis = self._analyze_css_layer(css, css_tokens)
+            
+            # Layer 3: Analyze JavaScript functionality
+            print("  [3/6] Analyzing JavaScript layer...")
+            js_analysis = self._analyze_js_layer(js, js_tokens)
+            
+            # Layer 4: Analyze design system coherence
+            print("  [4/6] Analyzing design system...")
+            design_analysis = self._analyze_design_system(html_tokens, css_tokens, design_system)
+            
+            # Layer 5: Cross-layer consistency check
+            print("  [5/6] Checking cross-layer consistency...")
+            consistency_score = self._check_consistency(html_tokens, css_tokens, js_tokens)
+            
+            # Layer 6: Use LLM for deep insights
+            print("  [6/6] Getting LLM insights...")
+            llm_insights = llm_future.result()
+        
+        analysis = self._assemble_analysis(
+            html, css, js,
+            (html_analysis, css_analysis, js_analysis, design_analysis, consistency_score),
+            llm_insights
+        )
         
-        # Layer 2: Analyze CSS styling
-        print("  [2/6] Analyzing CSS layer...")
-        css_analysis = self._analyze_css_layer(css)
+        # Only analyses backed by an LLM answer are worth keeping across runs
+        llm_key = self._llm_cache_key(html, css, js, project_context, 0.3)
+        if cache_file is not None and llm_key in self._llm_cache:
+            self._store_cached_analysis(cache_file, analysis)
         
-        # Layer 3: Analyze JavaScript functionality
-        print("  [3/6] Analyzing JavaScript layer...")
-        js_analysis = self._analyze_js_layer(js)
+        print(f"\n✓ Analysis complete - Grade: {analysis.overall_grade} ({analysis.overall_score:.1f}/100)")
         
-        # Layer 4: Analyze design system coherence
-        print("  [4/6] Analyzing design system...")
-        design_analysis = self._analyze_design_system(html, css, design_system)
+        return analysis
+    
+    def _analysis_cache_file(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        design_system: Optional[Dict],
+        project_context: Optional[Dict]
+    ) -> Path:
+        """Path of the on-disk cache entry for an analysis with the current model"""
+        key = hashlib.sha256(json.dumps(
+            [html, css, js, self.current_model, design_system, project_context],
+            sort_keys=True, default=str
+        ).encode('utf-8')).hexdigest()
+        return self._cache_dir / f"{key}.json"
+    
+    def _load_cached_analysis(self, cache_file: Path) -> Optional[UIAnalysis]:
+        """Read a stored analysis unless it is missing, expired or unreadable"""
+        try:
+            if time.time() - cache_file.stat().st_mtime > self._cache_ttl:
+                return None
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return UIAnalysis(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _store_cached_analysis(self, cache_file: Path, analysis: UIAnalysis):
+        """Write an analysis to the on-disk cache"""
+        # Write then rename so concurrent readers never see a partial file
+        tmp_file = cache_file.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(asdict(analysis), f)
+        os.replace(tmp_file, cache_file)
+    
+    def _analyze_layers(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        design_system: Optional[Dict]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any], float]:
+        """Run the local (non-LLM) layer analyses"""
+        html_tokens = self._scan_html(html)
+        css_tokens = self._scan_css(css)
+        js_tokens = self._scan_js(js)
+        return (
+            self._analyze_html_layer(html, html_tokens),
+            self._analyze_css_layer(css, css_tokens),
+            self._analyze_js_layer(js, js_tokens),
+            self._analyze_design_system(html_tokens, css_tokens, design_system),
+            self._check_consistency(html_tokens, css_tokens, js_tokens)
+        )
+    
+    def _assemble_analysis(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        layers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any], float],
+        llm_insights: Dict[str, Any],
+        size_scores: Optional[Tuple[float, float]] = None
+    ) -> UIAnalysis:
+        """
+        Score layer analyses and LLM insights into a UIAnalysis and record it.
         
-        # Layer 5: Cross-layer consistency check
-        print("  [5/6] Checking cross-layer consistency...")
-        consistency_score = self._check_consistency(html, css, js)
+        ``size_scores`` are the (performance, complexity) scores when already
+        computed for a batch of UIs.
+        """
+        html_analysis, css_analysis, js_analysis, design_analysis, consistency_score = layers
+        if size_scores is None:
+            size_scores = _size_scores(np.array([[len(html), len(css), len(js)]]))[0].tolist()
         
-        # Layer 6: Use LLM for deep insights
-        print("  [6/6] Getting LLM insights...")
-        llm_insights = self._get_llm_analysis(
-            html, css, js, design_system, project_context
+        # Calculate overall scores and compile strengths and weaknesses
+        scores, strengths, weaknesses, critical_issues = self._score_and_label(
+            layers, size_scores, llm_insights
         )
-        
-        # Calculate overall scores
-        accessibility_score = self._calculate_accessibility_score(html, css, llm_insights)
-        performance_score = self._calculate_performance_score(html, css, js, llm_insights)
-        design_quality = self._calculate_design_quality(css_analysis, design_analysis, llm_insights)
-        complexity_score = self._calculate_complexity(html, css, js)
+        accessibility_score = scores['accessibility']
+        performance_score = scores['performance']
+        design_quality = scores['design_quality']
+        complexity_score = scores['complexity']
         
         overall_score = (
             accessibility_score * 0.25 +
@@ -164,19 +636,9 @@ class IntelligentUIAgent:
         
         overall_grade = self._score_to_grade(overall_score)
         
-        # Compile strengths and weaknesses
-        strengths = self._extract_strengths(
-            html_analysis, css_analysis, js_analysis, llm_insights
-        )
-        weaknesses = self._extract_weaknesses(
-            html_analysis, css_analysis, js_analysis, llm_insights
-        )
         improvements = self._generate_improvements(
             html, css, js, weaknesses, llm_insights
         )
-        critical_issues = self._identify_critical_issues(
-            html_analysis, css_analysis, js_analysis, llm_insights
-        )
         
         # Create comprehensive analysis
         analysis = UIAnalysis(
@@ -200,12 +662,45 @@ class IntelligentUIAgent:
         )
         
         # Store in history
-        self.analysis_history.append(analysis)
-        
-        print(f"\n✓ Analysis complete - Grade: {overall_grade} ({overall_score:.1f}/100)")
+        self._record_analysis(analysis)
         
         return analysis
     
+    def _record_analysis(self, analysis: UIAnalysis):
+        """Append to the history, spilling the evicted entry to the log"""
+        history = self.analysis_history
+        if self._history_log is not None and len(history) == history.maxlen:
+            data = pickle.dumps(history[0], protocol=pickle.HIGHEST_PROTOCOL)
+            with open(self._history_log, 'ab') as f:
+                # Length-prefixed frames so the log can be walked without unpickling
+                f.write(struct.pack('<I', len(data)))
+                f.write(data)
+        history.append(analysis)
+    
+    def iter_history(self) -> Iterator[UIAnalysis]:
+        """
+        Iterate over all recorded analyses, most recent first.
+        
+        Yields the in-memory history, then entries spilled to the history log.
+        """
+        yield from reversed(self.analysis_history)
+        
+        if self._history_log is None or not self._history_log.exists():
+            return
+        
+        with open(self._history_log, 'rb') as f:
+            offsets = []
+            header = f.read(4)
+            while len(header) == 4:
+                size, = struct.unpack('<I', header)
+                offsets.append((f.tell(), size))
+                f.seek(size, os.SEEK_CUR)
+                header = f.read(4)
+            
+            for offset, size in reversed(offsets):
+                f.seek(offset)
+                yield pickle.loads(f.read(size))
+    
     def compare_uis(
         self,
         ui_list: List[Dict[str, str]],
@@ -224,20 +719,35 @@ class IntelligentUIAgent:
         
         print(f"\n📊 Comparing {len(ui_list)} UIs...")
         
-        analyses = []
-        for i, ui in enumerate(ui_list, 1):
-            print(f"  Analyzing UI {i}/{len(ui_list)}...")
-            analysis = self.analyze_ui_comprehensive(
-                ui.get('html', ''),
-                ui.get('css', ''),
-                ui.get('js', ''),
-                ui.get('design_system'),
-                ui.get('context')
-            )
-            analyses.append(analysis)
+        uis = [
+            (ui.get('html', ''), ui.get('css', ''), ui.get('js', ''), ui.get('design_system'), ui.get('context'))
+            for ui in ui_list
+        ]
+        
+        # Batched LLM requests run concurrently, and the local layer analyses
+        # run while they are in flight
+        batches = [
+            uis[start:start + LLM_ANALYSIS_BATCH_SIZE]
+            for start in range(0, len(uis), LLM_ANALYSIS_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, min(LLM_MAX_CONCURRENCY, len(batches) + len(uis)))) as pool:
+            print(f"  Getting LLM insights ({len(batches)} request(s))...")
+            batch_futures = [_submit(pool, self._get_llm_analysis_batch, batch) for batch in batches]
+            layer_futures = [
+                _submit(pool, self._analyze_layers, html, css, js, design_system)
+                for html, css, js, design_system, _ in uis
+            ]
+            
+            llm_insights = [insights for future in batch_futures for insights in future.result()]
+            size_scores = _size_scores(np.array([[len(html), len(css), len(js)] for html, css, js, _, _ in uis]))
+            analyses = [
+                self._assemble_analysis(html, css, js, future.result(), insights, scores)
+                for (html, css, js, _, _), future, insights, scores
+                in zip(uis, layer_futures, llm_insights, size_scores.tolist())
+            ]
         
         # Use LLM for comparative analysis
-        comparison = self._get_llm_comparison(ui_list, analyses, criteria)
+        comparison = self._get_llm_comparison(analyses, criteria)
         
         # Rank UIs
         rankings = sorted(
@@ -335,55 +845,75 @@ class IntelligentUIAgent:
         
         return enhancements
     
-    def _analyze_html_layer(self, html: str) -> Dict[str, Any]:
+    def _scan_html(self, html: str) -> Dict[str, bool]:
+        """Find which HTML_TOKENS occur in ``html``"""
+        return _find_tokens(html, HTML_TOKENS)
+    
+    def _scan_css(self, css: str) -> Dict[str, bool]:
+        """Find which CSS_TOKENS occur in ``css``"""
+        return _find_tokens(css, CSS_TOKENS)
+    
+    def _scan_js(self, js: str) -> Dict[str, bool]:
+        """Find which JS_TOKENS occur in ``js``"""
+        return _find_tokens(js, JS_TOKENS)
+    
+    def _analyze_html_layer(self, html: str, tokens: Dict[str, bool]) -> Dict[str, Any]:
         """Analyze HTML structure"""
+        landmarks = tokens['<header'] or tokens['<nav'] or tokens['<main']
+        element_count = html.count('<')
         analysis = {
-            'semantic_html': 'DOCTYPE' in html and ('<header' in html or '<nav' in html or '<main' in html),
+            'semantic_html': tokens['DOCTYPE'] and landmarks,
             'accessibility_features': {
-                'aria_labels': 'aria-' in html,
-                'roles': 'role=' in html,
-                'alt_text': 'alt=' in html,
-                'semantic_tags': any(tag in html for tag in ['<header', '<nav', '<main', '<article', '<section'])
+                'aria_labels': tokens['aria-'],
+                'roles': tokens['role='],
+                'alt_text': tokens['alt='],
+                'semantic_tags': landmarks or tokens['<article'] or tokens['<section'],
+                'landmarks': landmarks
             },
-            'structure_quality': 'good' if '<body>' in html and '</body>' in html else 'needs_improvement',
-            'element_count': html.count('<'),
-            'complexity': 'high' if html.count('<') > 100 else 'medium' if html.count('<') > 50 else 'low'
+            'structure_quality': 'good' if tokens['<body>'] and tokens['</body>'] else 'needs_improvement',
+            'element_count': element_count,
+            'complexity': 'high' if element_count > 100 else 'medium' if element_count > 50 else 'low'
         }
         return analysis
     
-    def _analyze_css_layer(self, css: str) -> Dict[str, Any]:
+    def _analyze_css_layer(self, css: str, tokens: Dict[str, bool]) -> Dict[str, Any]:
         """Analyze CSS styling"""
         analysis = {
-            'uses_variables': '--' in css or 'var(' in css,
-            'responsive_design': '@media' in css,
-            'modern_layout': 'grid' in css or 'flex' in css,
-            'animations': '@keyframes' in css or 'animation:' in css or 'transition:' in css,
+            'uses_variables': tokens['--'] or tokens['var('],
+            'responsive_design': tokens['@media'],
+            'modern_layout': tokens['grid'] or tokens['flex'],
+            'animations': tokens['@keyframes'] or tokens['animation:'] or tokens['transition:'],
             'size': len(css),
-            'organization': 'good' if '/* ' in css else 'needs_comments',
+            'organization': 'good' if tokens['/* '] else 'needs_comments',
             'complexity': 'high' if len(css) > 5000 else 'medium' if len(css) > 2000 else 'low'
         }
         return analysis
     
-    def _analyze_js_layer(self, js: str) -> Dict[str, Any]:
+    def _analyze_js_layer(self, js: str, tokens: Dict[str, bool]) -> Dict[str, Any]:
         """Analyze JavaScript functionality"""
         analysis = {
-            'event_handlers': 'addEventListener' in js,
-            'modern_syntax': '=>' in js or 'const ' in js or 'let ' in js,
-            'error_handling': 'try' in js and 'catch' in js,
-            'accessibility_support': 'keydown' in js or 'keypress' in js,
+            'event_handlers': tokens['addEventListener'],
+            'modern_syntax': tokens['=>'] or tokens['const '] or tokens['let '],
+            'error_handling': tokens['try'] and tokens['catch'],
+            'accessibility_support': tokens['keydown'] or tokens['keypress'],
             'size': len(js),
             'complexity': 'high' if len(js) > 3000 else 'medium' if len(js) > 1000 else 'low'
         }
         return analysis
     
-    def _analyze_design_system(self, html: str, css: str, design_system: Optional[Dict]) -> Dict[str, Any]:
+    def _analyze_design_system(
+        self,
+        html_tokens: Dict[str, bool],
+        css_tokens: Dict[str, bool],
+        design_system: Optional[Dict]
+    ) -> Dict[str, Any]:
         """Analyze design system coherence"""
         analysis = {
             'has_design_system': design_system is not None,
-            'color_consistency': self._check_color_consistency(css),
-            'typography_system': 'font-family:' in css and ('font-size:' in css or '--text-' in css),
-            'spacing_system': '--space-' in css or 'padding:' in css,
-            'component_reuse': self._check_component_reuse(html, css)
+            'color_consistency': self._check_color_consistency(css_tokens),
+            'typography_system': css_tokens['font-family:'] and (css_tokens['font-size:'] or css_tokens['--text-']),
+            'spacing_system': css_tokens['--space-'] or css_tokens['padding:'],
+            'component_reuse': self._check_component_reuse(html_tokens, css_tokens)
         }
         
         if design_system:
@@ -395,46 +925,56 @@ class IntelligentUIAgent:
         
         return analysis
     
-    def _check_consistency(self, html: str, css: str, js: str) -> float:
+    def _check_consistency(
+        self,
+        html_tokens: Dict[str, bool],
+        css_tokens: Dict[str, bool],
+        js_tokens: Dict[str, bool]
+    ) -> float:
         """Check cross-layer consistency"""
         consistency_score = 70.0  # Base score
         
         # Check naming consistency
-        if self._check_naming_consistency(html, css, js):
+        if self._check_naming_consistency(html_tokens, css_tokens, js_tokens):
             consistency_score += 10
         
         # Check structure consistency
-        if self._check_structure_consistency(html, css):
+        if self._check_structure_consistency(html_tokens, css_tokens):
             consistency_score += 10
         
         # Check functionality consistency
-        if self._check_functionality_consistency(html, js):
+        if self._check_functionality_consistency(html_tokens, js_tokens):
             consistency_score += 10
         
         return min(consistency_score, 100.0)
     
-    def _check_color_consistency(self, css: str) -> bool:
+    def _check_color_consistency(self, css_tokens: Dict[str, bool]) -> bool:
         """Check if colors are consistently used"""
         # Simple check: using CSS variables for colors
-        return '--color-' in css or 'var(--' in css
+        return css_tokens['--color-'] or css_tokens['var(--']
     
-    def _check_component_reuse(self, html: str, css: str) -> bool:
+    def _check_component_reuse(self, html_tokens: Dict[str, bool], css_tokens: Dict[str, bool]) -> bool:
         """Check if components are reusable"""
         # Simple check: class-based styling
-        return 'class=' in html and '.' in css
+        return html_tokens['class='] and css_tokens['.']
     
-    def _check_naming_consistency(self, html: str, css: str, js: str) -> bool:
+    def _check_naming_consistency(
+        self,
+        html_tokens: Dict[str, bool],
+        css_tokens: Dict[str, bool],
+        js_tokens: Dict[str, bool]
+    ) -> bool:
         """Check naming conventions consistency"""
         # Simple check: consistent use of kebab-case or camelCase
         return True  # Simplified for demo
     
-    def _check_structure_consistency(self, html: str, css: str) -> bool:
+    def _check_structure_consistency(self, html_tokens: Dict[str, bool], css_tokens: Dict[str, bool]) -> bool:
         """Check structure-style consistency"""
         return True  # Simplified
     
-    def _check_functionality_consistency(self, html: str, js: str) -> bool:
+    def _check_functionality_consistency(self, html_tokens: Dict[str, bool], js_tokens: Dict[str, bool]) -> bool:
         """Check HTML-JS consistency"""
-        return 'addEventListener' in js if 'class=' in html else True
+        return js_tokens['addEventListener'] if html_tokens['class='] else True
     
     def _get_llm_analysis(
         self,
@@ -454,209 +994,375 @@ class IntelligentUIAgent:
                 'suggestions': []
             }
         
-        prompt = f"""Analyze this UI implementation comprehensively:
+        cache_key = self._llm_cache_key(html, css, js, context, 0.3)
+        with self._llm_cache_lock:
+            cached = self._llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self._call_llm(self._analysis_prompt(html, css, js, context), temperature=0.3)
+            insights = self._parse_llm_analysis(response)
+            with self._llm_cache_lock:
+                self._llm_cache.set(cache_key, insights)
+            return insights
+        except Exception as e:
+            print(f"  ⚠ LLM call failed: {str(e)}")
+            return {
+                'reasoning': f'LLM analysis failed: {str(e)}',
+                'confidence': 0.5,
+                'insights': [],
+                'suggestions': []
+            }
+    
+    def _analysis_prompt(self, html: str, css: str, js: str, context: Optional[Dict]) -> str:
+        """Prompt asking the LLM to analyze one UI"""
+        return f"""Analyze this UI implementation comprehensively:
 
-HTML ({len(html)} chars):
+{self._format_ui_code(html, css, js, context)}
+
+Please analyze:
+{_ANALYSIS_CHECKLIST}
+
+Provide a structured JSON response with: reasoning, confidence (0-1), insights[], suggestions[]"""
+    
+    def _parse_llm_analysis(self, response: str) -> Dict[str, Any]:
+        """Parse the insights dict from an analysis answer"""
+        try:
+            return _parse_json_answer(response, dict)
+        except ValueError:
+            return {
+                'reasoning': response,
+                'confidence': 0.8,
+                'insights': ['Analysis completed'],
+                'suggestions': []
+            }
+    
+    def llm_analysis_request(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Chat completion payload for the LLM analysis of one UI.
+        
+        Lets callers run the request themselves, e.g. through a batch API,
+        and hand the answer back with ``add_llm_analysis``.
+        
+        Args:
+            html: HTML code
+            css: CSS code
+            js: JavaScript code
+            context: Optional project context
+        
+        Returns:
+            Request body for the chat completions endpoint
+        """
+        return {
+            'model': self._model_id,
+            'messages': [
+                _SYSTEM_MESSAGE,
+                {'role': 'user', 'content': self._analysis_prompt(html, css, js, context)}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 2000
+        }
+    
+    def add_llm_analysis(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        context: Optional[Dict],
+        response: str
+    ) -> Dict[str, Any]:
+        """
+        Cache an answer to a ``llm_analysis_request`` payload.
+        
+        Later analyses and comparisons of the same UI use it instead of
+        calling the LLM.
+        
+        Args:
+            html: HTML code
+            css: CSS code
+            js: JavaScript code
+            context: Project context the request was built with
+            response: Content of the LLM answer
+        
+        Returns:
+            Parsed insights
+        """
+        insights = self._parse_llm_analysis(response)
+        with self._llm_cache_lock:
+            self._llm_cache.set(self._llm_cache_key(html, css, js, context, 0.3), insights)
+        return insights
+    
+    def _format_ui_code(self, html: str, css: str, js: str, context: Optional[Dict]) -> str:
+        """Format truncated UI code and context for an analysis prompt"""
+        return f"""HTML ({len(html)} chars):
 ```html
-{html[:2000]}{'...' if len(html) > 2000 else ''}
+{_truncate(html, 2000)}
 ```
 
 CSS ({len(css)} chars):
 ```css
-{css[:1500]}{'...' if len(css) > 1500 else ''}
+{_truncate(css, 1500)}
 ```
 
 JavaScript ({len(js)} chars):
 ```javascript
-{js[:1000]}{'...' if len(js) > 1000 else ''}
+{_truncate(js, 1000)}
 ```
 
-Context: {json.dumps(context) if context else 'No specific context provided'}
+Context: {json.dumps(context) if context else 'No specific context provided'}"""
+    
+    def _get_llm_analysis_batch(
+        self,
+        uis: List[Tuple[str, str, str, Optional[Dict], Optional[Dict]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get LLM insights for several UIs with a single request.
+        
+        Args:
+            uis: (html, css, js, design_system, context) per UI
+        
+        Returns:
+            One insights dict per UI, in order
+        """
+        if len(uis) <= 1 or not self.api_key:
+            return [self._get_llm_analysis(*ui) for ui in uis]
+        
+        # Only UIs without a cached analysis go into the request
+        keys = [self._llm_cache_key(html, css, js, context, 0.3) for html, css, js, _, context in uis]
+        with self._llm_cache_lock:
+            results = [self._llm_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) < len(uis):
+            for i, insights in zip(missing, self._get_llm_analysis_batch([uis[i] for i in missing])):
+                results[i] = insights
+            return results
+        
+        sections = '\n\n'.join(
+            f"### UI {i}\n\n{self._format_ui_code(html, css, js, context)}"
+            for i, (html, css, js, _, context) in enumerate(uis)
+        )
+        prompt = f"""Analyze each of these {len(uis)} UI implementations comprehensively:
 
-Please analyze:
-1. Overall quality and design coherence
-2. Accessibility compliance (WCAG 2.1)
-3. Performance considerations
-4. Best practices adherence
-5. Areas for improvement
-6. Specific recommendations
+{sections}
 
-Provide a structured JSON response with: reasoning, confidence (0-1), insights[], suggestions[]"""
+For each UI, please analyze:
+{_ANALYSIS_CHECKLIST}
+
+Provide a JSON array with one object per UI containing: index (the UI number above), reasoning, confidence (0-1), insights[], suggestions[]"""
         
         try:
             response = self._call_llm(prompt, temperature=0.3)
-            # Parse JSON from response
-            try:
-                return json.loads(response)
-            except:
-                return {
-                    'reasoning': response,
-                    'confidence': 0.8,
-                    'insights': ['Analysis completed'],
-                    'suggestions': []
-                }
         except Exception as e:
             print(f"  ⚠ LLM call failed: {str(e)}")
-            return {
-                'reasoning': f'LLM analysis failed: {str(e)}',
-                'confidence': 0.5,
-                'insights': [],
-                'suggestions': []
-            }
+            return [
+                {
+                    'reasoning': f'LLM analysis failed: {str(e)}',
+                    'confidence': 0.5,
+                    'insights': [],
+                    'suggestions': []
+                }
+                for _ in uis
+            ]
+        
+        try:
+            results = _parse_json_answer(response, list)
+            # Drop the batch-only 'index' so cached insights have the same
+            # shape as a single-UI answer
+            by_index = {int(item.pop('index')): item for item in results}
+            results = [by_index[i] for i in range(len(uis))]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            # Unusable batch answer: fall back to one request per UI
+            print("  ⚠ Batched LLM answer could not be parsed, analyzing UIs individually")
+            return [self._get_llm_analysis(*ui) for ui in uis]
+        
+        with self._llm_cache_lock:
+            for key, insights in zip(keys, results):
+                self._llm_cache.set(key, insights)
+        return results
+    
+    def _llm_cache_key(
+        self,
+        html: str,
+        css: str,
+        js: str,
+        context: Optional[Dict],
+        temperature: float
+    ) -> str:
+        """Cache key for an LLM analysis of one UI with the current model"""
+        # Length prefixes keep field boundaries unambiguous
+        digest = hashlib.blake2b(struct.pack('<d', temperature), digest_size=16)
+        context_json = json.dumps(context, sort_keys=True, default=str) if context else ''
+        for part in (self.current_model, html, css, js, context_json):
+            data = part.encode('utf-8')
+            digest.update(struct.pack('<I', len(data)))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def _get_session(self) -> "requests.Session":
+        """Return the shared HTTP session, creating it on first use"""
+        with self._session_lock:
+            if self._session is None:
+                self._session = create_llm_session()
+            return self._session
+    
+    def close(self):
+        """Close pooled HTTP connections the agent created"""
+        if self._session is not None and self._owns_session:
+            self._session.close()
+            self._session = None
     
     def _call_llm(self, prompt: str, temperature: float = 0.7) -> str:
         """Call OpenRouter LLM API"""
-        
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'HTTP-Referer': self.site_url,
-            'X-Title': self.app_name,
-            'Content-Type': 'application/json'
-        }
-        
         data = {
-            'model': self.models.get(self.current_model, self.models['gpt-4']),
-            'messages': [
-                {
-                    'role': 'system',
-                    'content': 'You are an expert UI/UX analyst with deep knowledge of web development, accessibility, and design systems. Provide detailed, actionable insights.'
-                },
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ],
+            'model': self._model_id,
+            'messages': [_SYSTEM_MESSAGE, {'role': 'user', 'content': prompt}],
             'temperature': temperature,
-            'max_tokens': 2000
+            'max_tokens': 2000,
+            'stream': True
         }
         
-        response = requests.post(self.base_url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        return result['choices'][0]['message']['content']
-    
-    def _calculate_accessibility_score(self, html: str, css: str, llm_insights: Dict) -> float:
-        """Calculate accessibility score"""
-        score = 50.0
-        
-        if 'aria-' in html:
-            score += 15
-        if 'role=' in html:
-            score += 10
-        if 'alt=' in html:
-            score += 10
-        if any(tag in html for tag in ['<header', '<nav', '<main']):
-            score += 10
-        if '@media' in css:
-            score += 5
-        
-        return min(score, 100.0)
-    
-    def _calculate_performance_score(self, html: str, css: str, js: str, llm_insights: Dict) -> float:
-        """Calculate performance score"""
-        total_size = len(html) + len(css) + len(js)
-        
-        if total_size < 10000:
-            return 95.0
-        elif total_size < 50000:
-            return 85.0
-        elif total_size < 100000:
-            return 75.0
-        else:
-            return 65.0
+        response = self._get_session().post(
+            self.base_url, headers=self._headers, json=data, timeout=60, stream=True
+        )
+        try:
+            response.raise_for_status()
+            if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+                # Streaming not honored; read the buffered completion
+                result = response.json()
+                return result['choices'][0]['message']['content']
+            return self._read_stream(response)
+        finally:
+            # Also drops the connection when the stream is abandoned early
+            response.close()
     
-    def _calculate_design_quality(self, css_analysis: Dict, design_analysis: Dict, llm_insights: Dict) -> float:
-        """Calculate design quality score"""
-        score = 60.0
+    def _read_stream(self, response: "requests.Response") -> str:
+        """
+        Collect streamed content deltas.
         
-        if css_analysis.get('uses_variables', False):
-            score += 10
-        if css_analysis.get('responsive_design', False):
-            score += 10
-        if css_analysis.get('modern_layout', False):
-            score += 10
-        if design_analysis.get('has_design_system', False):
-            score += 10
+        When the answer starts with a JSON document, reading stops as soon as
+        that document is complete instead of waiting for trailing prose.
+        """
+        parts: List[str] = []
+        tracker = _JSONEndTracker()
+        on_token = self.on_token
+        
+        for delta in iter_stream_deltas(response):
+            if on_token is not None:
+                on_token(delta)
+            
+            end = tracker.feed(delta)
+            if end < 0:
+                parts.append(delta)
+                continue
+            
+            text = ''.join(parts) + delta[:end]
+            try:
+                json.loads(text)
+                return text
+            except ValueError:
+                parts.append(delta)
         
-        return min(score, 100.0)
+        return ''.join(parts)
     
-    def _calculate_complexity(self, html: str, css: str, js: str) -> float:
-        """Calculate complexity score (lower is better)"""
-        html_complexity = min(len(html) / 200, 40)
-        css_complexity = min(len(css) / 150, 30)
-        js_complexity = min(len(js) / 100, 30)
+    def _score_and_label(
+        self,
+        layers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any], float],
+        size_scores: Tuple[float, float],
+        llm_insights: Dict
+    ) -> Tuple[Dict[str, float], List[str], List[str], List[str]]:
+        """
+        Score a UI and label its strengths, weaknesses and critical issues.
         
-        return min(html_complexity + css_complexity + js_complexity, 100)
-    
-    def _score_to_grade(self, score: float) -> str:
-        """Convert score to letter grade"""
-        if score >= 97:
-            return "A+"
-        elif score >= 93:
-            return "A"
-        elif score >= 90:
-            return "A-"
-        elif score >= 87:
-            return "B+"
-        elif score >= 83:
-            return "B"
-        elif score >= 80:
-            return "B-"
-        elif score >= 77:
-            return "C+"
-        elif score >= 73:
-            return "C"
-        elif score >= 70:
-            return "C-"
-        elif score >= 60:
-            return "D"
-        else:
-            return "F"
-    
-    def _extract_strengths(self, html_analysis: Dict, css_analysis: Dict, js_analysis: Dict, llm_insights: Dict) -> List[str]:
-        """Extract UI strengths"""
-        strengths = []
+        Each layer finding is checked once and updates every score and label
+        list it affects.
+        
+        Args:
+            layers: Output of the layer analyses
+            size_scores: Performance and complexity scores from _size_scores
+            llm_insights: LLM insights for the UI
         
-        if html_analysis['semantic_html']:
+        Returns:
+            (scores, strengths, weaknesses, critical issues); scores holds
+            accessibility, performance, design_quality and complexity
+        """
+        flags = AnalysisFlags.from_layers(*layers[:4])
+        strengths: List[str] = []
+        weaknesses: List[str] = []
+        issues: List[str] = []
+        accessibility = 50.0
+        design_quality = 60.0
+        
+        if flags.semantic:
             strengths.append("Uses semantic HTML5 elements")
-        if html_analysis['accessibility_features']['aria_labels']:
+        else:
+            weaknesses.append("Missing semantic HTML elements")
+        if flags.aria:
+            accessibility += 15
             strengths.append("Includes ARIA labels for accessibility")
-        if css_analysis['responsive_design']:
+        if flags.roles:
+            accessibility += 10
+        if not flags.aria and not flags.roles:
+            issues.append("CRITICAL: No accessibility features (ARIA/roles)")
+        if flags.alt:
+            accessibility += 10
+        else:
+            weaknesses.append("Missing alt text on images")
+        if flags.landmarks:
+            accessibility += 10
+        
+        if flags.high_complexity:
+            issues.append("WARNING: High complexity may impact performance")
+        
+        if flags.responsive:
+            accessibility += 5
+            design_quality += 10
             strengths.append("Responsive design with media queries")
-        if css_analysis['modern_layout']:
+        else:
+            weaknesses.append("Not responsive - missing media queries")
+            issues.append("IMPORTANT: Not mobile-friendly")
+        if flags.modern_layout:
+            design_quality += 10
             strengths.append("Modern layout with Grid/Flexbox")
-        if css_analysis['uses_variables']:
+        if flags.variables:
+            design_quality += 10
             strengths.append("Uses CSS variables for maintainability")
-        if js_analysis['event_handlers']:
+        else:
+            weaknesses.append("Not using CSS variables")
+        if flags.design_system:
+            design_quality += 10
+        
+        if flags.events:
             strengths.append("Proper event handling")
-        if js_analysis['modern_syntax']:
+        if flags.modern_js:
             strengths.append("Modern JavaScript syntax")
+        if not flags.error_handling:
+            weaknesses.append("Missing error handling in JavaScript")
+        if not flags.organized:
+            weaknesses.append("CSS lacks organization and comments")
         
         # Add LLM insights
         if 'insights' in llm_insights:
             strengths.extend(llm_insights['insights'][:3])
         
-        return strengths[:10]  # Top 10
+        performance, complexity = size_scores
+        scores = {
+            'accessibility': min(accessibility, 100.0),
+            'performance': performance,
+            'design_quality': min(design_quality, 100.0),
+            'complexity': complexity
+        }
+        return scores, strengths[:10], weaknesses[:10], issues
     
-    def _extract_weaknesses(self, html_analysis: Dict, css_analysis: Dict, js_analysis: Dict, llm_insights: Dict) -> List[str]:
-        """Extract UI weaknesses"""
-        weaknesses = []
-        
-        if not html_analysis['semantic_html']:
-            weaknesses.append("Missing semantic HTML elements")
-        if not html_analysis['accessibility_features']['alt_text']:
-            weaknesses.append("Missing alt text on images")
-        if not css_analysis['responsive_design']:
-            weaknesses.append("Not responsive - missing media queries")
-        if not css_analysis['uses_variables']:
-            weaknesses.append("Not using CSS variables")
-        if not js_analysis['error_handling']:
-            weaknesses.append("Missing error handling in JavaScript")
-        if css_analysis['organization'] == 'needs_comments':
-            weaknesses.append("CSS lacks organization and comments")
-        
-        return weaknesses[:10]
+    def _score_to_grade(self, score: float) -> str:
+        """Convert score to letter grade"""
+        return GRADES[bisect.bisect_right(GRADE_THRESHOLDS, score)]
     
     def _generate_improvements(self, html: str, css: str, js: str, weaknesses: List[str], llm_insights: Dict) -> List[str]:
         """Generate specific improvements"""
@@ -679,51 +1385,67 @@ Provide a structured JSON response with: reasoning, confidence (0-1), insights[]
         
         return improvements[:15]
     
-    def _identify_critical_issues(self, html_analysis: Dict, css_analysis: Dict, js_analysis: Dict, llm_insights: Dict) -> List[str]:
-        """Identify critical issues"""
-        issues = []
-        
-        if not html_analysis['accessibility_features']['aria_labels'] and not html_analysis['accessibility_features']['roles']:
-            issues.append("CRITICAL: No accessibility features (ARIA/roles)")
+    def _get_llm_comparison(self, analyses: List[UIAnalysis], criteria: Optional[List[str]]) -> Dict:
+        """
+        Get LLM comparison insights with a single request.
         
-        if html_analysis['complexity'] == 'high' and css_analysis['complexity'] == 'high':
-            issues.append("WARNING: High complexity may impact performance")
+        The prompt carries a short summary of each analysis rather than the
+        UI code, so its size stays small however many UIs are compared.
         
-        if not css_analysis['responsive_design']:
-            issues.append("IMPORTANT: Not mobile-friendly")
-        
-        return issues
-    
-    def _get_llm_comparison(self, ui_list: List[Dict], analyses: List[UIAnalysis], criteria: Optional[List[str]]) -> Dict:
-        """Get LLM comparison insights"""
-        # Simplified - would call LLM with comparison prompt
-        return {
-            'best_overall': 0,
+        Returns:
+            Dict with best_overall, reasoning, insights[] and rankings[]
+            (UI indices, best first)
+        """
+        by_score = sorted(range(len(analyses)), key=lambda i: analyses[i].overall_score, reverse=True)
+        fallback = {
+            'best_overall': by_score[0],
             'reasoning': 'Comparative analysis completed',
-            'insights': ['All UIs analyzed and compared']
+            'insights': ['All UIs analyzed and compared'],
+            'rankings': by_score
         }
+        if len(analyses) < 2 or not self.api_key:
+            return fallback
+        
+        summaries = '\n\n'.join(
+            f"### UI {i}\n"
+            f"Grade: {a.overall_grade} ({a.overall_score:.1f}/100)\n"
+            f"Strengths: {'; '.join(a.strengths[:3]) or 'None'}\n"
+            f"Weaknesses: {'; '.join(a.weaknesses[:3]) or 'None'}"
+            for i, a in enumerate(analyses)
+        )
+        focus = f"\n\nFocus on these criteria: {', '.join(criteria)}" if criteria else ''
+        prompt = f"""Compare these {len(analyses)} UI implementations using their analysis summaries:
+
+{summaries}{focus}
+
+Provide a JSON object with: best_overall (the UI number above), reasoning, insights[], rankings[] (UI numbers from best to worst)"""
+        
+        try:
+            response = self._call_llm(prompt, temperature=0.3)
+        except Exception as e:
+            print(f"  ⚠ LLM call failed: {str(e)}")
+            return fallback
+        
+        try:
+            comparison = _parse_json_answer(response, dict)
+            comparison['best_overall'] = int(comparison['best_overall'])
+            return {**fallback, **comparison}
+        except (ValueError, TypeError, KeyError):
+            return {**fallback, 'reasoning': response}
     
     def _extract_best_practices(self, analyses: List[UIAnalysis], comparison: Dict) -> List[str]:
         """Extract best practices from analyses"""
-        practices = []
-        
         # Find common strengths in top performers
         top_analyses = sorted(analyses, key=lambda x: x.overall_score, reverse=True)[:3]
         
-        for analysis in top_analyses:
-            practices.extend(analysis.strengths[:2])
-        
-        return list(set(practices))[:10]
+        # dict.fromkeys dedupes while keeping the ranking order
+        practices = dict.fromkeys(chain.from_iterable(a.strengths[:2] for a in top_analyses))
+        return list(practices)[:10]
     
     def _extract_common_issues(self, analyses: List[UIAnalysis]) -> List[str]:
         """Extract common issues"""
-        all_weaknesses = []
-        for analysis in analyses:
-            all_weaknesses.extend(analysis.weaknesses)
-        
         # Count frequency
-        from collections import Counter
-        weakness_counts = Counter(all_weaknesses)
+        weakness_counts = Counter(chain.from_iterable(a.weaknesses for a in analyses))
         
         return [w for w, count in weakness_counts.most_common(10) if count > 1]
     
@@ -0,0 +1,67 @@
+"""Shared fakes for the integration tests."""
+
+from integrations.fast_json import dumps
+
+
+class ScriptedResponse:
+    """aiohttp-style response with fixed status, headers and body."""
+
+    def __init__(self, status=200, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(self.status)
+
+    async def json(self):
+        return self.body
+
+    async def read(self):
+        return dumps(self.body)
+
+
+class ScriptedSession:
+    """
+    aiohttp-style session that records requests and replays responses.
+
+    ``replies`` is either a list of responses returned in order or a callable
+    ``(method, url, kwargs) -> ScriptedResponse``.
+    """
+
+    def __init__(self, replies=()):
+        self.replies = replies if callable(replies) else list(replies)
+        self.calls = []
+        self.closed = False
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if callable(self.replies):
+            return self.replies(method, url, kwargs)
+        return self.replies.pop(0)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    @property
+    def posts(self):
+        """(url, kwargs) of each POST, in order."""
+        return [(url, kwargs) for method, url, kwargs in self.calls if method == "POST"]
+
+    @property
+    def sent_headers(self):
+        """Headers of each request, in order."""
+        return [dict(kwargs.get("headers") or {}) for _, _, kwargs in self.calls]
@@ -0,0 +1,28 @@
+"""Tests for bounded-concurrency batching."""
+
+import asyncio
+
+from integrations.batching import run_batch
+
+
+class TestRunBatch:
+    """Test suite for run_batch."""
+
+    def test_limits_concurrency_and_keeps_order(self):
+        """Test no more than ``limit`` coroutines run at once."""
+        state = {"running": 0, "peak": 0}
+
+        async def work(i):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.001)
+            state["running"] -= 1
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        results = asyncio.run(run_batch((work(i) for i in range(10)), limit=3))
+
+        assert state["peak"] == 3
+        assert isinstance(results[3], ValueError)
+        assert [r for r in results if not isinstance(r, Exception)] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
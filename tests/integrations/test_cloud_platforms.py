@@ -0,0 +1,64 @@
+"""Tests for cloud platform integrations."""
+
+import gzip
+import json
+from types import SimpleNamespace
+
+from integrations.cloud_platforms import AWSAdapter, MultiCloudAdapter
+
+
+class FakeS3:
+    """Minimal S3 client that streams a fixed body."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+        self.objects = {}
+
+    def download_fileobj(self, bucket, key, fileobj, **kwargs):
+        for i in range(0, len(self.body), 4):
+            fileobj.write(self.body[i:i + 4])
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = (Body, kwargs)
+
+
+class TestAWSAdapter:
+    """Test suite for the AWS adapter."""
+
+    def test_download_context_to_buffer(self):
+        """Test S3 bodies are written into the caller's buffer."""
+        adapter = AWSAdapter(context_engine=None)
+        adapter.s3 = FakeS3(b'{"nodes": []}')
+        buf = bytearray(64)
+
+        written = adapter.download_context_to_buffer("bucket", "key", buf)
+
+        assert written == 13
+        assert bytes(buf[:written]) == b'{"nodes": []}'
+
+    def test_download_context_to_buffer_too_small(self):
+        """Test undersized buffers fail instead of overflowing."""
+        adapter = AWSAdapter(context_engine=None)
+        adapter.s3 = FakeS3(b'{"nodes": []}')
+
+        assert adapter.download_context_to_buffer("bucket", "key", bytearray(8)) is None
+
+
+class TestMultiCloudAdapter:
+    """Test suite for the multi-cloud adapter."""
+
+    def test_sync_to_clouds_compresses_once(self):
+        """Test multi-provider sync uploads a gzip body with content encoding."""
+        engine = SimpleNamespace(nodes={"a": SimpleNamespace(id="a", content="x")}, edges=[])
+        adapter = MultiCloudAdapter(engine)
+        adapter.aws.s3 = FakeS3(b"")
+
+        results = adapter.sync_to_clouds(
+            {"aws": {"bucket_name": "bucket", "key": "ctx.json"}, "unknown": {}}
+        )
+
+        assert results == {"aws": True, "unknown": False}
+        body, extra = adapter.aws.s3.objects[("bucket", "ctx.json")]
+        assert extra["ContentEncoding"] == "gzip"
+        assert json.loads(gzip.decompress(body)) == {"nodes": [{"id": "a", "content": "x"}], "edges": []}
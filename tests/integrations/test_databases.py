@@ -23,3 +23,65 @@ class TestDatabaseIntegration:
             assert isinstance(databases, list)
         except (ImportError, AttributeError):
             pytest.skip("DatabaseConnector not available")
+
+    def test_node_columns_flattens_nodes(self):
+        """Test nodes are flattened into columns, embeddings as plain lists."""
+        np = pytest.importorskip("numpy")
+        from types import SimpleNamespace
+        from integrations.databases import _node_columns
+
+        nodes = [
+            SimpleNamespace(id="a", content="x", embedding=np.array([1.0, 2.0]), metadata={"k": 1}),
+            SimpleNamespace(id="b", content="y", embedding=None, metadata={}),
+        ]
+        ids, contents, embeddings, metadata = _node_columns(nodes)
+        assert ids == ["a", "b"]
+        assert contents == ["x", "y"]
+        assert embeddings == [[1.0, 2.0], None]
+        assert metadata == [{"k": 1}, {}]
+
+    def test_node_columns_keeps_embedding_values(self):
+        """Test float64 and ragged embeddings are stored unchanged."""
+        np = pytest.importorskip("numpy")
+        from types import SimpleNamespace
+        from integrations.databases import _node_columns
+
+        nodes = [
+            SimpleNamespace(id="a", content="x", embedding=np.array([0.1, 0.2, 0.3]), metadata={}),
+            SimpleNamespace(id="b", content="y", embedding=[0.5], metadata={}),
+            SimpleNamespace(id="c", content="z"),
+        ]
+        _, _, embeddings, _ = _node_columns(nodes)
+        assert embeddings == [[0.1, 0.2, 0.3], [0.5], None]
+
+    def test_pgcopy_binary_stream(self):
+        """Test binary COPY stream framing for bulk loads."""
+        np = pytest.importorskip("numpy")
+        import struct
+        from types import SimpleNamespace
+        from integrations.databases import _pgcopy_binary
+
+        node = SimpleNamespace(id="a", content="x", embedding=np.array([1.0, 2.0]), metadata={})
+        data = _pgcopy_binary([node]).getvalue()
+
+        assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+        assert data.endswith(struct.pack(">h", -1))
+        # 19-byte header, then field count and the two text fields
+        assert data[19:21] == struct.pack(">h", 4)
+        assert struct.pack(">ihh", 12, 2, 0) + np.array([1.0, 2.0], dtype=">f4").tobytes() in data
+        assert b"\x01{}" in data
+
+    def test_pgcopy_binary_writes_null_content(self):
+        """Test missing content is sent as NULL rather than the text "None"."""
+        pytest.importorskip("numpy")
+        import struct
+        from types import SimpleNamespace
+        from integrations.databases import _pgcopy_binary
+
+        node = SimpleNamespace(id="a", content=None, embedding=None, metadata={})
+        data = _pgcopy_binary([node]).getvalue()
+
+        # field count, id "a", then NULL content and NULL embedding
+        row = struct.pack(">hi", 4, 1) + b"a" + struct.pack(">ii", -1, -1)
+        assert data[19:19 + len(row)] == row
+        assert b"None" not in data
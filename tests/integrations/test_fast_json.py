@@ -0,0 +1,27 @@
+"""Tests for integration JSON helpers."""
+
+import pytest
+
+from integrations.fast_json import dumps, loads
+
+
+class TestFastJson:
+    """Test suite for fast_json."""
+
+    def test_round_trip_returns_bytes(self):
+        """Test dumps returns bytes that loads parses back."""
+        data = {"id": "a", "tags": ["x", "y"], "score": 1.5}
+        encoded = dumps(data)
+        assert isinstance(encoded, bytes)
+        assert loads(encoded) == data
+        assert loads(encoded.decode("utf-8")) == data
+
+    def test_numpy_arrays_serialize(self):
+        """Test numpy arrays are encoded as lists."""
+        np = pytest.importorskip("numpy")
+        assert loads(dumps({"embedding": np.array([1.0, 2.0])})) == {"embedding": [1.0, 2.0]}
+
+    def test_sort_keys(self):
+        """Test sort_keys gives the same compact bytes regardless of key order."""
+        assert dumps({"b": 1, "a": [2]}, sort_keys=True) == b'{"a":[2],"b":1}'
+        assert dumps({"a": [2], "b": 1}, sort_keys=True) == b'{"a":[2],"b":1}'
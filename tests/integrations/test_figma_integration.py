@@ -0,0 +1,33 @@
+"""Tests for the Figma integration."""
+
+import asyncio
+
+from integrations.figma_integration import FigmaIntegration
+
+
+class TestFigmaIntegration:
+    """Test suite for FigmaIntegration."""
+
+    def test_convert_to_html_is_cached_per_revision(self):
+        """Test HTML renders are reused until lastModified changes."""
+        figma = FigmaIntegration(token="test")
+        first = asyncio.run(figma.convert_to_html("abc"))
+        assert asyncio.run(figma.convert_to_html("abc")) is first
+
+        file_data = figma._file_cache.get("abc")
+        figma._file_cache.set("abc", dict(file_data, lastModified="2024-02-01"))
+        assert asyncio.run(figma.convert_to_html("abc")) is not first
+
+    def test_convert_to_html_escapes_node_names(self):
+        """Test document nodes are rendered and escaped."""
+        figma = FigmaIntegration(token="test")
+        figma._file_cache.set("abc", {
+            "name": "File",
+            "lastModified": "1",
+            "document": {"children": [{"id": "1:2", "name": "<Hero>"}]},
+        })
+
+        html = asyncio.run(figma.convert_to_html("abc"))
+
+        assert 'data-node-id="1:2"' in html
+        assert "&lt;Hero&gt;" in html
@@ -0,0 +1,134 @@
+"""Tests for the GitHub integration."""
+
+import asyncio
+
+from integrations.github_integration import GitHubIntegration
+
+from .conftest import ScriptedResponse, ScriptedSession
+
+
+def make_github(session, token="test-token"):
+    github = GitHubIntegration(token=token)
+
+    async def factory():
+        return session
+
+    github._session_factory = factory
+    return github
+
+
+class TestGitHubIntegration:
+    """Test suite for GitHubIntegration."""
+
+    def test_offline_mode_without_token(self, monkeypatch):
+        """Test stub data is returned when no token is configured."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        session = ScriptedSession()
+        github = make_github(session, token=None)
+
+        repos = asyncio.run(github.list_repositories(user="octocat"))
+
+        assert [r["name"] for r in repos] == ["repo1", "repo2"]
+        assert session.calls == []
+
+    def test_requests_use_shared_session(self):
+        """Test authenticated calls go through the session factory."""
+        session = ScriptedSession(lambda *request: ScriptedResponse(body={"number": 7}))
+        github = make_github(session)
+
+        pr = asyncio.run(github.create_pull_request("o/r", "Title", "feature", "main"))
+
+        assert pr == {"number": 7}
+        method, url, kwargs = session.calls[0]
+        assert (method, url) == ("POST", "https://api.github.com/repos/o/r/pulls")
+        assert kwargs["headers"]["Authorization"] == "token test-token"
+
+    def test_deploy_uploads_serially_and_reports_errors(self, monkeypatch):
+        """Test deploy writes one file at a time and stops at a failed upload."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        events = []
+
+        class FailingCSSUpload(GitHubIntegration):
+            async def create_file(self, repo, path, content, message, branch="main"):
+                events.append(("start", path))
+                await asyncio.sleep(0)
+                events.append(("end", path))
+                if path == "styles.css":
+                    raise RuntimeError("boom")
+                return {"content": {"path": path}}
+
+        github = FailingCSSUpload(token=None)
+        result = asyncio.run(github.deploy_ui_to_github_pages("o/r", "<p>", css_content="p{}", js_content="x"))
+
+        assert result == {"success": False, "errors": ["boom"]}
+        assert events == [
+            ("start", "index.html"), ("end", "index.html"),
+            ("start", "styles.css"), ("end", "styles.css"),
+        ]
+
+    def test_list_repositories_is_cached(self):
+        """Test repeated listings are served from the TTL cache."""
+        session = ScriptedSession(lambda *request: ScriptedResponse(body=[{"name": "cached"}]))
+        github = make_github(session)
+
+        async def list_twice():
+            first = await github.list_repositories(user="octocat")
+            second = await github.list_repositories(user="octocat")
+            return first, second
+
+        first, second = asyncio.run(list_twice())
+
+        assert first == second == [{"name": "cached"}]
+        assert len(session.calls) == 1
+
+    def test_create_file_updates_existing_file(self):
+        """Test the current blob SHA is sent when the file already exists."""
+        def reply(method, url, kwargs):
+            if method == "GET":
+                return ScriptedResponse(404) if url.endswith("new.txt") else ScriptedResponse(body={"sha": "old-sha"})
+            return ScriptedResponse(body={"content": {"path": url.rsplit("/", 1)[-1]}})
+
+        session = ScriptedSession(reply)
+        github = make_github(session)
+
+        async def write_both():
+            await github.create_file("o/r", "index.html", "<p>", "Update", "gh-pages")
+            await github.create_file("o/r", "new.txt", "x", "Add", "gh-pages")
+
+        asyncio.run(write_both())
+
+        puts = [kwargs["json"] for method, _, kwargs in session.calls if method == "PUT"]
+        assert puts[0]["sha"] == "old-sha"
+        assert "sha" not in puts[1]
+        assert session.calls[0][2]["params"] == {"ref": "gh-pages"}
+
+    def test_batch_create_files_serializes_each_branch(self, monkeypatch):
+        """Test files on one branch are written in turn while branches overlap."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        active = {}
+        peak = {}
+        overlap = []
+
+        class SlowUpload(GitHubIntegration):
+            async def create_file(self, repo, path, content, message, branch="main"):
+                active[branch] = active.get(branch, 0) + 1
+                peak[branch] = max(peak.get(branch, 0), active[branch])
+                overlap.append(len(active) > 1 and all(active.values()))
+                await asyncio.sleep(0.01)
+                active[branch] -= 1
+                if path == "bad.txt":
+                    raise RuntimeError("boom")
+                return {"content": {"path": path}}
+
+        github = SlowUpload(token=None, max_concurrency=5)
+        results = asyncio.run(github.batch_create_files([
+            ("o/r", "a.txt", "a", "Add a", "main"),
+            ("o/r", "bad.txt", "b", "Add b", "main"),
+            ("o/r", "c.txt", "c", "Add c", "main"),
+            ("o/r", "d.txt", "d", "Add d", "docs"),
+        ]))
+
+        assert peak == {"main": 1, "docs": 1}
+        assert any(overlap)
+        assert [r["content"]["path"] for r in (results[0], results[2], results[3])] == ["a.txt", "c.txt", "d.txt"]
+        assert str(results[1]) == "boom"
@@ -0,0 +1,104 @@
+"""Tests for the shared HTTP session helpers."""
+
+import asyncio
+
+from integrations import http_session
+from integrations.http_session import conditional_get
+
+from .conftest import ScriptedResponse, ScriptedSession
+
+
+class TestConditionalGet:
+    """Test suite for conditional_get."""
+
+    def setup_method(self):
+        http_session.clear_validators()
+
+    def test_not_modified_returns_stored_body(self):
+        """Test a 304 reuses the body stored with the ETag."""
+        session = ScriptedSession([
+            ScriptedResponse(200, [{"name": "repo"}], {"ETag": '"v1"'}),
+            ScriptedResponse(304),
+        ])
+
+        async def fetch_twice():
+            first = await conditional_get(session, "https://api.example/repos")
+            second = await conditional_get(session, "https://api.example/repos")
+            return first, second
+
+        first, second = asyncio.run(fetch_twice())
+
+        assert first == second == [{"name": "repo"}]
+        assert "If-None-Match" not in session.sent_headers[0]
+        assert session.sent_headers[1]["If-None-Match"] == '"v1"'
+
+    def test_retries_after_rate_limit(self):
+        """Test throttled responses are retried after Retry-After."""
+        session = ScriptedSession([
+            ScriptedResponse(429, headers={"Retry-After": "0"}),
+            ScriptedResponse(200, {"ok": True}),
+        ])
+
+        assert asyncio.run(conditional_get(session, "https://api.example/x")) == {"ok": True}
+        assert len(session.sent_headers) == 2
+
+    def test_cached_body_is_not_shared_between_callers(self):
+        """Test mutating a returned body does not change what a later 304 returns."""
+        session = ScriptedSession([
+            ScriptedResponse(200, [{"name": "repo"}], {"ETag": '"v1"'}),
+            ScriptedResponse(304),
+            ScriptedResponse(304),
+        ])
+
+        async def fetch_and_mutate():
+            first = await conditional_get(session, "https://api.example/repos")
+            first.append({"name": "added"})
+            second = await conditional_get(session, "https://api.example/repos")
+            second[0]["name"] = "renamed"
+            return await conditional_get(session, "https://api.example/repos")
+
+        assert asyncio.run(fetch_and_mutate()) == [{"name": "repo"}]
+
+    def test_stored_bodies_are_bounded_by_size(self, monkeypatch):
+        """Test the least recently used bodies are evicted past the byte budget."""
+        monkeypatch.setattr(http_session, "_validators", http_session._ValidatorCache(maxbytes=40))
+        session = ScriptedSession(
+            lambda method, url, kwargs: ScriptedResponse(200, {"url": url}, {"ETag": '"v1"'})
+        )
+
+        async def fetch_all():
+            for n in range(3):
+                await conditional_get(session, f"https://api.example/{n}")
+
+        asyncio.run(fetch_all())
+
+        assert len(http_session._validators) == 1
+        assert http_session._validators.size <= 40
+
+
+class TestSharedSession:
+    """Test suite for the process-wide session."""
+
+    def test_integration_close_keeps_shared_session(self, monkeypatch):
+        """Test closing one integration leaves the session other integrations use open."""
+        from integrations.github_integration import GitHubIntegration
+
+        closed = []
+
+        class FakeClientSession:
+            closed = False
+
+            async def close(self):
+                closed.append(self)
+
+        async def close_github():
+            monkeypatch.setattr(http_session, "_session", FakeClientSession())
+            monkeypatch.setattr(http_session, "_session_loop", asyncio.get_running_loop())
+            await GitHubIntegration(token="t").close()
+            return http_session._session
+
+        shared = asyncio.run(close_github())
+
+        assert closed == []
+        assert http_session._session is shared
+
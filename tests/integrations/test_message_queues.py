@@ -0,0 +1,254 @@
+"""Tests for message queue integrations."""
+
+import asyncio
+import time
+
+from integrations.message_queues import (
+    AsyncRedisPubSubAdapter,
+    AWSSQSAdapter,
+    KafkaAdapter,
+    RabbitMQAdapter,
+    RedisPubSubAdapter,
+)
+
+
+class FakeChannel:
+    """Records AMQP calls made on a blocking channel."""
+
+    is_closed = False
+
+    def __init__(self):
+        self.calls = []
+
+    def tx_select(self):
+        self.calls.append("tx_select")
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.calls.append(("publish", routing_key, body))
+
+    def tx_commit(self):
+        self.calls.append("tx_commit")
+
+
+class FakeConnection:
+    """Hands out FakeChannels."""
+
+    def __init__(self):
+        self.channels = []
+
+    def channel(self):
+        channel = FakeChannel()
+        self.channels.append(channel)
+        return channel
+
+
+class TestRabbitMQAdapter:
+    """Test suite for RabbitMQAdapter."""
+
+    def test_publish_batch_commits_once(self):
+        """Test a batch is published in a single transaction."""
+        adapter = RabbitMQAdapter(context_engine=None)
+        adapter.connection = FakeConnection()
+
+        assert adapter.publish_batch("updates", [{"a": 1}, {"b": 2}])
+        assert adapter.publish_batch("updates", [{"c": 3}])
+
+        assert len(adapter.connection.channels) == 1
+        calls = adapter.connection.channels[0].calls
+        assert calls.count("tx_select") == 1
+        assert calls.count("tx_commit") == 2
+        assert [c[1] for c in calls if isinstance(c, tuple)] == ["updates"] * 3
+
+
+class FakeFuture:
+    """kafka-python style send future."""
+
+    def __init__(self):
+        self.errbacks = []
+
+    def add_errback(self, fn):
+        self.errbacks.append(fn)
+        return self
+
+    def get(self, timeout=None):
+        raise AssertionError("send path must not block on individual futures")
+
+
+class FakeProducer:
+    """Records sends and flushes."""
+
+    def __init__(self):
+        self.sent = []
+        self.flushes = 0
+
+    def send(self, topic, value):
+        self.sent.append((topic, value))
+        return FakeFuture()
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+
+
+class TestKafkaAdapter:
+    """Test suite for KafkaAdapter."""
+
+    def test_send_does_not_block(self):
+        """Test single sends are fire-and-forget."""
+        adapter = KafkaAdapter(context_engine=None)
+        adapter.producer = FakeProducer()
+
+        assert adapter.send_context_update("ctx", {"a": 1})
+        assert adapter.producer.flushes == 0
+
+    def test_send_many_flushes_once(self):
+        """Test batches are flushed once after all sends."""
+        adapter = KafkaAdapter(context_engine=None)
+        adapter.producer = FakeProducer()
+
+        assert adapter.send_many("ctx", [{"a": 1}, {"b": 2}])
+        assert len(adapter.producer.sent) == 2
+        assert adapter.producer.flushes == 1
+
+
+class FakePubSub:
+    """redis.asyncio style pubsub replaying fixed messages."""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+
+
+class TestAsyncRedisPubSubAdapter:
+    """Test suite for AsyncRedisPubSubAdapter."""
+
+    def test_listen_awaits_coroutine_callbacks(self):
+        """Test data messages are decoded and passed to async callbacks."""
+        adapter = AsyncRedisPubSubAdapter(context_engine=None)
+        adapter.pubsub = FakePubSub([
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": '{"a": 1}'},
+        ])
+        received = []
+
+        async def on_message(data):
+            received.append(data)
+
+        asyncio.run(adapter.listen(on_message))
+
+        assert received == [{"a": 1}]
+
+    def test_slow_callback_does_not_block_reading(self):
+        """Test workers run callbacks concurrently with each other."""
+        adapter = AsyncRedisPubSubAdapter(context_engine=None)
+        adapter.pubsub = FakePubSub([{"type": "message", "data": b'{"n": %d}' % n} for n in range(4)])
+        started = []
+
+        async def on_message(data):
+            started.append(data["n"])
+            await asyncio.sleep(0.05)
+
+        async def listen():
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            await adapter.listen(on_message, workers=4)
+            return loop.time() - begin
+
+        elapsed = asyncio.run(listen())
+
+        assert sorted(started) == [0, 1, 2, 3]
+        assert elapsed < 0.15
+
+
+class FakeSyncPubSub:
+    """redis-py style pubsub replaying fixed messages."""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def listen(self):
+        return iter(self.messages)
+
+
+class TestRedisPubSubAdapter:
+    """Test suite for RedisPubSubAdapter."""
+
+    def test_callback_errors_do_not_stop_listening(self):
+        """Test every message reaches the callback even if one fails."""
+        adapter = RedisPubSubAdapter(context_engine=None)
+        adapter.pubsub = FakeSyncPubSub([
+            {"type": "message", "data": b'{"n": 1}'},
+            {"type": "message", "data": b'{"n": 2}'},
+        ])
+        received = []
+
+        def on_message(data):
+            received.append(data["n"])
+            if data["n"] == 1:
+                raise ValueError("bad message")
+
+        adapter.listen(on_message)
+
+        assert received == [1, 2]
+
+    def test_callbacks_are_serial_and_ordered_by_default(self):
+        """Test the default listener hands messages over one at a time, in order."""
+        adapter = RedisPubSubAdapter(context_engine=None)
+        adapter.pubsub = FakeSyncPubSub([
+            {"type": "message", "data": b'{"n": %d}' % n} for n in range(20)
+        ])
+        received = []
+        active = []
+
+        def on_message(data):
+            active.append(data["n"])
+            assert len(active) == 1
+            time.sleep(0.001)
+            received.append(data["n"])
+            active.remove(data["n"])
+
+        adapter.listen(on_message)
+
+        assert received == list(range(20))
+
+
+class FakeSQS:
+    """Records SQS batch calls."""
+
+    def __init__(self):
+        self.send_batches = []
+        self.delete_batches = []
+
+    def send_message_batch(self, QueueUrl, Entries):
+        self.send_batches.append(Entries)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self.delete_batches.append(Entries)
+        return {"Successful": [], "Failed": [{"Id": "0", "Message": "gone"}]}
+
+
+class TestAWSSQSAdapter:
+    """Test suite for AWSSQSAdapter."""
+
+    def make_adapter(self):
+        adapter = AWSSQSAdapter(context_engine=None)
+        adapter.sqs = FakeSQS()
+        adapter.queue_url = "https://sqs.example/queue"
+        return adapter
+
+    def test_send_messages_chunks_by_ten(self):
+        """Test messages are sent in batches of at most 10."""
+        adapter = self.make_adapter()
+
+        assert adapter.send_messages([{"n": i} for i in range(23)])
+        assert [len(batch) for batch in adapter.sqs.send_batches] == [10, 10, 3]
+
+    def test_delete_messages_reports_failures(self):
+        """Test partial batch failures return False."""
+        adapter = self.make_adapter()
+
+        assert not adapter.delete_messages(["r1", "r2"])
+        assert len(adapter.sqs.delete_batches) == 1
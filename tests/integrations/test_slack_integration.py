@@ -0,0 +1,82 @@
+"""Tests for the Slack integration."""
+
+import asyncio
+import json
+
+from integrations.slack_integration import (
+    SlackIntegration,
+    _UI_BUILDER_BLOCKS,
+    _UI_BUILDER_BLOCKS_JSON,
+    _message_body,
+)
+
+from .conftest import ScriptedResponse, ScriptedSession
+
+
+class TestSlackIntegration:
+    """Test suite for SlackIntegration."""
+
+    def test_message_body_embeds_prebuilt_blocks(self):
+        """Test pre-serialized blocks produce a valid chat.postMessage body."""
+        body = json.loads(_message_body("#general", 'UI "Builder"', _UI_BUILDER_BLOCKS_JSON))
+
+        assert body == {"channel": "#general", "text": 'UI "Builder"', "blocks": list(_UI_BUILDER_BLOCKS)}
+
+    def test_message_body_without_blocks(self):
+        """Test bodies omit blocks when none are given."""
+        assert json.loads(_message_body("C1", "hi", None)) == {"channel": "C1", "text": "hi"}
+
+    def test_messages_are_posted_only_when_enabled(self, monkeypatch):
+        """Test a bot token alone keeps send_message offline."""
+        session = ScriptedSession(lambda *request: ScriptedResponse(200, {"ok": True, "ts": "1.2"}))
+
+        async def fake_get_session():
+            return session
+
+        monkeypatch.setattr("integrations.slack_integration.get_session", fake_get_session)
+        offline = SlackIntegration(token="xoxb-1")
+        live = SlackIntegration(token="xoxb-1", post_messages=True)
+
+        stub = asyncio.run(offline.send_message("C1", "hi"))
+        assert stub["ts"] == "1234567890.123456"
+        assert session.posts == []
+
+        assert asyncio.run(live.send_message("C1", "hi")) == {"ok": True, "ts": "1.2"}
+        url, kwargs = session.posts[0]
+        assert url.endswith("/chat.postMessage")
+        assert json.loads(kwargs["data"]) == {"channel": "C1", "text": "hi"}
+
+    def test_slash_command_dispatch(self):
+        """Test slash commands dispatch to registered handlers."""
+        slack = SlackIntegration(token="")
+        known = asyncio.run(slack.handle_slash_command("/generate-ui", "login page", "U1"))
+        unknown = asyncio.run(slack.handle_slash_command("/nope", "", "U1"))
+
+        assert known["response_type"] == "in_channel"
+        assert known["text"] == "Generating UI: login page..."
+        assert unknown == {"response_type": "ephemeral", "text": "Unknown command"}
+
+    def test_notifications_are_coalesced(self, monkeypatch):
+        """Test notifications return immediately and are posted together."""
+        session = ScriptedSession(lambda *request: ScriptedResponse(200))
+
+        async def fake_get_session():
+            return session
+
+        monkeypatch.setattr("integrations.slack_integration.get_session", fake_get_session)
+        slack = SlackIntegration(token="", webhook_url="https://hooks.example/T1")
+
+        async def notify():
+            assert await slack.notify_ui_generated("Dashboard")
+            assert await slack.notify_error("boom")
+            assert session.posts == []
+            await slack.flush_notifications()
+
+        asyncio.run(notify())
+
+        assert len(session.posts) == 1
+        url, kwargs = session.posts[0]
+        body = json.loads(kwargs["data"])
+        assert url == "https://hooks.example/T1"
+        assert [a["title"] for a in body["attachments"]] == ["UI Generated", "Error Occurred"]
+        assert body["attachments"][1]["color"] == "#f44336"
@@ -0,0 +1,31 @@
+"""Tests for the integrations TTL cache."""
+
+import time
+
+from integrations.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first."""
+        cache = TTLCache(maxsize=2, ttl=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expiry(self):
+        """Test entries expire after their ttl."""
+        cache = TTLCache(maxsize=4, ttl=0.01)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        time.sleep(0.02)
+
+        assert cache.get("a", "missing") == "missing"
+        assert cache.get("b") == 2
@@ -0,0 +1,81 @@
+"""Tests for web framework integrations."""
+
+import sys
+from types import SimpleNamespace
+
+from integrations.web_frameworks import ExpressJSCompatibleAPI, FlaskContextMiddleware, _BackgroundWriter
+
+
+class TestExpressJSCompatibleAPI:
+    """Test suite for ExpressJSCompatibleAPI."""
+
+    def test_route_lookup_by_method_and_path(self):
+        """Test handlers are registered and found per method and path."""
+        api = ExpressJSCompatibleAPI(context_engine=None)
+
+        @api.route("/items")
+        def list_items():
+            return []
+
+        @api.route("/items", method="POST")
+        def create_item():
+            return {}
+
+        assert api.get_route_handler("/items") is list_items
+        assert api.get_route_handler("/items", "POST") is create_item
+        assert api.get_route_handler("/items", "DELETE") is None
+
+
+class TestBackgroundWriter:
+    """Test suite for the middleware background writer."""
+
+    def test_runs_jobs_in_order(self):
+        """Test submitted jobs run and resolve their futures."""
+        writer = _BackgroundWriter()
+        first = writer.submit(lambda: "request")
+        second = writer.submit(lambda: first.result() + "+response")
+
+        assert second.result(timeout=5) == "request+response"
+
+    def test_drops_oldest_when_full(self):
+        """Test a full queue cancels the oldest pending job."""
+        import threading
+
+        writer = _BackgroundWriter(max_queue=1)
+        release = threading.Event()
+        blocker = writer.submit(release.wait)
+        while not blocker.running():
+            pass
+
+        oldest = writer.submit(lambda: "old")
+        newest = writer.submit(lambda: "new")
+        release.set()
+
+        assert oldest.cancelled()
+        assert newest.result(timeout=5) == "new"
+
+
+class TestFlaskContextMiddleware:
+    """Test suite for FlaskContextMiddleware."""
+
+    def test_request_node_is_set_by_default(self, monkeypatch):
+        """Test handlers still see g.request_node unless background writes are requested."""
+        hooks = {}
+        app = SimpleNamespace(
+            before_request=lambda fn: hooks.setdefault("before", fn),
+            after_request=lambda fn: hooks.setdefault("after", fn),
+        )
+        g = SimpleNamespace()
+        request = SimpleNamespace(is_json=True, endpoint="items", get_data=lambda cache=True: b'{"a": 1}')
+        monkeypatch.setitem(sys.modules, "flask", SimpleNamespace(g=g, request=request))
+        stored = []
+        engine = SimpleNamespace(
+            add_node_with_text=lambda text, name: stored.append((text, name)) or SimpleNamespace(id=name)
+        )
+
+        FlaskContextMiddleware(app, engine)
+        hooks["before"]()
+
+        assert g.request_node.id == "request_items"
+        assert not hasattr(g, "request_node_future")
+        assert stored == [('{"a": 1}', "request_items")]
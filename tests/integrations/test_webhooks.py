@@ -0,0 +1,312 @@
+"""Tests for webhook delivery."""
+
+import asyncio
+import json
+
+from integrations import webhooks
+from integrations.webhooks import WebhookManager
+
+from .conftest import ScriptedResponse, ScriptedSession
+
+
+def replies(*statuses):
+    """Responses with the given status codes, in order."""
+    return [ScriptedResponse(status) for status in statuses]
+
+
+class FakeSessionManager(WebhookManager):
+    """WebhookManager delivering through a ScriptedSession."""
+
+    def __init__(self, session, **kwargs):
+        super().__init__(**kwargs)
+        self.fake_session = session
+
+    async def _get_session(self):
+        return self.fake_session
+
+
+class TestWebhookManager:
+    """Test suite for WebhookManager deliveries."""
+
+    def test_delivers_signed_payload(self, monkeypatch):
+        """Test deliveries post the signed JSON body through the session."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(204))
+        manager = FakeSessionManager(session)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"], secret="s")
+
+        deliveries = asyncio.run(manager.trigger_event("ui.generated", {"n": 1}))
+
+        assert [(d.success, d.status_code, d.attempts) for d in deliveries] == [(True, 204, 1)]
+        url, kwargs = session.posts[0]
+        assert url == "https://hooks.example/a"
+        sent = json.loads(kwargs["data"])
+        assert sent["data"] == {"n": 1}
+        assert sent["timestamp"].endswith("Z") and not sent["timestamp"].startswith("2024-01-01")
+        assert manager.verify_signature(sent, kwargs["headers"]["X-Signature"], "s")
+        assert manager.verify_body_signature(kwargs["data"], kwargs["headers"]["X-Signature"], "s")
+        assert not manager.verify_body_signature(kwargs["data"] + b" ", kwargs["headers"]["X-Signature"], "s")
+
+    def test_body_serialized_once_for_all_subscribers(self, monkeypatch):
+        """Test subscribers share one body and identical secrets one signature."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200, 200, 200))
+        manager = FakeSessionManager(session)
+        signed = []
+        sign = manager._sign
+        monkeypatch.setattr(manager, "_sign", lambda body, secret: signed.append(secret) or sign(body, secret))
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"], secret="s")
+        manager.register_webhook("https://hooks.example/b", ["ui.generated"], secret="s")
+        manager.register_webhook("https://hooks.example/c", ["ui.generated"])
+
+        asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        bodies = {id(kwargs["data"]) for _, kwargs in session.posts}
+        assert len(bodies) == 1
+        assert signed == ["s"]
+        assert "X-Signature" not in session.posts[2][1]["headers"]
+
+    def test_session_reused_across_deliveries(self, monkeypatch):
+        """Test every delivery goes through the same session."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200, 200))
+        manager = FakeSessionManager(session)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+        manager.register_webhook("https://hooks.example/b", ["ui.generated"])
+
+        asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        assert [url for url, _ in session.posts] == ["https://hooks.example/a", "https://hooks.example/b"]
+        assert manager.get_webhook_stats()["successful_deliveries"] == 2
+
+    def test_deliveries_run_concurrently(self, monkeypatch):
+        """Test subscribers are delivered to in parallel, bounded by max_concurrency."""
+        in_flight = []
+        peak = []
+
+        class SlowManager(WebhookManager):
+            async def _deliver_webhook(self, webhook, event, payload, body, signature=None):
+                in_flight.append(webhook.id)
+                peak.append(len(in_flight))
+                await asyncio.sleep(0.01)
+                in_flight.remove(webhook.id)
+                if webhook.url.endswith("/bad"):
+                    raise RuntimeError("boom")
+                return webhooks.WebhookDelivery(webhook.id, event, payload, 200, True)
+
+        manager = SlowManager(max_concurrency=2)
+        for name in ("a", "bad", "c"):
+            manager.register_webhook(f"https://hooks.example/{name}", ["ui.generated"])
+
+        deliveries = asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        assert max(peak) == 2
+        assert [d.success for d in deliveries] == [True, False, True]
+        assert deliveries[1].error == "boom"
+
+    def test_retries_server_errors_but_not_client_errors(self, monkeypatch):
+        """Test 5xx responses are retried while 4xx responses fail at once."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        monkeypatch.setattr(webhooks.random, "uniform", lambda low, high: 0)
+        session = ScriptedSession(replies(503, 200, 404))
+        manager = FakeSessionManager(session)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+        manager.register_webhook("https://hooks.example/b", ["ui.updated"])
+
+        retried = asyncio.run(manager.trigger_event("ui.generated", {}))
+        rejected = asyncio.run(manager.trigger_event("ui.updated", {}))
+
+        assert (retried[0].success, retried[0].attempts) == (True, 2)
+        assert (rejected[0].success, rejected[0].attempts, rejected[0].error) == (False, 1, "HTTP 404")
+
+    def test_event_index_tracks_registrations(self):
+        """Test event lookups follow register/unregister."""
+        manager = WebhookManager()
+        a = manager.register_webhook("https://hooks.example/a", ["ui.generated", "ui.updated"])
+        b = manager.register_webhook("https://hooks.example/b", ["ui.generated"])
+
+        assert [w.id for w in manager.list_webhooks("ui.generated")] == [a, b]
+
+        manager.unregister_webhook(a)
+
+        assert [w.id for w in manager.list_webhooks("ui.generated")] == [b]
+        assert [w.id for w in manager.iter_webhooks()] == [b]
+        assert manager.list_webhooks("ui.updated") == []
+        assert asyncio.run(manager.trigger_event("ui.updated", {})) == []
+
+    def test_delivery_history_is_bounded(self, monkeypatch):
+        """Test old delivery records are dropped while stats keep lifetime totals."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200, 200, 404))
+        manager = FakeSessionManager(session, delivery_history_size=2)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+
+        for n in range(3):
+            asyncio.run(manager.trigger_event("ui.generated", {"n": n}))
+
+        stats = manager.get_webhook_stats()
+        assert len(manager._deliveries) == 2
+        assert (stats["total_deliveries"], stats["successful_deliveries"]) == (3, 2)
+
+    def test_circuit_breaker_skips_dead_hosts(self, monkeypatch):
+        """Test repeated failures open the host's breaker until the cooldown passes."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        monkeypatch.setattr(webhooks.random, "uniform", lambda low, high: 0)
+        session = ScriptedSession(replies(503, 503, 200))
+        manager = FakeSessionManager(session)
+        manager._breaker_threshold = 2
+        manager.register_webhook("https://down.example/a", ["ui.generated"])
+
+        failed = asyncio.run(manager.trigger_event("ui.generated", {}))
+        skipped = asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        assert (failed[0].attempts, failed[0].error) == (2, "HTTP 503")
+        assert (skipped[0].attempts, skipped[0].error) == (0, "circuit_open")
+        assert len(session.posts) == 2
+
+        manager._breaker_cooldown = 0
+        probed = asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        assert probed[0].success
+        assert manager._breakers["down.example"].state == "CLOSED"
+
+    def test_webhook_id_ignores_event_order(self):
+        """Test the same subscription registered twice keeps one id."""
+        manager = WebhookManager()
+        first = manager.register_webhook("https://hooks.example/a", ["ui.generated", "ui.updated"])
+        second = manager.register_webhook("https://hooks.example/a", ["ui.updated", "ui.generated"])
+
+        assert first == second
+        assert len(first) == 16
+        assert manager.list_webhooks()[0].events == frozenset({"ui.generated", "ui.updated"})
+        assert len(manager.list_webhooks()) == 1
+
+    def test_enqueued_events_are_posted_as_one_batch(self, monkeypatch):
+        """Test events queued within the batch window share one POST."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200))
+        manager = FakeSessionManager(session, batch_interval_ms=20)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+
+        async def enqueue():
+            counts = [await manager.enqueue_event("ui.generated", {"n": n}) for n in range(3)]
+            await manager.flush_events()
+            await manager.aclose()
+            return counts
+
+        assert asyncio.run(enqueue()) == [1, 1, 1]
+        assert len(session.posts) == 1
+        sent = json.loads(session.posts[0][1]["data"])
+        assert [item["data"]["n"] for item in sent["batch"]] == [0, 1, 2]
+        assert manager.get_webhook_stats()["successful_deliveries"] == 1
+
+    def test_identical_events_are_deduplicated(self, monkeypatch):
+        """Test with dedupe_ttl set a repeated event is skipped unless it failed."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200, 404, 200))
+        manager = FakeSessionManager(session, dedupe_ttl=5.0)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+
+        first = asyncio.run(manager.trigger_event("ui.generated", {"n": 1}))
+        repeat = asyncio.run(manager.trigger_event("ui.generated", {"n": 1}))
+        failed = asyncio.run(manager.trigger_event("ui.generated", {"n": 2}))
+        retried = asyncio.run(manager.trigger_event("ui.generated", {"n": 2}))
+
+        assert first[0].success and first[0].error is None
+        assert (repeat[0].deduplicated, repeat[0].attempts) == (True, 0)
+        assert not failed[0].success
+        assert retried[0].success and not retried[0].deduplicated
+        assert len(session.posts) == 3
+
+        stats = manager.get_webhook_stats()
+        assert (stats["total_deliveries"], stats["successful_deliveries"]) == (3, 2)
+        assert stats["deduplicated_deliveries"] == 1
+
+    def test_repeated_events_are_delivered_by_default(self, monkeypatch):
+        """Test identical events are all delivered unless dedupe is enabled."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(200, 200))
+        manager = FakeSessionManager(session)
+        manager.register_webhook("https://hooks.example/a", ["ui.updated"])
+
+        for _ in range(2):
+            asyncio.run(manager.trigger_event("ui.updated", {"n": 1}))
+
+        assert len(session.posts) == 2
+        assert manager.get_webhook_stats()["deduplicated_deliveries"] == 0
+
+    def test_concurrent_duplicate_is_not_reported_delivered(self, monkeypatch):
+        """Test a duplicate sent while the first is in flight does not borrow its result."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        session = ScriptedSession(replies(404, 404))
+        manager = FakeSessionManager(session, dedupe_ttl=5.0)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+
+        async def trigger_twice():
+            return await asyncio.gather(
+                manager.trigger_event("ui.generated", {"n": 1}),
+                manager.trigger_event("ui.generated", {"n": 1})
+            )
+
+        first, second = asyncio.run(trigger_twice())
+
+        assert not first[0].success and not second[0].success
+        assert not second[0].deduplicated
+        assert len(session.posts) == 2
+
+    def test_per_host_bulkhead_limits_concurrency(self, monkeypatch):
+        """Test one host never sees more than per_host_bulkhead requests at once."""
+        monkeypatch.setattr(webhooks, "AIOHTTP_AVAILABLE", True)
+        active = {"slow.example": 0, "fast.example": 0}
+        peak = dict(active)
+
+        class SlowResponse(ScriptedResponse):
+            def __init__(self, host):
+                super().__init__(200)
+                self.host = host
+
+            async def __aenter__(self):
+                active[self.host] += 1
+                peak[self.host] = max(peak[self.host], active[self.host])
+                await asyncio.sleep(0.01)
+                return self
+
+            async def __aexit__(self, *exc):
+                active[self.host] -= 1
+                return False
+
+        session = ScriptedSession(lambda method, url, kwargs: SlowResponse(url.split("/")[2]))
+        manager = FakeSessionManager(session, per_host_bulkhead=2)
+        for n in range(5):
+            manager.register_webhook(f"https://slow.example/{n}", ["ui.generated"])
+        manager.register_webhook("https://fast.example/a", ["ui.generated"])
+
+        deliveries = asyncio.run(manager.trigger_event("ui.generated", {}))
+
+        assert all(d.success for d in deliveries)
+        assert peak == {"slow.example": 2, "fast.example": 1}
+
+    def test_http2_transport_posts_through_httpx_client(self, monkeypatch):
+        """Test http2=True delivers through the httpx-style client."""
+        monkeypatch.setattr(webhooks, "HTTPX_AVAILABLE", True)
+        posts = []
+
+        class FakeHTTPXResponse:
+            status_code = 202
+
+        class FakeHTTPXClient:
+            async def post(self, url, content=None, headers=None):
+                posts.append((url, content, headers))
+                return FakeHTTPXResponse()
+
+        class HTTP2Manager(WebhookManager):
+            def _get_http2_client(self):
+                return FakeHTTPXClient()
+
+        manager = HTTP2Manager(http2=True)
+        manager.register_webhook("https://hooks.example/a", ["ui.generated"])
+
+        deliveries = asyncio.run(manager.trigger_event("ui.generated", {"n": 1}))
+
+        assert (deliveries[0].success, deliveries[0].status_code) == (True, 202)
+        assert json.loads(posts[0][1])["data"] == {"n": 1}
@@ -0,0 +1,488 @@
+"""
+Tests for the Intelligent LLM Orchestrator
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("requests")
+
+from intelligent_llm_orchestrator import (
+    BATCH_COST_FACTOR,
+    IntelligentLLMOrchestrator,
+    LLMResponse,
+    TaskType,
+    _TokenBucket,
+)
+
+
+def api_result(content="ok", tokens=100):
+    return {
+        'choices': [{'message': {'content': content}}],
+        'usage': {'total_tokens': tokens}
+    }
+
+
+def api_response(result):
+    return Mock(status_code=200, content=json.dumps(result).encode())
+
+
+class TestIntelligentLLMOrchestrator:
+    """Test suite for IntelligentLLMOrchestrator"""
+    
+    @pytest.fixture
+    def orchestrator(self):
+        """Create orchestrator instance for testing"""
+        return IntelligentLLMOrchestrator(api_key="test_key")
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_execute_request_caches_response(self, mock_post, orchestrator):
+        """Test a repeated request is served from the cache"""
+        mock_post.return_value = api_response(api_result())
+        
+        first = orchestrator.execute_llm_request('gpt-4', 'system', 'user')
+        second = orchestrator.execute_llm_request('gpt-4', 'system', 'user')
+        
+        assert first is second
+        assert mock_post.call_count == 1
+        assert orchestrator.metrics['cache_hits'] == 1
+        assert orchestrator.metrics['total_requests'] == 1
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_consensus_queries_models_concurrently(self, mock_post, orchestrator):
+        """Test consensus wall time is close to one request, not the sum"""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return api_response(api_result(json.loads(kwargs['data'])['model']))
+        mock_post.side_effect = slow_post
+        
+        start = time.time()
+        result = orchestrator.orchestrate_with_consensus(
+            TaskType.REASONING, 'reasoning_tot', {'problem': 'p'}, num_models=3
+        )
+        elapsed = time.time() - start
+        
+        assert elapsed < 0.25
+        assert len(result.alternative_responses) == 2
+        assert result.primary_response.content == orchestrator.models['gpt-4-turbo'].model_id
+    
+    def test_consensus_without_models_fails_cleanly(self, orchestrator):
+        """Test an empty model panel reports failure instead of a pool error"""
+        with pytest.raises(Exception, match='All model requests failed'):
+            orchestrator.orchestrate_with_consensus(
+                TaskType.REASONING, 'reasoning_tot', {'problem': 'p'}, num_models=0
+            )
+    
+    def test_async_consensus_skips_failed_models(self, orchestrator):
+        """Test async consensus gathers responses and drops failures"""
+        httpx = pytest.importorskip("httpx")
+        
+        async def handler(request):
+            if b'"openai/gpt-4"' in request.read():
+                return httpx.Response(500, text="boom")
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        result = asyncio.run(orchestrator.aorchestrate_with_consensus(
+            TaskType.REASONING, 'reasoning_tot', {'problem': 'p'}, num_models=3
+        ))
+        
+        models = [result.primary_response.model] + [r.model for r in result.alternative_responses]
+        assert 'GPT-4' not in models
+        assert len(models) == 2
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.get')
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_batch_results_fill_cache(self, mock_post, mock_get, orchestrator):
+        """Test polled batch results serve later realtime requests"""
+        mock_post.side_effect = [
+            Mock(status_code=200, json=Mock(return_value={'id': 'file-in'})),
+            Mock(status_code=200, json=Mock(return_value={'id': 'batch-1'})),
+        ]
+        batch_id = orchestrator.submit_batch('gpt-4', [('system', 'a'), ('system', 'b')])
+        
+        upload = mock_post.call_args_list[0].kwargs['files']['file'][1].decode().splitlines()
+        assert [json.loads(line)['body']['model'] for line in upload] == ['gpt-4', 'gpt-4']
+        assert mock_post.call_args_list[1].kwargs['json']['completion_window'] == '24h'
+        
+        output = Mock(status_code=200, iter_lines=Mock(return_value=[
+            json.dumps({'custom_id': '1', 'response': {'status_code': 200, 'body': api_result('b')}}).encode(),
+            json.dumps({'custom_id': '0', 'response': {'status_code': 500, 'body': {}}}).encode(),
+        ]))
+        output.__enter__ = Mock(return_value=output)
+        output.__exit__ = Mock(return_value=False)
+        mock_get.side_effect = [
+            Mock(status_code=200, json=Mock(return_value={'status': 'in_progress'})),
+            Mock(status_code=200, json=Mock(return_value={'status': 'completed', 'output_file_id': 'file-out'})),
+            output,
+        ]
+        
+        assert orchestrator.poll_batch(batch_id) is None
+        results = orchestrator.poll_batch(batch_id)
+        
+        assert results[0] is None
+        assert results[1].content == 'b'
+        # Batch answers are metered at the discounted batch price
+        assert results[1].cost == pytest.approx(0.1 * 0.03 * BATCH_COST_FACTOR)
+        assert orchestrator.metrics['total_cost'] == pytest.approx(results[1].cost)
+        assert orchestrator.execute_llm_request('gpt-4', 'system', 'b') is results[1]
+        assert mock_post.call_count == 2
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.get')
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_batch_without_output_file(self, mock_post, mock_get, orchestrator):
+        """Test a batch whose requests all failed yields no responses"""
+        mock_post.side_effect = [
+            Mock(status_code=200, json=Mock(return_value={'id': 'file-in'})),
+            Mock(status_code=200, json=Mock(return_value={'id': 'batch-1'})),
+        ]
+        batch_id = orchestrator.submit_batch('gpt-4', [('system', 'a'), ('system', 'b')])
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={
+            'status': 'completed', 'output_file_id': None, 'error_file_id': 'file-err'
+        }))
+        
+        assert orchestrator.poll_batch(batch_id) == [None, None]
+        assert mock_get.call_count == 1
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.get')
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_batch_output_error_raises(self, mock_post, mock_get, orchestrator):
+        """Test an error fetching the output file is not parsed as results"""
+        mock_post.side_effect = [
+            Mock(status_code=200, json=Mock(return_value={'id': 'file-in'})),
+            Mock(status_code=200, json=Mock(return_value={'id': 'batch-1'})),
+        ]
+        batch_id = orchestrator.submit_batch('gpt-4', [('system', 'a')])
+        output = Mock(status_code=404, text='not found')
+        output.__enter__ = Mock(return_value=output)
+        output.__exit__ = Mock(return_value=False)
+        mock_get.side_effect = [
+            Mock(status_code=200, json=Mock(return_value={'status': 'completed', 'output_file_id': 'file-out'})),
+            output,
+        ]
+        
+        with pytest.raises(Exception, match='404'):
+            orchestrator.poll_batch(batch_id)
+        output.iter_lines.assert_not_called()
+    
+    def test_batch_rejects_non_openai_models(self, orchestrator):
+        """Test batch mode is limited to models the Batch API serves"""
+        with pytest.raises(ValueError):
+            orchestrator.submit_batch('claude-3-opus', [('system', 'user')])
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_cache_is_bounded(self, mock_post):
+        """Test the response cache evicts least recently used entries"""
+        mock_post.return_value = api_response(api_result())
+        orchestrator = IntelligentLLMOrchestrator(api_key="test_key", cache_max=2)
+        
+        for prompt in ('a', 'b', 'c'):
+            orchestrator.execute_llm_request('gpt-4', 'system', prompt)
+        
+        metrics = orchestrator.get_metrics()
+        assert metrics['cache_size'] == 2
+        assert metrics['cache_max_size'] == 2
+        orchestrator.execute_llm_request('gpt-4', 'system', 'a')
+        assert mock_post.call_count == 4
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_disk_cache_survives_restart(self, mock_post, tmp_path):
+        """Test low-temperature responses are reused by a new orchestrator"""
+        pytest.importorskip("diskcache")
+        mock_post.return_value = api_response(api_result())
+        
+        first = IntelligentLLMOrchestrator(api_key="test_key", disk_cache_dir=str(tmp_path))
+        first.execute_llm_request('gpt-4', 'system', 'deterministic', temperature=0.0)
+        first.execute_llm_request('gpt-4', 'system', 'creative', temperature=0.9)
+        
+        second = IntelligentLLMOrchestrator(api_key="test_key", disk_cache_dir=str(tmp_path))
+        second.execute_llm_request('gpt-4', 'system', 'deterministic', temperature=0.0)
+        second.execute_llm_request('gpt-4', 'system', 'creative', temperature=0.9)
+        
+        assert mock_post.call_count == 3
+        assert second.metrics['cache_hits'] == 1
+    
+    def test_build_prompt_does_not_substitute_inside_values(self, orchestrator):
+        """Test placeholders inside variable values are left as-is"""
+        _, user_prompt = orchestrator.build_prompt('ui_design_detailed', {
+            'requirements': 'use {framework} and {"literal": 1}',
+            'framework': 'React',
+            'style': 'minimal'
+        })
+        
+        assert 'use {framework} and {"literal": 1}' in user_prompt
+        assert 'Target Framework: React' in user_prompt
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_stream_yields_deltas_and_caches_result(self, mock_post, orchestrator):
+        """Test streamed deltas are yielded and the full response is cached"""
+        events = [
+            ': OPENROUTER PROCESSING',
+            'data: ' + json.dumps({'choices': [{'delta': {'content': 'Hel'}}]}),
+            '',
+            'data: ' + json.dumps({'choices': [{'delta': {'content': 'lo'}}], 'usage': {'total_tokens': 7}}),
+            'data: [DONE]',
+        ]
+        response = Mock(status_code=200, iter_lines=Mock(return_value=events))
+        response.__enter__ = Mock(return_value=response)
+        response.__exit__ = Mock(return_value=False)
+        mock_post.return_value = response
+        
+        chunks = list(orchestrator.stream_llm_request('gpt-4', 'system', 'user'))
+        
+        assert [c.content_delta for c in chunks[:-1]] == ['Hel', 'lo']
+        assert chunks[-1].done and chunks[-1].response.content == 'Hello'
+        assert chunks[-1].response.tokens_used == 7
+        assert json.loads(mock_post.call_args.kwargs['data'])['stream'] is True
+        assert orchestrator.execute_llm_request('gpt-4', 'system', 'user') is chunks[-1].response
+    
+    def test_async_consensus_cancels_stragglers(self, orchestrator):
+        """Test consensus returns once min_responses models have answered"""
+        httpx = pytest.importorskip("httpx")
+        
+        async def handler(request):
+            if b'"openai/gpt-4"' in request.read():
+                await asyncio.sleep(5)
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        start = time.time()
+        result = asyncio.run(orchestrator.aorchestrate_with_consensus(
+            TaskType.REASONING, 'reasoning_tot', {'problem': 'p'}, num_models=3, min_responses=2
+        ))
+        
+        assert time.time() - start < 1
+        models = [result.primary_response.model] + [r.model for r in result.alternative_responses]
+        assert models == ['GPT-4 Turbo', 'Claude 3 Opus']
+    
+    def test_long_prompts_are_routed_to_cheaper_models(self, orchestrator):
+        """Test projected prompt cost downgrades to similar cheaper models"""
+        short = orchestrator.select_best_model(TaskType.REASONING, 'high', prompt_text='x' * 400, max_cost=0.2)
+        long = orchestrator.select_best_model(TaskType.REASONING, 'high', prompt_text='x' * 40000, max_cost=0.2)
+        
+        assert short == 'gpt-4'
+        assert long == 'gpt-4-turbo'
+        assert orchestrator.get_metrics()['routing_downgrades'] == 1
+    
+    def test_consensus_confidence_uses_embeddings(self):
+        """Test confidence reflects semantic agreement, not length"""
+        vectors = {'yes': [1.0, 0.0], 'yes!': [0.9, 0.1], 'no.': [0.0, 1.0]}
+        orchestrator = IntelligentLLMOrchestrator(
+            api_key="test_key", embedder=lambda texts: [vectors[t] for t in texts]
+        )
+        
+        def respond(content):
+            return LLMResponse(model='m', content=content, tokens_used=1, latency=0.0, cost=0.0)
+        
+        agree = orchestrator._calculate_consensus_confidence([respond('yes'), respond('yes!')])
+        disagree = orchestrator._calculate_consensus_confidence([respond('yes'), respond('no.')])
+        
+        assert agree > 0.9
+        assert disagree == 0.0
+    
+    def test_default_embedder_is_opt_in_and_loaded_outside_lock(self, monkeypatch):
+        """Test the default model loads only on request, without holding the cache lock"""
+        loads = []
+        
+        class FakeSentenceTransformer:
+            def __init__(self, name):
+                # Another thread must still be able to use the cache meanwhile
+                def use_lock():
+                    acquired = orchestrator._lock.acquire(timeout=0.5)
+                    if acquired:
+                        orchestrator._lock.release()
+                    return acquired
+                
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    loads.append(pool.submit(use_lock).result())
+            
+            def encode(self, texts, convert_to_numpy=True):
+                return [[1.0, 0.0] for _ in texts]
+        
+        monkeypatch.setitem(
+            sys.modules, 'sentence_transformers', Mock(SentenceTransformer=FakeSentenceTransformer)
+        )
+        
+        assert IntelligentLLMOrchestrator(api_key="test_key")._get_embedder() is None
+        assert loads == []
+        
+        orchestrator = IntelligentLLMOrchestrator(api_key="test_key", load_default_embedder=True)
+        embedder = orchestrator._get_embedder()
+        
+        assert loads == [True]
+        assert orchestrator._get_embedder() is embedder
+        assert embedder(['a']) == [[1.0, 0.0]]
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_anthropic_system_prompt_is_cacheable(self, mock_post, orchestrator):
+        """Test Anthropic requests mark the system prompt for prompt caching"""
+        result = api_result()
+        result['usage']['prompt_tokens_details'] = {'cached_tokens': 900}
+        mock_post.return_value = api_response(result)
+        
+        orchestrator.execute_llm_request('claude-3-opus', 'system', 'user')
+        orchestrator.execute_llm_request('gpt-4', 'system', 'user')
+        
+        anthropic_system = json.loads(mock_post.call_args_list[0].kwargs['data'])['messages'][0]
+        openai_system = json.loads(mock_post.call_args_list[1].kwargs['data'])['messages'][0]
+        assert anthropic_system['content'][0]['cache_control'] == {'type': 'ephemeral'}
+        assert openai_system['content'] == 'system'
+        assert orchestrator.metrics['prefix_cache_tokens'] == 1800
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_concurrent_identical_requests_share_one_call(self, mock_post, orchestrator):
+        """Test a duplicate request waits for the one already in flight"""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return api_response(api_result())
+        mock_post.side_effect = slow_post
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(orchestrator.execute_llm_request, 'gpt-4', 'system', 'user') for _ in range(2)]
+            first, second = [f.result() for f in futures]
+        
+        assert first is second
+        assert mock_post.call_count == 1
+    
+    def test_async_identical_requests_share_one_call(self, orchestrator):
+        """Test async duplicates await the in-flight request"""
+        httpx = pytest.importorskip("httpx")
+        calls = []
+        
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        async def run():
+            return await asyncio.gather(*[
+                orchestrator._aexecute_llm_request('gpt-4', 'system', 'user') for _ in range(3)
+            ])
+        
+        responses = asyncio.run(run())
+        
+        assert len(calls) == 1
+        assert all(r is responses[0] for r in responses)
+    
+    def test_cancelled_caller_leaves_shared_request_running(self, orchestrator):
+        """Test cancelling the first caller does not cancel identical followers"""
+        httpx = pytest.importorskip("httpx")
+        calls = []
+        
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        async def run():
+            leader = asyncio.ensure_future(orchestrator._aexecute_llm_request('gpt-4', 'system', 'user'))
+            follower = asyncio.ensure_future(orchestrator._aexecute_llm_request('gpt-4', 'system', 'user'))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            response = await follower
+            
+            lone = asyncio.ensure_future(orchestrator._aexecute_llm_request('gpt-4', 'system', 'other'))
+            await asyncio.sleep(0.01)
+            lone.cancel()
+            await asyncio.gather(lone, return_exceptions=True)
+            await asyncio.sleep(0)
+            return leader, response, lone
+        
+        leader, response, lone = asyncio.run(run())
+        
+        assert leader.cancelled() and lone.cancelled()
+        assert response.content
+        assert len(calls) == 2
+        assert orchestrator._ainflight == {}
+    
+    @patch('intelligent_llm_orchestrator.requests.Session.post')
+    def test_fallback_models_are_routed_by_openrouter(self, mock_post, orchestrator):
+        """Test fallback models are sent for server-side failover"""
+        result = api_result()
+        result['model'] = 'anthropic/claude-3-sonnet'
+        mock_post.return_value = api_response(result)
+        
+        response = orchestrator.execute_llm_request('gpt-4', 'system', 'user', fallback_models=['claude-3-sonnet'])
+        
+        payload = json.loads(mock_post.call_args.kwargs['data'])
+        assert payload['models'] == ['openai/gpt-4', 'anthropic/claude-3-sonnet']
+        assert payload['route'] == 'fallback'
+        assert response.metadata['served_by'] == 'anthropic/claude-3-sonnet'
+    
+    def test_async_consensus_exits_early_on_agreement(self):
+        """Test remaining models are skipped once two answers agree"""
+        httpx = pytest.importorskip("httpx")
+        encode_threads = []
+        
+        def embedder(texts):
+            encode_threads.append(threading.get_ident())
+            return [[1.0, 0.0] for _ in texts]
+        
+        orchestrator = IntelligentLLMOrchestrator(api_key="test_key", embedder=embedder)
+        
+        async def handler(request):
+            if b'"openai/gpt-4"' in request.read():
+                await asyncio.sleep(5)
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        start = time.time()
+        result = asyncio.run(orchestrator.aorchestrate_with_consensus(
+            TaskType.REASONING, 'reasoning_tot', {'problem': 'p'}, num_models=3
+        ))
+        
+        assert time.time() - start < 1
+        assert len(result.alternative_responses) == 1
+        assert orchestrator.metrics['early_exits'] == 1
+        assert orchestrator.metrics['tokens_saved'] == 100
+        # Encoding runs off the event loop's thread
+        assert encode_threads and threading.get_ident() not in encode_threads
+    
+    def test_token_bucket_limits_request_rate(self):
+        """Test requests beyond the burst wait for tokens to refill"""
+        bucket = _TokenBucket(rate=20, capacity=2)
+        
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        
+        assert time.monotonic() - start >= 0.09
+    
+    def test_async_request_retries_after_throttling(self, orchestrator):
+        """Test 429 responses are retried after Retry-After"""
+        httpx = pytest.importorskip("httpx")
+        statuses = [429, 200]
+        
+        async def handler(request):
+            status = statuses.pop(0)
+            if status == 429:
+                return httpx.Response(429, headers={'Retry-After': '0'})
+            return httpx.Response(200, json=api_result())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        orchestrator._get_async_client = lambda: client
+        
+        response = asyncio.run(orchestrator._aexecute_llm_request('gpt-4', 'system', 'user'))
+        
+        assert response.content == 'ok'
+        assert statuses == []
@@ -0,0 +1,411 @@
+"""
+Tests for the Intelligent UI Agent
+"""
+
+import contextvars
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("requests")
+
+from intelligent_ui_agent import (
+    LLM_ANALYSIS_BATCH_SIZE,
+    IntelligentUIAgent,
+    _parse_json_answer,
+    _size_scores,
+    create_llm_session,
+)
+
+
+def llm_response(content, chunk_size=7):
+    """Mock a streamed chat completion delivering ``content`` in small deltas"""
+    lines = [': OPENROUTER PROCESSING', ''] + [
+        'data: ' + json.dumps({'choices': [{'delta': {'content': content[i:i + chunk_size]}}]})
+        for i in range(0, len(content), chunk_size)
+    ] + ['data: [DONE]']
+    response = Mock(status_code=200, headers={'Content-Type': 'text/event-stream'})
+    response.iter_lines.side_effect = lambda **kwargs: iter(lines)
+    return response
+
+
+def analysis_prompts(mock_post):
+    """User prompts of the analysis requests, leaving out the comparison request"""
+    prompts = [c.kwargs['json']['messages'][1]['content'] for c in mock_post.call_args_list]
+    return [p for p in prompts if p.startswith('Analyze')]
+
+
+def sample_ui(n):
+    return {
+        'html': f'<!DOCTYPE html><body><main aria-label="ui {n}">UI {n}</main></body>',
+        'css': '.a { display: flex; }',
+        'js': ''
+    }
+
+
+class TestIntelligentUIAgent:
+    """Test suite for IntelligentUIAgent"""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create agent instance for testing"""
+        return IntelligentUIAgent(api_key="test_key")
+    
+    @patch('requests.Session.post')
+    def test_compare_uis_batches_llm_analysis(self, mock_post, agent):
+        """Test several UIs are analyzed with one LLM request"""
+        mock_post.return_value = llm_response(json.dumps([
+            {'index': i, 'reasoning': f'ui {i}', 'confidence': 0.9, 'insights': [], 'suggestions': []}
+            for i in (2, 0, 1)
+        ]))
+        
+        report = agent.compare_uis([sample_ui(n) for n in range(3)])
+        
+        assert len(analysis_prompts(mock_post)) == 1
+        assert report['total_uis'] == 3
+        assert [a.ai_reasoning for a in agent.analysis_history] == ['ui 0', 'ui 1', 'ui 2']
+        
+        # A later single-UI call is served from the cache in single-answer shape
+        ui = sample_ui(1)
+        cached = agent._get_llm_analysis(ui['html'], ui['css'], ui['js'], None, None)
+        assert 'index' not in cached
+        assert cached['reasoning'] == 'ui 1'
+        assert len(analysis_prompts(mock_post)) == 1
+    
+    @patch('requests.Session.post')
+    def test_unparsable_batch_falls_back_to_single_requests(self, mock_post, agent):
+        """Test a non-JSON batch answer is retried per UI"""
+        mock_post.side_effect = [llm_response('not json')] + [
+            llm_response(json.dumps({'reasoning': 'single', 'confidence': 0.9})) for _ in range(3)
+        ]
+        
+        agent.compare_uis([sample_ui(n) for n in range(2)])
+        
+        assert len(analysis_prompts(mock_post)) == 3
+        assert [a.ai_reasoning for a in agent.analysis_history] == ['single', 'single']
+    
+    @patch('requests.Session.post')
+    def test_compare_uis_sends_batches_concurrently(self, mock_post, agent):
+        """Test LLM batches overlap instead of running back to back"""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            prompt = kwargs['json']['messages'][1]['content']
+            count = prompt.count('### UI ')
+            return llm_response(json.dumps([{'index': i, 'reasoning': 'ok'} for i in range(count)]))
+        mock_post.side_effect = slow_post
+        
+        start = time.time()
+        agent.compare_uis([sample_ui(n) for n in range(3 * LLM_ANALYSIS_BATCH_SIZE)])
+        
+        # Three overlapping analysis batches, then the comparison request
+        assert len(analysis_prompts(mock_post)) == 3
+        assert time.time() - start < 0.35
+    
+    @patch('requests.Session.post')
+    def test_llm_analysis_is_cached(self, mock_post, agent):
+        """Test repeated UIs are answered from the cache"""
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'ok', 'confidence': 0.9}))
+        
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        assert mock_post.call_count == 1
+        
+        agent.current_model = 'claude'
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        assert mock_post.call_count == 2
+    
+    @patch('requests.Session.post')
+    def test_compare_uis_only_sends_uncached(self, mock_post, agent):
+        """Test cached UIs are left out of batched requests"""
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'single'}))
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        
+        mock_post.return_value = llm_response(json.dumps([
+            {'index': 0, 'reasoning': 'second'},
+            {'index': 1, 'reasoning': 'third'},
+        ]))
+        agent.compare_uis([sample_ui(n) for n in range(3)])
+        
+        prompts = analysis_prompts(mock_post)
+        assert len(prompts) == 2
+        assert prompts[-1].count('### UI ') == 2
+        assert [a.ai_reasoning for a in list(agent.analysis_history)[-3:]] == ['single', 'second', 'third']
+    
+    def test_layer_analysis_flags(self, agent):
+        """Test layer heuristics read the scanned token map"""
+        layers = agent._analyze_layers(
+            '<!DOCTYPE html><body><nav role="menu" class="m"><img alt="x"></nav></body>',
+            '.m { color: var(--color-primary); font-family: a; font-size: 2px; }',
+            'try { el.addEventListener("keydown", f); } catch (e) {}',
+            None
+        )
+        html_a, css_a, js_a, design_a, consistency = layers
+        
+        assert html_a['semantic_html'] and html_a['accessibility_features']['landmarks']
+        assert not html_a['accessibility_features']['aria_labels']
+        assert html_a['element_count'] == 6
+        assert css_a['uses_variables'] and not css_a['responsive_design']
+        assert design_a['color_consistency'] and design_a['typography_system']
+        assert js_a['error_handling'] and js_a['accessibility_support']
+        assert consistency == 100.0
+        
+        scores, strengths, weaknesses, issues = agent._score_and_label(layers, (95.0, 1.5), {})
+        assert scores['accessibility'] == 80.0 and scores['design_quality'] == 70.0
+        assert "Uses semantic HTML5 elements" in strengths
+        assert "Missing alt text on images" not in weaknesses
+        assert issues == ["IMPORTANT: Not mobile-friendly"]
+    
+    def test_best_practices_keep_ranking_order(self, agent):
+        """Test best practices are deduplicated in a stable order"""
+        analyses = [
+            Mock(overall_score=score, strengths=strengths, weaknesses=['slow', name])
+            for score, strengths, name in [
+                (70, ['c', 'd'], 'x'), (90, ['a', 'b'], 'y'), (80, ['b', 'c'], 'z')
+            ]
+        ]
+        
+        assert agent._extract_best_practices(analyses, {}) == ['a', 'b', 'c', 'd']
+        assert agent._extract_common_issues(analyses) == ['slow']
+    
+    @patch('requests.Session.post')
+    def test_stream_stops_after_json_document(self, mock_post, agent):
+        """Test trailing prose after the JSON answer is not waited for"""
+        answer = json.dumps({'reasoning': 'a "quoted" } brace', 'insights': [{'x': [1]}]})
+        response = llm_response(answer + '\n\nLet me know if you need anything else.')
+        lines = iter(response.iter_lines())
+        response.iter_lines.side_effect = lambda **kwargs: lines
+        mock_post.return_value = response
+        
+        assert agent._call_llm('prompt') == answer
+        assert mock_post.call_args.kwargs['json']['stream'] is True
+        assert next(lines) != 'data: [DONE]'
+        response.close.assert_called_once()
+    
+    @patch('requests.Session.post')
+    def test_stream_keeps_prose_answers(self, mock_post, agent):
+        """Test non-JSON answers and buffered replies are returned whole"""
+        mock_post.return_value = llm_response('Looks good. {"a": 1} More text.')
+        assert agent._call_llm('prompt') == 'Looks good. {"a": 1} More text.'
+        
+        buffered = Mock(status_code=200, headers={'Content-Type': 'application/json'})
+        buffered.json.return_value = {'choices': [{'message': {'content': 'full'}}]}
+        mock_post.return_value = buffered
+        assert agent._call_llm('prompt') == 'full'
+    
+    @patch('requests.Session.post')
+    def test_model_switch_updates_request(self, mock_post, agent):
+        """Test the resolved model id follows current_model"""
+        mock_post.return_value = llm_response('ok')
+        
+        agent.current_model = 'claude'
+        agent._call_llm('prompt')
+        agent.current_model = 'unknown'
+        agent._call_llm('prompt')
+        
+        models = [c.kwargs['json']['model'] for c in mock_post.call_args_list]
+        assert models == ['anthropic/claude-3-opus', 'openai/gpt-4-turbo-preview']
+        assert mock_post.call_args.kwargs['headers']['Authorization'] == 'Bearer test_key'
+    
+    @patch('requests.Session.post')
+    def test_local_analysis_overlaps_llm_call(self, mock_post, agent):
+        """Test the layer analyses run while the LLM request is in flight"""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return llm_response(json.dumps({'reasoning': 'ok'}))
+        mock_post.side_effect = slow_post
+        scan_css = agent._scan_css
+        agent._scan_css = lambda css: time.sleep(0.1) or scan_css(css)
+        
+        start = time.time()
+        analysis = agent.analyze_ui_comprehensive(**sample_ui(0))
+        
+        assert analysis.ai_reasoning == 'ok'
+        assert time.time() - start < 0.18
+    
+    def test_session_retries_throttled_posts(self, agent):
+        """Test the session adapter retries 429s and honors Retry-After"""
+        retry = agent._get_session().get_adapter(agent.base_url).max_retries
+        
+        assert retry.total == 5
+        assert 429 in retry.status_forcelist
+        assert retry.is_retry('POST', 429, has_retry_after=True)
+        assert retry.respect_retry_after_header
+    
+    @patch('requests.Session.post')
+    def test_history_spills_to_log(self, mock_post, tmp_path, monkeypatch):
+        """Test evicted analyses are logged and iterated most recent first"""
+        monkeypatch.setattr('intelligent_ui_agent.HISTORY_MAX_ENTRIES', 2)
+        agent = IntelligentUIAgent(api_key="test_key", history_dir=str(tmp_path / 'history'))
+        
+        for n in range(5):
+            mock_post.return_value = llm_response(json.dumps({'reasoning': f'ui {n}'}))
+            agent.analyze_ui_comprehensive(**sample_ui(n))
+        
+        assert [a.ai_reasoning for a in agent.analysis_history] == ['ui 3', 'ui 4']
+        assert [a.ai_reasoning for a in agent.iter_history()] == [f'ui {n}' for n in range(4, -1, -1)]
+    
+    def test_size_scores_match_thresholds(self):
+        """Test vectorized size scoring against the scalar rules"""
+        sizes = np.array([[0, 0, 0], [9999, 0, 1], [20000, 4500, 3000], [99999, 1, 0], [8000, 90000, 50000]])
+        
+        scores = _size_scores(sizes)
+        
+        assert scores[:, 0].tolist() == [95.0, 85.0, 85.0, 65.0, 65.0]
+        assert scores[:, 1].tolist() == pytest.approx([0.0, 40.01, 100.0, 40.0 + 1 / 150, 100.0])
+    
+    @patch('requests.Session.post')
+    def test_fenced_json_answers_are_parsed(self, mock_post, agent):
+        """Test JSON wrapped in code fences or prose keeps its structure"""
+        mock_post.return_value = llm_response(
+            'Here is my analysis:\n```json\n{"reasoning": "fenced", "insights": ["clear layout"]}\n```'
+        )
+        analysis = agent.analyze_ui_comprehensive(**sample_ui(0))
+        assert analysis.ai_reasoning == 'fenced'
+        assert 'clear layout' in analysis.strengths
+        
+        mock_post.return_value = llm_response(
+            'Sure! [{"index": 1, "reasoning": "b"}, {"index": 0, "reasoning": "a"}] Hope this helps.'
+        )
+        agent.compare_uis([sample_ui(n) for n in (1, 2)])
+        assert len(analysis_prompts(mock_post)) == 2
+        assert [a.ai_reasoning for a in list(agent.analysis_history)[-2:]] == ['a', 'b']
+    
+    def test_json_answer_ignores_braces_after_the_document(self):
+        """Test the first complete JSON document wins over trailing braces or snippets"""
+        assert _parse_json_answer('Result: {"a": 1} Use {braces} wisely.') == {'a': 1}
+        assert _parse_json_answer('First {"a": 1} then {"b": 2}') == {'a': 1}
+        assert _parse_json_answer('See [1]. {"a": [1]}', dict) == {'a': [1]}
+        assert _parse_json_answer('Example: {"x": 0}\n```json\n{"a": 2}\n```') == {'a': 2}
+        with pytest.raises(ValueError):
+            _parse_json_answer('no json {here}')
+    
+    @patch('requests.Session.post')
+    def test_batch_answer_with_trailing_prose_is_not_retried(self, mock_post, agent):
+        """Test braces in prose after a batch answer keep the single request"""
+        mock_post.return_value = llm_response(
+            'Here you go: [{"index": 0, "reasoning": "a"}, {"index": 1, "reasoning": "b"}]\n'
+            'Note: use {curly} tokens, see [docs].'
+        )
+        
+        agent.compare_uis([sample_ui(n) for n in range(2)])
+        
+        assert len(analysis_prompts(mock_post)) == 1
+        assert [a.ai_reasoning for a in agent.analysis_history] == ['a', 'b']
+    
+    @patch('requests.Session.post')
+    def test_comparison_uses_one_summary_request(self, mock_post, agent):
+        """Test UIs are compared from analysis summaries in one request"""
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'ok'}))
+        analyses = [agent.analyze_ui_comprehensive(**sample_ui(n)) for n in range(3)]
+        mock_post.reset_mock()
+        mock_post.return_value = llm_response(json.dumps({
+            'best_overall': '2', 'reasoning': 'cleanest markup', 'insights': ['ui 2 wins'], 'rankings': [2, 0, 1]
+        }))
+        
+        comparison = agent._get_llm_comparison(analyses, ['accessibility'])
+        
+        prompt = mock_post.call_args.kwargs['json']['messages'][1]['content']
+        assert mock_post.call_count == 1
+        assert '### UI 2' in prompt and 'accessibility' in prompt
+        assert '<main' not in prompt
+        assert comparison['best_overall'] == 2
+        assert comparison['rankings'] == [2, 0, 1]
+    
+    def test_score_to_grade_boundaries(self, agent):
+        """Test each grade starts exactly at its threshold"""
+        cases = {0: 'F', 59.9: 'F', 60: 'D', 69.99: 'D', 70: 'C-', 73: 'C', 77: 'C+', 80: 'B-',
+                 83: 'B', 86.9: 'B', 87: 'B+', 90: 'A-', 93: 'A', 96.99: 'A', 97: 'A+', 100: 'A+'}
+        
+        assert {score: agent._score_to_grade(score) for score in cases} == cases
+    
+    @patch('requests.Session.post')
+    def test_shared_http_client_is_used_and_kept_open(self, mock_post):
+        """Test a caller-provided session carries the agent's requests"""
+        client = create_llm_session()
+        agent = IntelligentUIAgent(api_key="test_key", http_client=client)
+        mock_post.return_value = llm_response('ok')
+        
+        agent._call_llm('prompt')
+        agent.close()
+        
+        assert agent._get_session() is client
+        assert mock_post.call_count == 1
+    
+    @patch('requests.Session.post')
+    def test_offline_answers_fill_the_cache(self, mock_post, agent):
+        """Test answers to exported requests are used without calling the LLM"""
+        uis = [sample_ui(n) for n in range(3)]
+        requests_ = [agent.llm_analysis_request(ui['html'], ui['css'], ui['js']) for ui in uis]
+        assert requests_[0]['messages'][1]['content'].startswith('Analyze this UI')
+        assert 'stream' not in requests_[0]
+        
+        for n, ui in enumerate(uis):
+            agent.add_llm_analysis(ui['html'], ui['css'], ui['js'], None, json.dumps({'reasoning': f'ui {n}'}))
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'compared'}))
+        
+        assert agent.analyze_ui_comprehensive(**uis[0]).ai_reasoning == 'ui 0'
+        agent.compare_uis(uis[1:])
+        assert analysis_prompts(mock_post) == []
+        assert [a.ai_reasoning for a in list(agent.analysis_history)[-2:]] == ['ui 1', 'ui 2']
+    
+    @patch('requests.Session.post')
+    def test_analyses_are_cached_on_disk(self, mock_post, tmp_path):
+        """Test repeat runs load analyses from cache_dir until they expire"""
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'ok', 'insights': ['tidy']}))
+        first = IntelligentUIAgent(api_key="test_key", cache_dir=str(tmp_path)).analyze_ui_comprehensive(**sample_ui(0))
+        
+        agent = IntelligentUIAgent(api_key="test_key", cache_dir=str(tmp_path))
+        assert agent.analyze_ui_comprehensive(**sample_ui(0)) == first
+        assert mock_post.call_count == 1
+        assert list(agent.analysis_history) == [first]
+        
+        agent.analyze_ui_comprehensive(**sample_ui(0), project_context={'type': 'blog'})
+        assert mock_post.call_count == 2
+        
+        for cache_file in tmp_path.glob('*.json'):
+            os.utime(cache_file, (0, 0))
+        IntelligentUIAgent(api_key="test_key", cache_dir=str(tmp_path)).analyze_ui_comprehensive(**sample_ui(0))
+        assert mock_post.call_count == 3
+    
+    @patch('requests.Session.post')
+    def test_failed_llm_analyses_are_not_cached_on_disk(self, mock_post, tmp_path):
+        """Test fallback insights from a failed LLM call are not stored"""
+        mock_post.side_effect = ConnectionError('offline')
+        agent = IntelligentUIAgent(api_key="test_key", cache_dir=str(tmp_path))
+        
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        
+        assert list(tmp_path.iterdir()) == []
+    
+    @patch('requests.Session.post')
+    def test_on_token_sees_each_streamed_delta(self, mock_post):
+        """Test the progress callback gets every chunk that is read"""
+        tokens = []
+        agent = IntelligentUIAgent(api_key="test_key", on_token=tokens.append)
+        answer = json.dumps({'reasoning': 'streamed'})
+        mock_post.return_value = llm_response(answer + ' trailing prose', chunk_size=7)
+        
+        assert agent._call_llm('prompt') == answer
+        assert len(tokens) == 4
+        assert ''.join(tokens) == answer + ' tr'
+    
+    @patch('requests.Session.post')
+    def test_worker_threads_inherit_caller_context(self, mock_post, agent):
+        """Test context variables set by the caller reach the LLM and layer threads"""
+        mock_post.return_value = llm_response(json.dumps({'reasoning': 'ok'}))
+        marker = contextvars.ContextVar('marker', default=None)
+        seen = []
+        get_llm_analysis = agent._get_llm_analysis
+        analyze_layers = agent._analyze_layers
+        agent._get_llm_analysis = lambda *args: seen.append(marker.get()) or get_llm_analysis(*args)
+        agent._analyze_layers = lambda *args: seen.append(marker.get()) or analyze_layers(*args)
+        
+        marker.set('caller')
+        agent.analyze_ui_comprehensive(**sample_ui(0))
+        agent.compare_uis([sample_ui(n) for n in range(2)])
+        
+        assert len(seen) >= 3 and set(seen) == {'caller'}